@@ -0,0 +1,79 @@
+"""
+Throughput benchmark for product image variant generation.
+
+    python -m benchmarks.image_variants --images 200 --workers 1 2 4
+
+Generates synthetic JPEG photos, renders every configured size/format
+variant through a process pool and reports images per second for each
+worker count.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw
+
+from core.image_variants import render_variants, DEFAULT_SIZES, DEFAULT_FORMATS
+
+
+def make_source_images(directory, count, width, height):
+    rng = random.Random(42)
+    paths = []
+    for i in range(count):
+        im = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+        draw = ImageDraw.Draw(im)
+        for _ in range(40):
+            x0, y0 = rng.randrange(width), rng.randrange(height)
+            draw.ellipse(
+                (x0, y0, x0 + rng.randrange(50, 400), y0 + rng.randrange(50, 400)),
+                fill=tuple(rng.randrange(256) for _ in range(3))
+            )
+        path = os.path.join(directory, f"src_{i}.jpg")
+        im.save(path, "JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+def run(paths, out_dir, workers, sizes, formats):
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(render_variants, path, out_dir, f"bench{i}", sizes, formats)
+            for i, path in enumerate(paths)
+        ]
+        for future in futures:
+            future.result()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=100)
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="variant-bench-")
+    try:
+        print(f"Generating {args.images} source images ({args.width}x{args.height})...")
+        paths = make_source_images(workdir, args.images, args.width, args.height)
+        out_dir = os.path.join(workdir, "out")
+        os.makedirs(out_dir)
+
+        renders = len(DEFAULT_SIZES) * len(DEFAULT_FORMATS)
+        print(f"{renders} variants per image: sizes={list(DEFAULT_SIZES)} formats={list(DEFAULT_FORMATS)}")
+        for workers in sorted(set(args.workers)):
+            elapsed = run(paths, out_dir, workers, DEFAULT_SIZES, DEFAULT_FORMATS)
+            print(f"workers={workers:<3} {args.images / elapsed:8.1f} images/s  "
+                  f"({args.images * renders / elapsed:8.1f} variants/s, {elapsed:.2f}s)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Import-time report and budget for application startup.
+
+    python -m benchmarks.import_time --budget-ms 1500 --top 15
+
+Runs `python -X importtime -c "import main; main.create_app()"` in a fresh
+interpreter (importing and building the app, as gunicorn and `flask` CLI
+commands do), prints the slowest top-level packages by cumulative import
+time, and exits non-zero when startup is over budget or pulls in a module
+that must load lazily. tests/test_import_time.py enforces the same budget;
+the median of `--runs` interpreters is used so one slow disk read doesn't
+fail the build.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+# Only needed on first use of the feature that needs them.
+LAZY_MODULES = ("requests", "cloudinary", "PIL", "maxminddb", "flasgger")
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", 1500))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(target, factory="create_app"):
+    """
+    ({module: cumulative us}, {package: cumulative us}, total us) for
+    importing `target` and calling its `factory` (if given).
+    """
+    env = dict(os.environ, SCHEDULER_ENABLED="false", SWAGGER_ENABLED="false")
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    env.setdefault("JWT_SECRET_KEY", "import-time")
+    code = f"import {target}" + (f"; {target}.{factory}()" if factory else "")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True, cwd=ROOT
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"`{code}` failed:\n{result.stderr[-3000:]}")
+
+    modules = {}
+    children = []
+    total_us = 0
+    after_target = False
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        _, cumulative_us, indent, name = match.groups()
+        cumulative_us = int(cumulative_us)
+        modules[name] = cumulative_us
+        top_level = len(indent) <= 1
+        # Lines are printed children first, one extra indent level (two
+        # spaces) per nesting level, so the target's direct imports are the
+        # level-1 lines just before its own level-0 line. Level-0 lines after
+        # it were imported while the factory ran.
+        if after_target:
+            if top_level:
+                total_us += cumulative_us
+                children.append((name, cumulative_us))
+        elif top_level:
+            if name == target:
+                after_target = True
+                total_us += cumulative_us
+            else:
+                children = []
+        elif len(indent) == 3:
+            children.append((name, cumulative_us))
+
+    by_package = defaultdict(int)
+    for name, cumulative_us in children:
+        by_package[name.split(".")[0]] += cumulative_us
+    return modules, by_package, total_us
+
+
+def median_run(target, runs, factory="create_app"):
+    """The median of `runs` measurements by total time, plus every run's total in ms."""
+    results = sorted((measure(target, factory) for _ in range(runs)), key=lambda run: run[2])
+    return results[len(results) // 2], [run[2] / 1000 for run in results]
+
+
+def eagerly_imported(modules):
+    return [name for name in LAZY_MODULES if name in modules]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="main")
+    parser.add_argument("--factory", default="create_app", help="app factory to call after the import ('' to skip)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    (modules, by_package, total_us), totals = median_run(args.target, args.runs, args.factory)
+    total_ms = total_us / 1000
+
+    print(f"import {args.target}: {total_ms:.0f}ms (median of {args.runs}; runs {', '.join(f'{t:.0f}' for t in totals)}ms)")
+    print("\nSlowest packages imported at startup (cumulative):")
+    for name, us in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {us / 1000:8.1f}ms  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"startup import took {total_ms:.0f}ms, budget is {args.budget_ms:.0f}ms")
+    eager = eagerly_imported(modules)
+    if eager:
+        failures.append(f"imported at startup but should load lazily: {', '.join(eager)}")
+
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"\nOK: within the {args.budget_ms:.0f}ms budget")
+
+
+if __name__ == "__main__":
+    main()
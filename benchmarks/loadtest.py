@@ -0,0 +1,268 @@
+"""
+Scripted load scenarios with latency percentiles and a regression history.
+
+    python -m benchmarks.synthetic --products 1000000 ...   # once, to load data
+    python -m benchmarks.loadtest --concurrency 16 --duration 60
+    python -m benchmarks.loadtest --url http://127.0.0.1:8000 --mix browse=70,cart=20,checkout=10
+
+Simulated users pick a scenario by weight and run it end to end:
+
+    browse     popular products, then a few product pages
+    search     admin user search by email prefix (the closest thing to search
+               the API has)
+    cart       add a product to the cart, view the cart
+    checkout   add a product, place an order for it
+    vendor     vendor dashboard: own products, orders, storefront
+
+Without --url, requests go through Flask's test client in this process, so
+only the app and the database are measured. With --url they go over HTTP to
+a running server, which must share this environment's JWT_SECRET_KEY and
+DATABASE_URL (tokens are signed and test accounts sampled locally).
+
+Per-operation p50/p95/p99 are printed and appended to --history. A run is
+compared with the last one with the same mix, concurrency and data size;
+with --fail-on-regression, a p95 more than --threshold slower, a higher
+error rate, or any failed request at all exits 1. Failed requests are not
+in the latency samples, so a run with errors is flagged loudly either way.
+"""
+import argparse
+import os
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+
+from sqlalchemy import select
+from benchmarks.report import summarize, print_table, load_history, record_run, regressions, failing
+
+SCENARIOS = ("browse", "search", "cart", "checkout", "vendor")
+DEFAULT_MIX = "browse=55,search=5,cart=15,checkout=10,vendor=15"
+SAMPLE_SIZE = 5000
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+        self.enabled = False
+
+    def add(self, operation, elapsed, ok):
+        if not self.enabled:
+            return
+        with self._lock:
+            if ok:
+                self.samples[operation].append(elapsed)
+            else:
+                self.errors[operation] += 1
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.errors.clear()
+
+
+class AppClient:
+    """One simulated user's connection: Flask's test client, or a keep-alive HTTP session."""
+
+    def __init__(self, app, recorder, base_url=None):
+        self.recorder = recorder
+        self.base_url = base_url
+        if base_url:
+            import requests
+            self.http = requests.Session()
+        else:
+            self.test_client = app.test_client()
+
+    def call(self, operation, method, path, token=None, json=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        started = time.perf_counter()
+        try:
+            if self.base_url:
+                response = self.http.request(method, self.base_url + path, headers=headers, json=json, timeout=60)
+                status, body = response.status_code, response.content
+            else:
+                response = self.test_client.open(path, method=method, headers=headers, json=json)
+                status, body = response.status_code, response.get_data()
+        except Exception:
+            status, body = 599, b""
+        # Server errors and timeouts count as failures; 4xx (e.g. a product
+        # hidden since sampling) are still served requests.
+        self.recorder.add(operation, time.perf_counter() - started, status < 500)
+        return status, body
+
+
+class Fixtures:
+    """Ids and signed tokens for the simulated users, sampled from the database once."""
+
+    def __init__(self, app, seed):
+        from flask_jwt_extended import create_access_token
+        from models.userModel import Buyers, Vendors, Admins
+        from models.vendorModels import Products
+        from core.admin_stats import current_admin_stats
+        from core.extensions import db
+
+        rng = random.Random(seed)
+        with app.app_context():
+            def window(column, *where):
+                first = db.session.execute(select(column).where(*where).order_by(column).limit(1)).scalar()
+                last = db.session.execute(select(column).where(*where).order_by(column.desc()).limit(1)).scalar()
+                if first is None:
+                    return []
+                start = rng.randint(first, max(first, last - SAMPLE_SIZE))
+                return list(db.session.execute(
+                    select(column).where(column >= start, *where).order_by(column).limit(SAMPLE_SIZE)
+                ).scalars())
+
+            self.product_ids = window(Products.id, Products.status == "active", Products.visibility.is_(True))
+            buyer_ids = window(Buyers.id)
+            vendor_ids = list(db.session.execute(
+                select(Products.vendor_id).where(Products.id.in_(self.product_ids[:500])).distinct()
+            ).scalars())
+            admin_id = db.session.execute(select(Admins.id).limit(1)).scalar() or 1
+
+            if not self.product_ids or not buyer_ids or not vendor_ids:
+                raise SystemExit("No data to load-test: run `python -m benchmarks.synthetic` first.")
+
+            self.buyer_tokens = [create_access_token(identity=str(i), additional_claims={"role": "buyer"})
+                                 for i in rng.sample(buyer_ids, min(len(buyer_ids), 500))]
+            self.vendor_tokens = [create_access_token(identity=str(i), additional_claims={"role": "vendor"})
+                                  for i in vendor_ids[:200]]
+            self.admin_token = create_access_token(identity=str(admin_id), additional_claims={"role": "admin"})
+
+            stats = current_admin_stats()
+            self.data_size = {"products": stats.products_total, "buyers": stats.buyers, "vendors": stats.vendors}
+
+
+def browse(client, fx, rng):
+    client.call("browse: popular products", "GET", "/api/marketplace/popular-products")
+    for _ in range(3):
+        client.call("browse: product detail", "GET", f"/api/marketplace/products/{rng.choice(fx.product_ids)}")
+
+
+def search(client, fx, rng):
+    prefix = f"bench_buyer_{rng.randint(1, 99)}"
+    client.call("search: admin users", "GET", f"/api/admin/users?role=buyer&email_prefix={prefix}&limit=50",
+                token=fx.admin_token)
+
+
+def cart(client, fx, rng):
+    token = rng.choice(fx.buyer_tokens)
+    client.call("cart: add", "POST", "/api/cart/add", token=token,
+                json={"product_id": rng.choice(fx.product_ids), "quantity": 1})
+    client.call("cart: view", "GET", "/api/cart", token=token)
+
+
+def checkout(client, fx, rng):
+    token = rng.choice(fx.buyer_tokens)
+    product_id = rng.choice(fx.product_ids)
+    client.call("checkout: add to cart", "POST", "/api/cart/add", token=token,
+                json={"product_id": product_id, "quantity": 1})
+    client.call("checkout: place order", "POST", "/api/orders", token=token,
+                json={"reference": f"load-{uuid.uuid4().hex}", "items": [{"product_id": product_id, "quantity": 1}]})
+
+
+def vendor(client, fx, rng):
+    token = rng.choice(fx.vendor_tokens)
+    client.call("vendor: my products", "GET", "/api/vendor/my-products", token=token)
+    client.call("vendor: orders", "GET", "/api/vendor/orders", token=token)
+    client.call("vendor: storefront", "GET", "/api/vendor/storefront", token=token)
+
+
+SCENARIO_FUNCS = {"browse": browse, "search": search, "cart": cart, "checkout": checkout, "vendor": vendor}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIO_FUNCS:
+            raise SystemExit(f"Unknown scenario '{name}'; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def user_loop(client, fx, mix, stop, seed):
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while not stop.is_set():
+        SCENARIO_FUNCS[rng.choices(names, weights)[0]](client, fx, rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process test client)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"scenario=weight,... (default {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=8, help="simulated users")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--history", default=os.path.join("benchmarks", "results", "history.jsonl"))
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 slowdown counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    from main import create_app
+    app = create_app()
+    mix = parse_mix(args.mix)
+    fx = Fixtures(app, args.seed)
+    recorder = Recorder()
+    stop = threading.Event()
+    users = [
+        threading.Thread(target=user_loop, args=(AppClient(app, recorder, args.url), fx, mix, stop, args.seed + i),
+                         daemon=True)
+        for i in range(args.concurrency)
+    ]
+
+    print(f"{args.concurrency} users, mix {args.mix}, data {fx.data_size}, "
+          f"{'HTTP ' + args.url if args.url else 'in-process test client'}")
+    for user in users:
+        user.start()
+    time.sleep(args.warmup)
+    recorder.reset()
+    recorder.enabled = True
+    time.sleep(args.duration)
+    recorder.enabled = False
+    stop.set()
+    for user in users:
+        user.join(timeout=60)
+
+    results = {
+        operation: summarize(recorder.samples.get(operation, []), recorder.errors.get(operation, 0), args.duration)
+        for operation in sorted(set(recorder.samples) | set(recorder.errors))
+    }
+    print_table(results)
+
+    key = f"{'http' if args.url else 'inproc'}|{args.mix}|c={args.concurrency}|" \
+          f"p={fx.data_size['products']}|b={fx.data_size['buyers']}"
+    history = load_history(args.history)
+    previous, slower = regressions(history, key, results, args.threshold)
+    record_run(args.history, key, results, {
+        "mix": args.mix, "concurrency": args.concurrency, "duration": args.duration,
+        "url": args.url, "data_size": fx.data_size,
+    })
+
+    errors = failing(results)
+    if errors:
+        print(f"\n!!! {len(errors)} operation(s) had failed requests; their latencies only cover the successes:")
+        for name, count, rate in errors:
+            print(f"  ERRORS {name}: {count} failed ({rate:.1%})")
+
+    if previous is None:
+        print(f"\nNo earlier run with the same settings in {args.history}; recorded as the baseline.")
+    else:
+        print(f"\nCompared with {previous['at']} ({previous.get('revision') or 'unknown revision'}):")
+        if not slower:
+            print(f"  no regressions (p95 beyond {args.threshold:.0%}, error rate)")
+        for name, what in slower:
+            print(f"  REGRESSION {name}: {what}")
+    if args.fail_on_regression and (slower or errors):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Latency summaries and the run history shared by the benchmarks.
+
+Each run appends one JSON line to a history file. A new run is compared with
+the latest earlier run that used the same `key` (scenario mix, data size,
+concurrency). A p95 that got more than `threshold` slower, a higher error
+rate, or an operation that stopped succeeding at all is reported as a
+regression. Failed requests are left out of the latency samples, so any
+errors make that operation's percentiles meaningless on their own.
+"""
+import json
+import os
+import subprocess
+import time
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def error_rate(row):
+    """Failed share of an operation's requests; older history rows have no `error_rate`."""
+    total = row["requests"] + row["errors"]
+    return row["errors"] / total if total else 0.0
+
+
+def summarize(samples, errors, duration):
+    """Throughput and p50/p95/p99 (milliseconds) for one set of latency samples (seconds)."""
+    samples = sorted(samples)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / (len(samples) + errors), 4) if samples or errors else 0.0,
+        "rps": round(len(samples) / duration, 1) if duration else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(samples[-1] * 1000, 2) if samples else 0.0,
+    }
+
+
+def print_table(results):
+    print(f"{'operation':<32} {'reqs':>8} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in results.items():
+        print(f"{name:<32} {row['requests']:>8} {row['errors']:>7} {row['rps']:>9.1f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def record_run(path, key, results, params):
+    entry = {
+        "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "key": key,
+        "params": params,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(entry, sort_keys=True) + "\n")
+    return entry
+
+
+def failing(results):
+    """(operation, errors, error rate) for every operation that had any failed requests."""
+    return [(name, row["errors"], error_rate(row)) for name, row in results.items() if row["errors"]]
+
+
+def regressions(history, key, results, threshold):
+    """
+    (operation, description) for every operation that slowed by more than
+    `threshold` at p95, failed more often, or no longer succeeded at all.
+    """
+    previous = next((entry for entry in reversed(history) if entry.get("key") == key), None)
+    if previous is None:
+        return None, []
+    found = []
+    for name, row in results.items():
+        before = previous["results"].get(name)
+        if not before:
+            continue
+        if before["requests"] and not row["requests"]:
+            found.append((name, f"no successful requests (was {before['requests']})"))
+            continue
+        if error_rate(row) > error_rate(before):
+            found.append((name, f"error rate {error_rate(before):.2%} -> {error_rate(row):.2%}"))
+        if before["p95_ms"] and row["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            found.append((name, f"p95 {before['p95_ms']:.1f}ms -> {row['p95_ms']:.1f}ms"))
+    return previous, found
@@ -0,0 +1,282 @@
+"""
+Synthetic marketplace data for load tests.
+
+    python -m benchmarks.synthetic --vendors 5000 --buyers 200000 \\
+        --products 1000000 --orders 500000 --favourites 1000000
+
+Bulk-inserts into whatever DATABASE_URL points at, in multi-row INSERTs of
+--batch-size rows committed one batch at a time, so millions of rows load in
+minutes with flat memory. Rows get explicit ids after the current maximum
+and `bench_` names and emails, so running it again adds more data instead of
+clashing with what is there. Every generated account's password is
+--password. The numbers are reproducible for a given --seed.
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import select, func, text
+from core.imports import datetime, timedelta
+from core.extensions import db, bcrypt
+from core.admin_stats import reconcile_admin_stats
+from models.userModel import Buyers, Vendors
+from models.vendorModels import Category, Products, Storefront
+from models.orderModels import Order, OrderItem
+from models.favouriteModels import Favourites
+
+CATEGORIES = ("Electronics", "Fashion", "Books", "Home", "Beauty", "Sports", "Toys", "Groceries",
+              "Automotive", "Health", "Garden", "Music", "Office", "Pets", "Baby", "Jewelry")
+STATES = ("Lagos", "Abuja", "Kano", "Rivers", "Oyo", "Kaduna", "Enugu", "Delta", "Ogun", "Anambra")
+COUNTRIES = ("NG", "NG", "NG", "NG", "GH", "KE", "ZA", "US", "GB")
+ADJECTIVES = ("Classic", "Premium", "Compact", "Wireless", "Organic", "Vintage", "Smart", "Eco", "Deluxe", "Mini")
+NOUNS = ("Sneakers", "Headphones", "Backpack", "Blender", "Novel", "Lamp", "Watch", "Jacket", "Kettle", "Charger")
+
+
+def _first_free_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _ids(model):
+    return list(db.session.execute(select(model.id).order_by(model.id)).scalars())
+
+
+def _sync_sequence(table):
+    # Explicit ids don't advance PostgreSQL sequences; later app inserts would collide.
+    if db.engine.dialect.name == "postgresql":
+        quoted = db.engine.dialect.identifier_preparer.quote(table.name)
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{quoted}', 'id'), (SELECT MAX(id) FROM {quoted}))"
+        ))
+        db.session.commit()
+
+
+def bulk_insert(table, rows, batch_size):
+    """Insert an iterable of row dicts (all with the same keys) a batch at a time. Returns the row count."""
+    started = time.perf_counter()
+    total, batch = 0, []
+
+    def flush():
+        nonlocal total
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        total += len(batch)
+        batch.clear()
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    if total:
+        _sync_sequence(table)
+    elapsed = time.perf_counter() - started
+    print(f"  {table.name:<12} {total:>10} rows  {total / elapsed if elapsed else 0:>9.0f} rows/s")
+    return total
+
+
+def _recent(rng, now, days=365):
+    return now - timedelta(seconds=rng.randrange(days * 86400))
+
+
+def vendor_rows(rng, start, count, password_hash):
+    for vendor_id in range(start, start + count):
+        yield {
+            "id": vendor_id,
+            "firstname": f"Bench{vendor_id}",
+            "lastname": "Vendor",
+            "business_name": f"Bench Store {vendor_id}",
+            "business_type": rng.choice(("Retail", "Wholesale", "Services")),
+            "email": f"bench_vendor_{vendor_id}@example.com",
+            "phone": f"080{vendor_id:08d}"[-11:],
+            "password": password_hash,
+            "state": rng.choice(STATES),
+            "country": rng.choice(COUNTRIES),
+            "referral_code": f"BV{vendor_id}",
+            "kyc_status": rng.choices(("verified", "pending", "unverified", "rejected"), (70, 10, 15, 5))[0],
+        }
+
+
+def storefront_rows(rng, start, vendor_ids, now):
+    for offset, vendor_id in enumerate(vendor_ids):
+        yield {
+            "id": start + offset,
+            "business_name": f"Bench Store {vendor_id}",
+            "description": "Synthetic storefront",
+            "established_at": _recent(rng, now, days=3 * 365),
+            "ratings": round(rng.uniform(2.5, 5.0), 1),
+            "vendor_id": vendor_id,
+        }
+
+
+def buyer_rows(rng, start, count, password_hash):
+    for buyer_id in range(start, start + count):
+        yield {
+            "id": buyer_id,
+            "name": f"bench_buyer_{buyer_id}",
+            "email": f"bench_buyer_{buyer_id}@example.com",
+            "phone": f"070{buyer_id:08d}"[-11:],
+            "password": password_hash,
+            "role": "buyer",
+            "referral_code": f"BB{buyer_id}",
+            "state": rng.choice(STATES),
+            "country": rng.choice(COUNTRIES),
+        }
+
+
+def product_rows(rng, start, count, vendor_ids, category_ids, now):
+    for product_id in range(start, start + count):
+        posted = _recent(rng, now)
+        yield {
+            "id": product_id,
+            "product_name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {product_id}",
+            "product_price": rng.randrange(500, 500000, 50),
+            "description": "Synthetic product for load testing.",
+            "condition": rng.choice(("new", "used", "refurbished")),
+            "date_posted": posted,
+            "status": "active" if rng.random() < 0.9 else "inactive",
+            "visibility": rng.random() < 0.95,
+            "category_id": rng.choice(category_ids),
+            "vendor_id": rng.choice(vendor_ids),
+            "created_at": posted,
+        }
+
+
+def order_rows(rng, order_start, item_start, count, buyer_ids, product_ids, now, items_out):
+    """Orders, with their line items appended to `items_out` as each order is generated."""
+    item_id = item_start
+    for order_id in range(order_start, order_start + count):
+        status = rng.choices(("pending", "shipped", "delivered"), (20, 20, 60))[0]
+        total = 0.0
+        for _ in range(rng.randint(1, 4)):
+            product_id = rng.choice(product_ids)
+            price = float(rng.randrange(500, 200000, 50))
+            quantity = rng.randint(1, 3)
+            total += price * quantity
+            items_out.append({
+                "id": item_id, "order_id": order_id, "product_id": product_id,
+                "product_name": f"Product {product_id}", "quantity": quantity, "price": price, "status": status,
+            })
+            item_id += 1
+        yield {
+            "id": order_id,
+            "buyer_id": rng.choice(buyer_ids),
+            "total_amount": total,
+            "status": status,
+            "reference": f"bench-{order_id}",
+            "created_at": _recent(rng, now),
+        }
+
+
+def insert_orders(rng, count, buyer_ids, product_ids, now, batch_size):
+    """Like bulk_insert, but each batch of orders is committed together with its line items."""
+    started = time.perf_counter()
+    items, batch, total_items = [], [], 0
+    rows = order_rows(rng, _first_free_id(Order), _first_free_id(OrderItem), count,
+                      buyer_ids, product_ids, now, items)
+
+    def flush():
+        nonlocal total_items
+        db.session.execute(Order.__table__.insert(), batch)
+        db.session.execute(OrderItem.__table__.insert(), items)
+        db.session.commit()
+        total_items += len(items)
+        batch.clear()
+        items.clear()
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    _sync_sequence(Order.__table__)
+    _sync_sequence(OrderItem.__table__)
+    elapsed = time.perf_counter() - started
+    print(f"  {'order':<12} {count:>10} rows  {count / elapsed if elapsed else 0:>9.0f} rows/s  (+{total_items} items)")
+
+
+def favourite_rows(rng, start, count, buyer_ids, product_ids, now):
+    for favourite_id in range(start, start + count):
+        yield {
+            "id": favourite_id,
+            "buyer_id": rng.choice(buyer_ids),
+            "product_id": rng.choice(product_ids),
+            "date_added": _recent(rng, now),
+        }
+
+
+def ensure_categories():
+    existing = set(db.session.execute(select(Category.name)).scalars())
+    missing = [{"name": name} for name in CATEGORIES if name not in existing]
+    if missing:
+        db.session.execute(Category.__table__.insert(), missing)
+        db.session.commit()
+    return _ids(Category)
+
+
+def generate(vendors=0, buyers=0, products=0, orders=0, favourites=0,
+             batch_size=5000, seed=42, password="benchpass"):
+    """Add the requested numbers of rows. Call inside an app context."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+    category_ids = ensure_categories()
+
+    if vendors:
+        start = _first_free_id(Vendors)
+        bulk_insert(Vendors.__table__, vendor_rows(rng, start, vendors, password_hash), batch_size)
+        bulk_insert(Storefront.__table__,
+                    storefront_rows(rng, _first_free_id(Storefront), range(start, start + vendors), now),
+                    batch_size)
+    if buyers:
+        bulk_insert(Buyers.__table__, buyer_rows(rng, _first_free_id(Buyers), buyers, password_hash), batch_size)
+
+    if products:
+        vendor_ids = _ids(Vendors)
+        if not vendor_ids:
+            raise SystemExit("Products need vendors: pass --vendors too.")
+        bulk_insert(Products.__table__,
+                    product_rows(rng, _first_free_id(Products), products, vendor_ids, category_ids, now),
+                    batch_size)
+
+    if orders or favourites:
+        buyer_ids, product_ids = _ids(Buyers), _ids(Products)
+        if not buyer_ids or not product_ids:
+            raise SystemExit("Orders and favourites need buyers and products.")
+
+        if orders:
+            insert_orders(rng, orders, buyer_ids, product_ids, now, batch_size)
+        if favourites:
+            bulk_insert(Favourites.__table__,
+                        favourite_rows(rng, _first_free_id(Favourites), favourites, buyer_ids, product_ids, now),
+                        batch_size)
+
+    # Core inserts bypass the ORM hook that maintains the admin counters.
+    reconcile_admin_stats(snapshot=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vendors", type=int, default=1000)
+    parser.add_argument("--buyers", type=int, default=10000)
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--favourites", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="benchpass")
+    args = parser.parse_args()
+
+    from main import create_app
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        generate(args.vendors, args.buyers, args.products, args.orders, args.favourites,
+                 batch_size=args.batch_size, seed=args.seed, password=args.password)
+        print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
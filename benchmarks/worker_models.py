@@ -0,0 +1,126 @@
+"""
+Compare gunicorn worker models on the marketplace endpoints.
+
+    python -m benchmarks.worker_models --classes sync gthread gevent --clients 32 --duration 20
+
+For each worker class, starts `gunicorn "main:create_app()"` with the production config
+(gunicorn.conf.py) against whatever DATABASE_URL the environment points at,
+drives the popular-products listing and product detail pages from
+`--clients` concurrent keep-alive connections, and reports throughput and
+latency percentiles. Seed the database first so the pages have rows to render.
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from benchmarks.report import percentile
+
+LISTING = "/api/marketplace/popular-products"
+DETAIL = "/api/marketplace/products/{id}"
+
+
+def start_server(worker_class, port, workers, threads):
+    env = dict(os.environ, GUNICORN_WORKER_CLASS=worker_class, GUNICORN_BIND=f"127.0.0.1:{port}",
+               GUNICORN_ACCESS_LOG="", SCHEDULER_ENABLED="false")
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    if workers:
+        env["WEB_CONCURRENCY"] = str(workers)
+    if threads:
+        env["GUNICORN_THREADS"] = str(threads)
+    process = subprocess.Popen([sys.executable, "-m", "gunicorn", "main:create_app()"], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn ({worker_class}) exited: {process.stderr.read().decode()[-2000:]}")
+        try:
+            requests.get(f"http://127.0.0.1:{port}/ping", timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"gunicorn ({worker_class}) did not start within 60s")
+
+
+def product_ids(base_url):
+    products = requests.get(base_url + LISTING, timeout=30).json().get("products", [])
+    return [p["id"] for p in products] or [1]
+
+
+def client(base_url, ids, stop, detail_ratio, samples, errors, seed):
+    rng = random.Random(seed)
+    session = requests.Session()
+    while not stop.is_set():
+        path = DETAIL.format(id=rng.choice(ids)) if rng.random() < detail_ratio else LISTING
+        started = time.perf_counter()
+        try:
+            response = session.get(base_url + path, timeout=30)
+            ok = response.status_code < 500
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        if ok:
+            samples.append(elapsed)
+        else:
+            errors.append(elapsed)
+
+
+def run(worker_class, args):
+    process = start_server(worker_class, args.port, args.workers, args.threads)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        ids = product_ids(base_url)
+        samples, errors, stop = [], [], threading.Event()
+        threads = [
+            threading.Thread(target=client, args=(base_url, ids, stop, args.detail_ratio, samples, errors, i))
+            for i in range(args.clients)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(args.warmup)
+        samples.clear()
+        errors.clear()
+        time.sleep(args.duration)
+        stop.set()
+        for t in threads:
+            t.join()
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    samples.sort()
+    print(f"{worker_class:<8} {len(samples) / args.duration:9.1f} req/s  "
+          f"p50={percentile(samples, 50) * 1000:7.1f}ms  p95={percentile(samples, 95) * 1000:7.1f}ms  "
+          f"p99={percentile(samples, 99) * 1000:7.1f}ms  errors={len(errors)}")
+    if errors:
+        # Failed requests aren't in the samples, so these numbers don't compare with an error-free run.
+        print(f"!!! {worker_class}: {len(errors)} requests failed with 5xx or a connection error; "
+              f"check the server log before trusting its latencies")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--classes", nargs="+", default=["sync", "gthread", "gevent"])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20, help="seconds measured per worker class")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--detail-ratio", type=float, default=0.8, help="share of requests hitting product detail")
+    parser.add_argument("--workers", type=int, help="WEB_CONCURRENCY (default: the config's CPU-based sizing)")
+    parser.add_argument("--threads", type=int, help="GUNICORN_THREADS for gthread")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients, {args.duration:.0f}s per worker class, "
+          f"{args.detail_ratio:.0%} product detail / {1 - args.detail_ratio:.0%} listing")
+    for worker_class in args.classes:
+        run(worker_class, args)
+
+
+if __name__ == "__main__":
+    main()
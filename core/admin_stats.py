@@ -0,0 +1,248 @@
+from collections import Counter
+
+from sqlalchemy import event, select, case, insert, update, delete, inspect as sa_inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from core.imports import datetime, func, SQLAlchemyError, IntegrityError
+from core.extensions import db
+from models.userModel import Buyers, Vendors
+from models.vendorModels import Products, Storefront
+from models.statsModels import AdminStats, AdminStatsDelta, AdminStatsSnapshot
+
+STATS_ROW_ID = 1
+FOLD_BATCH_SIZE = 1000
+COUNTERS = ("buyers", "vendors", "storefronts", "products_total",
+            "products_active", "products_inactive", "products_hidden")
+ROW_COUNTERS = {Buyers: "buyers", Vendors: "vendors", Storefront: "storefronts"}
+
+
+def _product_flags(status, visibility):
+    # Column defaults, for rows whose values were never set explicitly.
+    status = "active" if status is None else status
+    visibility = True if visibility is None else visibility
+    return {
+        "products_total": 1,
+        "products_active": int(status == "active" and bool(visibility)),
+        "products_inactive": int(status != "active"),
+        "products_hidden": int(not visibility),
+    }
+
+
+def _old_and_new(obj, attr):
+    history = sa_inspect(obj).attrs[attr].history
+    if history.added:
+        new = history.added[0]
+    elif history.unchanged:
+        new = history.unchanged[0]
+    else:
+        new = None
+    old = history.deleted[0] if history.deleted else new
+    return old, new
+
+
+def _flush_deltas(session):
+    deltas = Counter()
+    for sign, objects in ((1, session.new), (-1, session.deleted)):
+        for obj in objects:
+            column = ROW_COUNTERS.get(type(obj))
+            if column:
+                deltas[column] += sign
+            elif isinstance(obj, Products):
+                # Read the loaded state only: touching an expired attribute of a
+                # just-deleted row would try to refresh it.
+                state = sa_inspect(obj).dict
+                for key, value in _product_flags(state.get("status"), state.get("visibility")).items():
+                    deltas[key] += sign * value
+
+    for obj in session.dirty:
+        if not isinstance(obj, Products) or obj in session.deleted:
+            continue
+        old_status, new_status = _old_and_new(obj, "status")
+        old_visible, new_visible = _old_and_new(obj, "visibility")
+        if old_status == new_status and old_visible == new_visible:
+            continue
+        before = _product_flags(old_status, old_visible)
+        after = _product_flags(new_status, new_visible)
+        for key in before:
+            deltas[key] += after[key] - before[key]
+
+    return {key: value for key, value in deltas.items() if value}
+
+
+def product_moderation_deltas(groups, status=None, visibility=None):
+    """
+    Counter changes for a bulk product update. `groups` is (status, visibility,
+    count) for the rows about to change; None leaves that column as it was.
+    """
+    deltas = Counter()
+    for old_status, old_visible, count in groups:
+        before = _product_flags(old_status, old_visible)
+        after = _product_flags(old_status if status is None else status,
+                               old_visible if visibility is None else visibility)
+        for key in before:
+            deltas[key] += (after[key] - before[key]) * count
+    return {key: value for key, value in deltas.items() if value}
+
+
+def product_removal_deltas(groups):
+    """Counter changes for deleting products outside the ORM; `groups` is (status, visibility, count)."""
+    deltas = Counter()
+    for status, visibility, count in groups:
+        for key, value in _product_flags(status, visibility).items():
+            deltas[key] -= value * count
+    return {key: value for key, value in deltas.items() if value}
+
+
+def apply_counter_deltas(deltas):
+    """Record `deltas` in the current transaction, for writes that skip the ORM."""
+    if deltas:
+        db.session.execute(insert(AdminStatsDelta.__table__).values(deltas))
+
+
+def _apply_counter_deltas(session, flush_context):
+    """
+    after_flush hook: record however many tracked rows this flush inserted,
+    deleted or re-statused as a delta row, inside the same transaction.
+    Appending instead of updating the counter row keeps concurrent writers
+    from queueing on one row lock. Bulk query.delete()/update() bypass this;
+    the reconciler catches those.
+    """
+    deltas = _flush_deltas(session)
+    if deltas:
+        session.connection().execute(insert(AdminStatsDelta.__table__).values(deltas))
+
+
+def ensure_stats_row():
+    """Create the counter row if it is missing; safe to race with other workers."""
+    table = AdminStats.__table__
+    dialect = db.session.get_bind(mapper=AdminStats).dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        db.session.execute(upsert(table).values(id=STATS_ROW_ID).on_conflict_do_nothing(index_elements=["id"]))
+        return
+    if db.session.get(AdminStats, STATS_ROW_ID) is None:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(table).values(id=STATS_ROW_ID))
+        except IntegrityError:
+            pass
+
+
+def init_admin_stats(app):
+    if not event.contains(Session, "after_flush", _apply_counter_deltas):
+        event.listen(Session, "after_flush", _apply_counter_deltas)
+
+    with app.app_context():
+        try:
+            ensure_stats_row()
+            db.session.commit()
+        except SQLAlchemyError:
+            # No table yet (before `flask db upgrade`); created on first use instead.
+            db.session.rollback()
+
+
+def _lock_stats_row():
+    ensure_stats_row()
+    db.session.execute(select(AdminStats.id).where(AdminStats.id == STATS_ROW_ID).with_for_update())
+
+
+def fold_admin_stats_deltas(upto=None):
+    """
+    Add pending delta rows into the counter row and delete them, in short
+    transactions of FOLD_BATCH_SIZE rows that hold the row lock. `upto` stops
+    at that delta id. Registered as a scheduled job.
+    """
+    folded = 0
+    while True:
+        _lock_stats_row()
+        query = select(AdminStatsDelta.id, *(getattr(AdminStatsDelta, key) for key in COUNTERS))
+        if upto is not None:
+            query = query.where(AdminStatsDelta.id <= upto)
+        rows = db.session.execute(query.order_by(AdminStatsDelta.id).limit(FOLD_BATCH_SIZE)).all()
+        if not rows:
+            db.session.commit()
+            break
+
+        # Delete exactly the rows that were summed: others may commit meanwhile.
+        totals = {key: sum(getattr(row, key) for row in rows) for key in COUNTERS}
+        changes = {key: getattr(AdminStats, key) + value for key, value in totals.items() if value}
+        if changes:
+            db.session.execute(update(AdminStats).where(AdminStats.id == STATS_ROW_ID).values(changes))
+        db.session.execute(delete(AdminStatsDelta).where(AdminStatsDelta.id.in_([row.id for row in rows])))
+        db.session.commit()
+        folded += len(rows)
+        if len(rows) < FOLD_BATCH_SIZE:
+            break
+    return {"folded": folded}
+
+
+def _true_counts():
+    """Every counter from the source tables, in one round trip."""
+    active = (Products.status == "active") & (Products.visibility.is_(True))
+    product_counts = select(
+        func.count(Products.id).label("products_total"),
+        func.coalesce(func.sum(case((active, 1), else_=0)), 0).label("products_active"),
+        func.coalesce(func.sum(case((Products.status != "active", 1), else_=0)), 0).label("products_inactive"),
+        func.coalesce(func.sum(case((Products.visibility.is_(False), 1), else_=0)), 0).label("products_hidden"),
+    ).subquery()
+    row = db.session.execute(select(
+        select(func.count(Buyers.id)).scalar_subquery().label("buyers"),
+        select(func.count(Vendors.id)).scalar_subquery().label("vendors"),
+        select(func.count(Storefront.id)).scalar_subquery().label("storefronts"),
+        *product_counts.c,
+    )).one()
+    return {key: int(getattr(row, key)) for key in COUNTERS}
+
+
+def reconcile_admin_stats(snapshot=True):
+    """
+    Recompute the counters from scratch, fix any drift and record a snapshot.
+    Registered as a scheduled job. Returns the drift that was corrected.
+
+    The counts run without locks. Deltas up to the newest one seen before
+    counting are folded in and then replaced by the counts; later deltas stay
+    pending on top. A write that commits while counting may be off by its own
+    delta until the next run.
+    """
+    ensure_stats_row()
+    watermark = db.session.execute(select(func.max(AdminStatsDelta.id))).scalar()
+    db.session.commit()
+    counts = _true_counts()
+    db.session.commit()
+    if watermark is not None:
+        fold_admin_stats_deltas(upto=watermark)
+
+    # A short transaction: only the row write happens under the lock.
+    stats = db.session.query(AdminStats).filter_by(id=STATS_ROW_ID).with_for_update().one()
+    drift = {key: counts[key] - (getattr(stats, key) or 0) for key in COUNTERS}
+    for key, value in counts.items():
+        setattr(stats, key, value)
+    stats.reconciled_at = datetime.utcnow()
+
+    if snapshot:
+        db.session.add(AdminStatsSnapshot(taken_at=stats.reconciled_at, **counts))
+    db.session.commit()
+    return {"drift": {key: value for key, value in drift.items() if value}}
+
+
+def current_admin_stats():
+    """
+    The counters as of now: the counter row plus any deltas not folded in
+    yet, in one query. Creates the row on first use.
+    """
+    pending = {
+        key: func.coalesce(select(func.sum(getattr(AdminStatsDelta, key))).scalar_subquery(), 0)
+        for key in COUNTERS
+    }
+    query = select(
+        *((getattr(AdminStats, key) + pending[key]).label(key) for key in COUNTERS),
+        func.coalesce(select(func.max(AdminStatsDelta.created_at)).scalar_subquery(),
+                      AdminStats.updated_at).label("updated_at"),
+        AdminStats.reconciled_at,
+    ).where(AdminStats.id == STATS_ROW_ID)
+
+    stats = db.session.execute(query).first()
+    if stats is None:
+        reconcile_admin_stats()
+        stats = db.session.execute(query).first()
+    return stats
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+
+import click
+from flask import Response
+from core.imports import request, url_for, redirect
+
+SPEC_ENDPOINT = "apispec_1"
+MANIFEST = "manifest.json"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def build_spec(app):
+    """The Swagger spec flasgger would serve, built from the route docstrings of `app`."""
+    from flasgger import Swagger
+    swagger = Swagger()
+    swagger.app = app
+    swagger.load_config(app)
+    with app.app_context():
+        return swagger.get_apispecs(SPEC_ENDPOINT)
+
+
+def write_spec(spec, out_dir):
+    """
+    Write `spec` as openapi.<hash>.json plus a manifest naming it, and remove
+    older builds. Returns the file name.
+    """
+    body = json.dumps(spec, sort_keys=True, separators=(",", ":"), default=str).encode()
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    filename = f"openapi.{digest}.json"
+    os.makedirs(out_dir, exist_ok=True)
+
+    path = os.path.join(out_dir, filename)
+    with open(path + ".tmp", "wb") as f:
+        f.write(body)
+    os.replace(path + ".tmp", path)
+
+    manifest = os.path.join(out_dir, MANIFEST)
+    with open(manifest + ".tmp", "w") as f:
+        json.dump({"file": filename, "hash": digest}, f)
+    os.replace(manifest + ".tmp", manifest)
+
+    for entry in os.scandir(out_dir):
+        if entry.name.startswith("openapi.") and entry.name.endswith(".json") and entry.name != filename:
+            os.remove(entry.path)
+    return filename
+
+
+class PrecompiledSpec:
+    """A built spec, held in memory and served with its hash as ETag."""
+
+    def __init__(self, body, digest):
+        self.body = body
+        self.digest = digest
+
+    @classmethod
+    def load(cls, spec_dir):
+        try:
+            with open(os.path.join(spec_dir, MANIFEST)) as f:
+                manifest = json.load(f)
+            with open(os.path.join(spec_dir, manifest["file"]), "rb") as f:
+                return cls(f.read(), manifest["hash"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def response(self, cache_control):
+        response = Response(self.body, mimetype="application/json")
+        response.set_etag(self.digest)
+        response.headers["Cache-Control"] = cache_control
+        return response.make_conditional(request)
+
+
+def init_api_docs(app):
+    """
+    API documentation.
+
+    With SWAGGER_ENABLED, flasgger serves the Swagger UI at /apidocs and
+    builds /apispec_1.json from the route docstrings on its first request.
+    flasgger (and the YAML and JSON-schema libraries it pulls in) is only
+    imported in that case.
+
+    In production, run `flask build-openapi` at build time instead and set
+    SWAGGER_ENABLED=false. The compiled spec in OPENAPI_SPEC_DIR is then
+    served without parsing anything: at /openapi/<hash>.json with a
+    one-year immutable cache, and at /openapi.json and /apispec_1.json
+    (revalidated by ETag, so clients pick up a new build immediately).
+    """
+    app.config.setdefault("SWAGGER_ENABLED", True)
+    if not app.config.get("OPENAPI_SPEC_DIR"):
+        app.config["OPENAPI_SPEC_DIR"] = os.path.join(app.root_path, "static", "openapi")
+
+    @app.cli.command("build-openapi")
+    @click.option("--out", default=None, help="Output directory (default OPENAPI_SPEC_DIR).")
+    def build_openapi_command(out):
+        """Compile the route docstrings into a content-hashed OpenAPI JSON file."""
+        filename = write_spec(build_spec(app), out or app.config["OPENAPI_SPEC_DIR"])
+        click.echo(f"Wrote {filename}")
+
+    if app.config["SWAGGER_ENABLED"]:
+        from flasgger import Swagger
+        swagger = Swagger()
+        swagger.init_app(app)
+        return swagger
+
+    spec = PrecompiledSpec.load(app.config["OPENAPI_SPEC_DIR"])
+    if spec is None:
+        app.logger.warning(
+            "SWAGGER_ENABLED is false but no compiled spec was found in %s: /openapi.json and "
+            "/apispec_1.json will 404. Run `flask build-openapi` at build time.",
+            app.config["OPENAPI_SPEC_DIR"]
+        )
+        return None
+
+    def hashed_spec(digest):
+        if digest != spec.digest:
+            return redirect(url_for("openapi_hashed", digest=spec.digest))
+        return spec.response(IMMUTABLE)
+
+    def current_spec():
+        return spec.response("public, no-cache")
+
+    app.add_url_rule("/openapi/<string:digest>.json", "openapi_hashed", hashed_spec, methods=["GET"])
+    app.add_url_rule("/openapi.json", "openapi", current_spec, methods=["GET"])
+    app.add_url_rule(f"/{SPEC_ENDPOINT}.json", SPEC_ENDPOINT, current_spec, methods=["GET"])
+    app.extensions["openapi_spec"] = spec
+    return spec
@@ -1,14 +1,28 @@
 from datetime import timedelta
 import os
 from dotenv import load_dotenv
+from core.db_engine import engine_options_from_env
 
 load_dotenv()
 class Config:
     #SQLALCHEMY_DATABASE_URI = "sqlite:///mydatabase.db"
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool size, overflow, recycle, pre-ping and timeouts from DB_* env vars (see core/db_engine.py).
+    # Keep DB_POOL_SIZE at least as large as the gunicorn threads per worker.
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options_from_env(SQLALCHEMY_DATABASE_URI)
+    # Read replicas for @read_only GET views (see core/replicas.py), comma separated.
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    SQLALCHEMY_BINDS = {
+        f"replica_{i}": {"url": url, **engine_options_from_env(url)} for i, url in enumerate(DATABASE_REPLICA_URLS)
+    }
+    REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))  # read-your-writes window
+    REPLICA_MAX_LAG_SECONDS = int(os.getenv("REPLICA_MAX_LAG_SECONDS", 60))  # > heartbeat interval; 0 disables
+    REPLICA_HEARTBEAT_SECONDS = int(os.getenv("REPLICA_HEARTBEAT_SECONDS", 30))
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 100 * 1024 * 1024))
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", 30))  # seconds, 0 disables
 
     MAIL_SERVER = 'mail.bizengo.com'
     MAIL_PORT = 465
@@ -18,6 +32,67 @@ class Config:
     MAIL_PASSWORD = os.getenv("PASSWORD_FOR_EMAIL")
     MAIL_DEFAULT_SENDER = os.getenv("USERNAME_FOR_EMAIL")
 
+    # Outbound email queue (see core/email_queue.py)
+    EMAIL_QUEUE_WORKERS = int(os.getenv("EMAIL_QUEUE_WORKERS", 1))
+    EMAIL_QUEUE_BATCH_SIZE = int(os.getenv("EMAIL_QUEUE_BATCH_SIZE", 20))
+    EMAIL_QUEUE_MAX_ATTEMPTS = int(os.getenv("EMAIL_QUEUE_MAX_ATTEMPTS", 5))
+    EMAIL_SMTP_POOL_SIZE = int(os.getenv("EMAIL_SMTP_POOL_SIZE", 2))
+
+    # IP geolocation (see core/geolocation.py)
+    GEOIP_DATABASE_PATH = os.getenv("GEOIP_DATABASE_PATH")  # GeoLite2-City.mmdb
+    GEOIP_REMOTE_ENABLED = os.getenv("GEOIP_REMOTE_ENABLED", "true").lower() == "true"
+    GEOIP_REMOTE_TOKEN = os.getenv("IPINFO_TOKEN")
+    GEOIP_REMOTE_TIMEOUT = float(os.getenv("GEOIP_REMOTE_TIMEOUT", 1.5))
+    GEOIP_CACHE_TTL = int(os.getenv("GEOIP_CACHE_TTL", 86400))
+
+    # Periodic jobs (see core/scheduler.py)
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    PURGE_INTERVAL_SECONDS = int(os.getenv("PURGE_INTERVAL_SECONDS", 900))
+    PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", 1000))
+
+    # Product image variants (see core/image_variants.py)
+    IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", 2))
+    IMAGE_VARIANT_BACKLOG = int(os.getenv("IMAGE_VARIANT_BACKLOG", 500))
+
+    # Outbound base64 image uploads (see core/image_uploader.py)
+    IMAGE_UPLOAD_URL = os.getenv("IMAGE_UPLOAD_URL", "https://api.bizengo.com/images")
+    IMAGE_UPLOAD_WORKERS = int(os.getenv("IMAGE_UPLOAD_WORKERS", 4))
+    IMAGE_UPLOAD_CONNECT_TIMEOUT = float(os.getenv("IMAGE_UPLOAD_CONNECT_TIMEOUT", 3.05))
+    IMAGE_UPLOAD_READ_TIMEOUT = float(os.getenv("IMAGE_UPLOAD_READ_TIMEOUT", 30))
+    IMAGE_UPLOAD_RETRIES = int(os.getenv("IMAGE_UPLOAD_RETRIES", 2))
+
+    # Image serving (see routes/images.py)
+    USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "false").lower() == "true"
+    IMAGE_HOT_CACHE_BYTES = int(os.getenv("IMAGE_HOT_CACHE_BYTES", 0))  # 0 disables
+
+    # Orphaned image collection (see core/image_gc.py)
+    IMAGE_GC_INTERVAL_SECONDS = int(os.getenv("IMAGE_GC_INTERVAL_SECONDS", 86400))
+    IMAGE_GC_GRACE_HOURS = int(os.getenv("IMAGE_GC_GRACE_HOURS", 24))
+    IMAGE_GC_SOFT_DELETE_DAYS = int(os.getenv("IMAGE_GC_SOFT_DELETE_DAYS", 30))
+
+    # KYC document ingestion (see core/kyc_ingest.py)
+    KYC_UPLOAD_WORKERS = int(os.getenv("KYC_UPLOAD_WORKERS", 4))
+    KYC_UPLOAD_MAX_ATTEMPTS = int(os.getenv("KYC_UPLOAD_MAX_ATTEMPTS", 5))
+    KYC_STAGING_DIR = os.getenv("KYC_STAGING_DIR")  # defaults to <instance>/kyc_staging
+
+    # Admin dashboard counters (see core/admin_stats.py)
+    ADMIN_STATS_RECONCILE_SECONDS = int(os.getenv("ADMIN_STATS_RECONCILE_SECONDS", 3600))
+    ADMIN_STATS_FOLD_SECONDS = int(os.getenv("ADMIN_STATS_FOLD_SECONDS", 60))  # delta rows -> counter row
+
+    # Request metrics at /metrics (see core/metrics.py). For gunicorn, also set
+    # PROMETHEUS_MULTIPROC_DIR to an empty directory shared by all workers.
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # bearer token for scrapes; /metrics 404s without it outside debug
+
+    # Per-request query counting (see core/query_stats.py)
+    QUERY_STATS_N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_STATS_N_PLUS_ONE_THRESHOLD", 5))  # 0 disables
+    QUERY_STATS_SERVER_TIMING = os.getenv("QUERY_STATS_SERVER_TIMING", "true").lower() == "true"
+
+    # API docs (see core/api_docs.py). In production, disable runtime docstring
+    # parsing and serve the spec compiled by `flask build-openapi` instead.
+    SWAGGER_ENABLED = os.getenv("SWAGGER_ENABLED", "true").lower() == "true"
+    OPENAPI_SPEC_DIR = os.getenv("OPENAPI_SPEC_DIR")  # defaults to static/openapi
+
     CLOUDINARY_CLOUD_NAME = os.environ.get("CLOUDINARY_CLOUD_NAME")
     CLOUDINARY_API_KEY = os.environ.get("CLOUDINARY_API_KEY")
     CLOUDINARY_API_SECRET = os.environ.get("CLOUDINARY_API_SECRET")
@@ -0,0 +1,110 @@
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() == "true"
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        # Imported here so core.config (which needs engine_options_from_env)
+        # doesn't pull prometheus_client into every importer.
+        from core.metrics import DB_POOL_CHECKOUT_WAIT
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def engine_options_from_env(uri):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for `uri`, tuned from DB_* environment variables.
+
+    Server databases get a bounded, pre-pinged, recycled connection pool (so
+    idle connections the server has already dropped are never handed out),
+    plus connect and statement timeouts. SQLite keeps SQLAlchemy's default
+    pool; its tuning happens in PRAGMAs on connect (see init_db_engine).
+    """
+    if not uri or uri.startswith("sqlite"):
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        # Below MySQL's wait_timeout and typical load-balancer idle limits.
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        "pool_use_lifo": True,  # lets surplus connections sit idle long enough to be recycled
+    }
+
+    connect_timeout = _env_int("DB_CONNECT_TIMEOUT", 10)
+    statement_timeout_ms = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    connect_args = {"connect_timeout": connect_timeout}
+    if uri.startswith(("postgres", "postgresql")):
+        if statement_timeout_ms:
+            connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    elif uri.startswith(("mysql", "mariadb")):
+        if statement_timeout_ms:
+            # MySQL only enforces this for read-only SELECTs.
+            connect_args["init_command"] = f"SET SESSION max_execution_time={statement_timeout_ms}"
+    options["connect_args"] = connect_args
+    return options
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')}")
+        cursor.execute(f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}")
+        cursor.execute(f"PRAGMA mmap_size={_env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)}")
+        cursor.execute(f"PRAGMA busy_timeout={_env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)}")
+    finally:
+        cursor.close()
+
+
+def _instrument_pool(pool, name):
+    from core.metrics import DB_POOL_CAPACITY, DB_POOL_CHECKED_OUT
+    capacity = pool.size() + pool._max_overflow if isinstance(pool, QueuePool) else None
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+    reported_pid = [None]
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        # Report capacity from the process that actually uses the pool, i.e.
+        # after any gunicorn fork, so the gauge sums correctly across workers.
+        if capacity is not None and reported_pid[0] != os.getpid():
+            reported_pid[0] = os.getpid()
+            DB_POOL_CAPACITY.labels(name).set(capacity)
+        checked_out.inc()
+
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+
+
+def init_db_engine(app, db):
+    """Attach SQLite PRAGMAs and pool metrics to every engine. Call after db.init_app(app)."""
+    with app.app_context():
+        engines = list(db.engines.items())
+
+    for key, engine in engines:
+        if engine.dialect.name == "sqlite":
+            if not event.contains(engine, "connect", _sqlite_pragmas):
+                event.listen(engine, "connect", _sqlite_pragmas)
+        elif not getattr(engine.pool, "_metrics_installed", False):
+            _instrument_pool(engine.pool, key or "primary")
+            engine.pool._metrics_installed = True
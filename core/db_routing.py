@@ -0,0 +1,24 @@
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql import Select
+
+
+def _is_plain_read(clause):
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+class RoutingSession(Session):
+    """
+    Session that sends plain SELECTs to the read replica chosen for the
+    current request (see core/replicas.py). Everything else - flushes,
+    UPDATE/DELETE statements, SELECT ... FOR UPDATE, raw text() SQL and
+    any work outside a request - goes to the primary as before.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            replica = g.get("_db_replica")
+            if replica is not None and _is_plain_read(clause):
+                g._db_replica_used = True
+                return self._db.engines[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
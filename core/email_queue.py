@@ -0,0 +1,286 @@
+import os
+import smtplib
+import socket
+import threading
+import uuid
+from queue import Queue, Empty, Full
+
+import click
+from core.imports import Message, datetime, timedelta
+from core.extensions import db
+from models.emailModels import EmailJob
+
+
+class SMTPConnectionPool:
+    """
+    Keeps a small number of authenticated SMTP connections open so that
+    workers don't pay a fresh SSL handshake + login for every message.
+    """
+
+    def __init__(self, config, size=2):
+        self.config = config
+        self.size = size
+        self._idle = Queue(maxsize=size)
+
+    def _connect(self):
+        cfg = self.config
+        timeout = cfg.get("MAIL_TIMEOUT", 10)
+        if cfg.get("MAIL_USE_SSL"):
+            host = smtplib.SMTP_SSL(cfg["MAIL_SERVER"], cfg["MAIL_PORT"], timeout=timeout)
+        else:
+            host = smtplib.SMTP(cfg["MAIL_SERVER"], cfg["MAIL_PORT"], timeout=timeout)
+        if cfg.get("MAIL_USE_TLS"):
+            host.starttls()
+        if cfg.get("MAIL_USERNAME") and cfg.get("MAIL_PASSWORD"):
+            host.login(cfg["MAIL_USERNAME"], cfg["MAIL_PASSWORD"])
+        return host
+
+    def acquire(self):
+        """Return a live connection, reusing an idle one when it still answers NOOP."""
+        while True:
+            try:
+                host = self._idle.get_nowait()
+            except Empty:
+                return self._connect()
+            try:
+                if host.noop()[0] == 250:
+                    return host
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(host)
+
+    def release(self, host, broken=False):
+        if broken:
+            self._close(host)
+            return
+        try:
+            self._idle.put_nowait(host)
+        except Full:
+            self._close(host)
+
+    def close_all(self):
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except Empty:
+                return
+
+    @staticmethod
+    def _close(host):
+        try:
+            host.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+
+class EmailQueue:
+    """
+    Persistent outbound email queue.
+
+    Routes call `enqueue()` which only adds an `EmailJob` row to the current
+    session; the caller's commit makes it visible to the workers. Workers
+    claim jobs in batches, deliver them over pooled SMTP connections and
+    reschedule failures with exponential backoff.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.pool = None
+        self._workers = []
+        self._workers_pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault("EMAIL_QUEUE_WORKERS", 1)
+        app.config.setdefault("EMAIL_QUEUE_BATCH_SIZE", 20)
+        app.config.setdefault("EMAIL_QUEUE_POLL_INTERVAL", 2.0)
+        app.config.setdefault("EMAIL_QUEUE_MAX_ATTEMPTS", 5)
+        app.config.setdefault("EMAIL_QUEUE_BACKOFF_BASE", 30)
+        app.config.setdefault("EMAIL_QUEUE_LEASE_SECONDS", 300)
+        app.config.setdefault("EMAIL_SMTP_POOL_SIZE", 2)
+
+        self.pool = SMTPConnectionPool(app.config, size=app.config["EMAIL_SMTP_POOL_SIZE"])
+        app.extensions["email_queue"] = self
+
+        @app.cli.command("email-worker")
+        @click.option("--once", is_flag=True, help="Drain the queue once and exit.")
+        def email_worker_command(once):
+            """Deliver queued emails from the email_jobs table."""
+            if once:
+                with app.app_context():
+                    print(f"Delivered {self.drain()} queued email(s)")
+                return
+            self.run_forever()
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def enqueue(self, to, subject, body):
+        job = EmailJob(recipient=to, subject=subject, html_body=body)
+        db.session.add(job)
+        self.start_workers()
+        return job
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+    def _claim_batch(self, worker_id):
+        cfg = self.app.config
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=cfg["EMAIL_QUEUE_LEASE_SECONDS"])
+
+        candidate_ids = [
+            row.id for row in db.session.query(EmailJob.id)
+            .filter(
+                ((EmailJob.status == "queued") & (EmailJob.next_attempt_at <= now)) |
+                ((EmailJob.status == "sending") & (EmailJob.locked_at < stale))
+            )
+            .order_by(EmailJob.next_attempt_at)
+            .limit(cfg["EMAIL_QUEUE_BATCH_SIZE"])
+        ]
+        if not candidate_ids:
+            return []
+
+        # Conditional update so two workers can't claim the same row.
+        EmailJob.query.filter(
+            EmailJob.id.in_(candidate_ids),
+            ((EmailJob.status == "queued") |
+             ((EmailJob.status == "sending") & (EmailJob.locked_at < stale)))
+        ).update(
+            {"status": "sending", "locked_by": worker_id, "locked_at": now},
+            synchronize_session=False
+        )
+        db.session.commit()
+
+        return EmailJob.query.filter_by(status="sending", locked_by=worker_id).all()
+
+    def _deliver(self, host, job):
+        msg = Message(subject=job.subject, recipients=[job.recipient])
+        msg.html = job.html_body
+        host.sendmail(msg.sender, msg.send_to, msg.as_bytes(), msg.mail_options, msg.rcpt_options)
+
+    def _mark_failed(self, job, error):
+        cfg = self.app.config
+        job.attempts += 1
+        job.last_error = str(error)[:1000]
+        job.locked_by = None
+        job.locked_at = None
+        if job.attempts >= cfg["EMAIL_QUEUE_MAX_ATTEMPTS"]:
+            job.status = "failed"
+        else:
+            job.status = "queued"
+            delay = cfg["EMAIL_QUEUE_BACKOFF_BASE"] * (2 ** (job.attempts - 1))
+            job.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+
+    def drain(self, worker_id=None):
+        """Claim and deliver one batch. Returns the number of emails sent."""
+        worker_id = worker_id or uuid.uuid4().hex
+        jobs = self._claim_batch(worker_id)
+        if not jobs:
+            return 0
+
+        sent = 0
+        host = None
+        try:
+            host = self.pool.acquire()
+        except (smtplib.SMTPException, OSError) as e:
+            print(f"Error connecting to SMTP server: {e}")
+            for job in jobs:
+                self._mark_failed(job, e)
+            db.session.commit()
+            return 0
+
+        broken = False
+        for job in jobs:
+            if broken:
+                # Connection died mid-batch: reconnect once for the remainder.
+                try:
+                    host = self.pool.acquire()
+                    broken = False
+                except (smtplib.SMTPException, OSError) as e:
+                    self._mark_failed(job, e)
+                    continue
+            try:
+                self._deliver(host, job)
+            except smtplib.SMTPRecipientsRefused as e:
+                job.attempts += 1
+                job.status = "failed"
+                job.last_error = str(e)[:1000]
+            except smtplib.SMTPServerDisconnected as e:
+                self._mark_failed(job, e)
+                self.pool.release(host, broken=True)
+                broken = True
+            except smtplib.SMTPException as e:
+                # SMTPException subclasses OSError, so this must come before
+                # the socket errors. The server rejected this message but the
+                # connection is still usable, unless it answered 421 and
+                # smtplib closed it.
+                self._mark_failed(job, e)
+                if host.sock is None:
+                    self.pool.release(host, broken=True)
+                    broken = True
+            except (socket.timeout, OSError) as e:
+                self._mark_failed(job, e)
+                self.pool.release(host, broken=True)
+                broken = True
+            else:
+                job.status = "sent"
+                job.attempts += 1
+                job.sent_at = datetime.utcnow()
+                job.last_error = None
+                sent += 1
+
+        if not broken:
+            self.pool.release(host)
+        db.session.commit()
+        return sent
+
+    def run_forever(self, worker_id=None):
+        worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        interval = self.app.config["EMAIL_QUEUE_POLL_INTERVAL"]
+        with self.app.app_context():
+            while not self._stop.is_set():
+                try:
+                    sent = self.drain(worker_id)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Email worker {worker_id} error: {e}")
+                    sent = 0
+                finally:
+                    db.session.remove()
+                if not sent:
+                    self._stop.wait(interval)
+            self.pool.close_all()
+
+    def start_workers(self, count=None):
+        """
+        Start background delivery threads inside the current process.
+        Called lazily on first enqueue so CLI commands and the gunicorn
+        master never spawn threads; safe to call repeatedly and after fork.
+        """
+        count = self.app.config["EMAIL_QUEUE_WORKERS"] if count is None else count
+        if count <= 0 or self._workers_pid == os.getpid():
+            return
+        with self._lock:
+            if self._workers_pid == os.getpid():
+                return
+            self._workers_pid = os.getpid()
+            self._workers = []
+            for _ in range(count):
+                worker = threading.Thread(target=self.run_forever, name="email-worker", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+        self._workers_pid = None
+
+
+email_queue = EmailQueue()
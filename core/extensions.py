@@ -1,9 +1,9 @@
-from core.imports import Bcrypt, Swagger, JWTManager, SQLAlchemy, CORS, Migrate, Mail
+from core.imports import Bcrypt, JWTManager, SQLAlchemy, CORS, Migrate, Mail
+from core.db_routing import RoutingSession
 
 jwt = JWTManager()
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
-swagger = Swagger()
 cors = CORS()
 mail = Mail()
 bcrypt = Bcrypt()
@@ -0,0 +1,167 @@
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor
+
+from core.cache import TTLCache
+
+
+class GeoProvider:
+    """Interface for IP -> (state, country) lookups. Returns (None, None) on a miss."""
+
+    def lookup(self, ip_address):
+        raise NotImplementedError
+
+
+class MaxMindProvider(GeoProvider):
+    """
+    Offline lookups against a local MaxMind GeoIP2/GeoLite2 City database.
+    The file is memory-mapped, so lookups are a few microseconds and the
+    pages are shared between gunicorn workers.
+    """
+
+    def __init__(self, db_path):
+        self.reader = None
+        try:
+            import maxminddb
+            self.reader = maxminddb.open_database(db_path, maxminddb.MODE_MMAP)
+        except ImportError:
+            print("maxminddb is not installed; offline geolocation disabled.")
+        except (OSError, ValueError) as e:
+            print(f"Could not open GeoIP database {db_path}: {e}")
+
+    def lookup(self, ip_address):
+        if self.reader is None:
+            return None, None
+        try:
+            record = self.reader.get(ip_address)
+        except ValueError:
+            return None, None
+        if not record:
+            return None, None
+
+        subdivisions = record.get("subdivisions") or [{}]
+        state = subdivisions[0].get("names", {}).get("en")
+        country = record.get("country", {}).get("iso_code")
+        return state, country
+
+
+class IPInfoProvider(GeoProvider):
+    """Remote lookups via ipinfo.io over a keep-alive session with a hard timeout."""
+
+    def __init__(self, url_template="https://ipinfo.io/{ip}/json", timeout=1.5, token=None):
+        self.url_template = url_template
+        self.timeout = timeout
+        self.token = token
+        self._session = None
+
+    @property
+    def session(self):
+        # requests is imported on the first lookup, not at startup.
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def lookup(self, ip_address):
+        import requests
+        params = {"token": self.token} if self.token else None
+        try:
+            response = self.session.get(
+                self.url_template.format(ip=ip_address), params=params, timeout=self.timeout
+            )
+            if response.status_code == 200:
+                data = response.json()
+                return data.get("region"), data.get("country")  # state, country
+        except (requests.RequestException, ValueError):
+            pass
+        return None, None
+
+
+class GeoLocator:
+    """
+    Combines an offline database with a cached remote provider.
+
+    `locate()` never touches the network: it answers from the local
+    database or the cache. Misses can be handed to `locate_later()`, which
+    resolves them on a small background pool and invokes a callback.
+    """
+
+    def __init__(self, app=None):
+        self.local = None
+        self.remote = None
+        self.cache = TTLCache()
+        self.executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        cfg = app.config
+        db_path = cfg.get("GEOIP_DATABASE_PATH")
+        self.local = MaxMindProvider(db_path) if db_path else None
+        if cfg.get("GEOIP_REMOTE_ENABLED", True):
+            self.remote = IPInfoProvider(
+                timeout=cfg.get("GEOIP_REMOTE_TIMEOUT", 1.5),
+                token=cfg.get("GEOIP_REMOTE_TOKEN"),
+            )
+        self.cache = TTLCache(
+            maxsize=cfg.get("GEOIP_CACHE_SIZE", 10000),
+            ttl=cfg.get("GEOIP_CACHE_TTL", 86400),
+        )
+        self.executor = ThreadPoolExecutor(max_workers=cfg.get("GEOIP_REMOTE_WORKERS", 2),
+                                           thread_name_prefix="geoip")
+        app.extensions["geolocator"] = self
+
+    @staticmethod
+    def client_ip(forwarded_for, remote_addr):
+        """First public address from X-Forwarded-For, falling back to remote_addr."""
+        candidates = [p.strip() for p in (forwarded_for or "").split(",") if p.strip()]
+        candidates.append(remote_addr)
+        for candidate in candidates:
+            try:
+                ip = ipaddress.ip_address(candidate)
+            except (TypeError, ValueError):
+                continue
+            if ip.is_global:
+                return str(ip)
+        return None
+
+    def locate(self, ip_address):
+        """Non-blocking lookup. Returns (state, country), possibly (None, None)."""
+        if not ip_address:
+            return None, None
+
+        if self.local is not None:
+            state, country = self.local.lookup(ip_address)
+            if state or country:
+                return state, country
+
+        cached = self.cache.get(ip_address)
+        if cached is not None:
+            return cached
+        return None, None
+
+    def _resolve_remote(self, ip_address):
+        cached = self.cache.get(ip_address)
+        if cached is not None:
+            return cached
+        result = self.remote.lookup(ip_address)
+        # Misses are cached too so a bad address doesn't hit the provider on every signup.
+        self.cache.set(ip_address, result)
+        return result
+
+    def locate_later(self, ip_address, callback):
+        """Resolve `ip_address` remotely in the background and call `callback(state, country)`."""
+        if not ip_address or self.remote is None or self.executor is None:
+            return
+
+        def task():
+            state, country = self._resolve_remote(ip_address)
+            if state or country:
+                try:
+                    callback(state, country)
+                except Exception as e:
+                    print(f"Geolocation callback failed for {ip_address}: {e}")
+
+        self.executor.submit(task)
+
+
+geolocator = GeoLocator()
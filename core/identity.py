@@ -0,0 +1,84 @@
+from flask_jwt_extended import get_current_user
+from core.extensions import db, jwt
+from core.cache import TTLCache
+from models.userModel import Admins, Buyers, Vendors
+
+ROLE_MODELS = {"admin": Admins, "buyer": Buyers, "vendor": Vendors}
+
+# Cross-request cache of "this account exists" answers, keyed by (role, id).
+# Only booleans are cached: ORM rows must never outlive their session.
+_existence_cache = TTLCache(maxsize=50000, ttl=30)
+
+
+class Identity:
+    """
+    The authenticated caller, built from JWT claims alone.
+
+    `id` and `role` cost nothing. `exists()` answers from the short-TTL
+    cache when it can, and `row` loads the full model instance once per
+    request.
+    """
+
+    def __init__(self, user_id, role):
+        self.id = int(user_id) if user_id is not None and str(user_id).isdigit() else user_id
+        self.role = role
+        self._row = None
+        self._row_loaded = False
+
+    @property
+    def model(self):
+        return ROLE_MODELS.get(self.role)
+
+    @property
+    def row(self):
+        if not self._row_loaded:
+            self._row = db.session.get(self.model, self.id) if self.model else None
+            self._row_loaded = True
+            if self._row is not None:
+                _existence_cache.set((self.role, self.id), True)
+        return self._row
+
+    def exists(self):
+        if self.model is None:
+            return False
+        if self._row_loaded:
+            return self._row is not None
+
+        key = (self.role, self.id)
+        if _existence_cache.get(key):
+            return True
+
+        found = db.session.query(self.model.id).filter(self.model.id == self.id).first() is not None
+        if found:
+            _existence_cache.set(key, True)
+        return found
+
+
+@jwt.user_lookup_loader
+def load_identity(jwt_header, jwt_data):
+    # Runs on every protected request, so it must not touch the database.
+    return Identity(jwt_data.get("sub"), jwt_data.get("role"))
+
+
+def current_identity():
+    """Identity of the caller for the current request (claims only, no query)."""
+    # flask_jwt_extended stores the loader's result on the request context.
+    return get_current_user()
+
+
+def current_user_row():
+    """Full Admins/Buyers/Vendors row of the caller, loaded at most once per request."""
+    return current_identity().row
+
+
+def invalidate_user(role, user_id):
+    """Drop cached identity data after a profile change or account deletion."""
+    _existence_cache.delete((role, int(user_id)))
+
+
+def init_identity_cache(app):
+    global _existence_cache
+    _existence_cache = TTLCache(
+        maxsize=app.config.get("IDENTITY_CACHE_SIZE", 50000),
+        ttl=app.config.get("IDENTITY_CACHE_TTL", 30),
+    )
@@ -0,0 +1,182 @@
+import os
+import time
+
+import click
+from sqlalchemy import select
+from core.imports import datetime, timedelta
+from core.extensions import db
+from models.userModel import Buyers, Vendors
+from models.vendorModels import ProductImages, Storefront, ImageBlob, ImageVariant
+
+BATCH_SIZE = 1000
+
+
+def _stream(statement):
+    """Iterate a single-column select in server-side batches."""
+    return db.session.execute(statement.execution_options(yield_per=BATCH_SIZE)).scalars()
+
+
+def _names_under(store, urls):
+    """File names in `store` referenced by `urls` (anything else is ignored)."""
+    prefix = store.base_url + "/"
+    names = set()
+    for url in urls:
+        if isinstance(url, str) and url.startswith(prefix):
+            name = url[len(prefix):]
+            if "/" not in name:
+                names.add(name)
+    return names
+
+
+class ImageGarbageCollector:
+    """
+    Mark-and-sweep collector for image files.
+
+    Mark: stream every live reference (ProductImages, profile pictures,
+    storefront banners, blobs that still hold references or are inside the
+    grace period) into per-directory sets of file names.
+    Sweep: walk each upload directory and delete unreferenced files older
+    than the grace period, then drop blob rows nobody uses and product
+    image rows that were soft-deleted long ago.
+    """
+
+    def __init__(self, product_store, profile_store, grace=timedelta(hours=24),
+                 soft_delete_retention=timedelta(days=30)):
+        self.product_store = product_store
+        self.profile_store = profile_store
+        self.grace = grace
+        self.soft_delete_retention = soft_delete_retention
+
+    def init_app(self, app):
+        self.grace = timedelta(hours=app.config.get("IMAGE_GC_GRACE_HOURS", 24))
+        self.soft_delete_retention = timedelta(days=app.config.get("IMAGE_GC_SOFT_DELETE_DAYS", 30))
+        app.extensions["image_gc"] = self
+
+        @app.cli.command("image-gc")
+        @click.option("--dry-run", is_flag=True, help="Report what would be deleted without deleting it.")
+        def image_gc_command(dry_run):
+            """Delete image files and rows nothing references any more."""
+            with app.app_context():
+                print(self.run(dry_run=dry_run))
+
+    # ------------------------------------------------------------------
+    # Mark
+    # ------------------------------------------------------------------
+    def _mark(self, now):
+        grace_cutoff = now - self.grace
+        retention_cutoff = now - self.soft_delete_retention
+        # Product images may live in either directory: legacy rows and the
+        # remote uploader's URLs point at the root images directory.
+        product_urls = list(_stream(select(ProductImages.image_url).where(ProductImages.is_deleted.is_(False))))
+        product_names = _names_under(self.product_store, product_urls)
+
+        # Banners may point at either directory.
+        banner_urls = []
+        for banner in _stream(select(Storefront.business_banner).where(Storefront.business_banner.isnot(None))):
+            banner_urls.extend(banner if isinstance(banner, list) else [banner])
+        product_names |= _names_under(self.product_store, banner_urls)
+
+        profile_urls = list(_stream(select(Buyers.profile_pic).where(Buyers.profile_pic.isnot(None))))
+        profile_urls += list(_stream(select(Vendors.profile_pic).where(Vendors.profile_pic.isnot(None))))
+        profile_names = _names_under(self.profile_store, profile_urls + banner_urls + product_urls)
+
+        # Any image row that will survive this run (live, or soft-deleted but still
+        # within retention, or without a deletion time so never purged) keeps its
+        # blob row, otherwise the FK would break.
+        row_hashes = set(_stream(
+            select(ProductImages.blob_hash).distinct().where(
+                ProductImages.blob_hash.isnot(None),
+                (ProductImages.is_deleted.is_(False)) | (ProductImages.deleted_at.is_(None))
+                | (ProductImages.deleted_at >= retention_cutoff)
+            )))
+
+        dead_blobs = []
+        for blob in _stream(select(ImageBlob)):
+            if (blob.sha256 in row_hashes or blob.ref_count > 0
+                    or blob.filename in product_names or blob.created_at > grace_cutoff):
+                product_names.add(blob.filename)
+            else:
+                dead_blobs.append(blob.sha256)
+
+        # Variants live and die with their blob.
+        dead = set(dead_blobs)
+        for blob_hash, filename in db.session.execute(
+                select(ImageVariant.blob_hash, ImageVariant.filename).execution_options(yield_per=BATCH_SIZE)):
+            if blob_hash not in dead:
+                product_names.add(filename)
+
+        return {self.product_store.root: product_names, self.profile_store.root: profile_names}, dead_blobs
+
+    # ------------------------------------------------------------------
+    # Sweep
+    # ------------------------------------------------------------------
+    def _sweep_directory(self, root, referenced, cutoff_ts, dry_run, report):
+        try:
+            entries = os.scandir(root)
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                report["files_scanned"] += 1
+                if entry.name in referenced:
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime > cutoff_ts:
+                    continue
+                report["files_deleted"] += 1
+                report["bytes_reclaimed"] += stat.st_size
+                if not dry_run:
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+    def _delete_rows(self, model, column, values, dry_run):
+        deleted = 0
+        for i in range(0, len(values), BATCH_SIZE):
+            batch = values[i:i + BATCH_SIZE]
+            if not dry_run:
+                model.query.filter(column.in_(batch)).delete(synchronize_session=False)
+                db.session.commit()
+            deleted += len(batch)
+        return deleted
+
+    def run(self, dry_run=False):
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        report = {
+            "dry_run": dry_run,
+            "files_scanned": 0,
+            "files_deleted": 0,
+            "bytes_reclaimed": 0,
+            "blob_rows_deleted": 0,
+            "image_rows_deleted": 0,
+        }
+
+        # Rows soft-deleted before deleted_at existed start their retention now.
+        if not dry_run:
+            ProductImages.query.filter(
+                ProductImages.is_deleted.is_(True), ProductImages.deleted_at.is_(None)
+            ).update({"deleted_at": now}, synchronize_session=False)
+            db.session.commit()
+
+        old_soft_deleted = list(_stream(
+            select(ProductImages.id).where(
+                ProductImages.is_deleted.is_(True),
+                ProductImages.deleted_at < now - self.soft_delete_retention
+            )))
+        report["image_rows_deleted"] = self._delete_rows(ProductImages, ProductImages.id, old_soft_deleted, dry_run)
+
+        referenced, dead_blobs = self._mark(now)
+
+        cutoff_ts = time.time() - self.grace.total_seconds()
+        for root, names in referenced.items():
+            self._sweep_directory(root, names, cutoff_ts, dry_run, report)
+
+        self._delete_rows(ImageVariant, ImageVariant.blob_hash, dead_blobs, dry_run)
+        report["blob_rows_deleted"] = self._delete_rows(ImageBlob, ImageBlob.sha256, dead_blobs, dry_run)
+
+        report["duration_ms"] = int((time.perf_counter() - started) * 1000)
+        return report
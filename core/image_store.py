@@ -0,0 +1,75 @@
+import hashlib
+import os
+import tempfile
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class ImageStore:
+    """
+    Content-addressed image storage on local disk.
+
+    Uploads are streamed to a temp file in fixed-size chunks while being
+    hashed, then renamed to `<sha256>.<ext>`. Identical bytes are only ever
+    stored once; a duplicate upload just drops the temp file.
+    """
+
+    def __init__(self, root, base_url, max_bytes=10 * 1024 * 1024):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.max_bytes = max_bytes
+
+    def filename_for(self, digest, ext):
+        return f"{digest}.{ext}"
+
+    def path_for(self, filename):
+        return os.path.join(self.root, filename)
+
+    def url_for(self, filename):
+        return f"{self.base_url}/{filename}"
+
+    def save_stream(self, stream, ext):
+        """
+        Write `stream` to disk under its content hash.
+        Returns (digest, filename, size, created) where `created` is False
+        when an identical file was already stored.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        hasher = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(prefix=".upload-", dir=self.root)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise UploadTooLarge(f"File exceeds {self.max_bytes} bytes")
+                    hasher.update(chunk)
+                    out.write(chunk)
+
+            digest = hasher.hexdigest()
+            filename = self.filename_for(digest, ext)
+            final_path = self.path_for(filename)
+
+            if os.path.exists(final_path):
+                os.unlink(tmp_path)
+                # Restart the image GC's grace period: the caller is about to
+                # reference a file that may have been orphaned for days.
+                os.utime(final_path)
+                return digest, filename, size, False
+
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, final_path)
+            return digest, filename, size, True
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
@@ -0,0 +1,203 @@
+import base64
+import binascii
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+DATA_URL_PREFIX = "data:image/"
+MIME_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "jpg": "image/jpeg", "gif": "image/gif", "webp": "image/webp"}
+
+
+class ImageUploadError(Exception):
+    pass
+
+
+def split_data_url(img_b64):
+    """
+    Return (format, base64_payload) for a bare or `data:image/<fmt>;base64,` string.
+    Only the short header is inspected, so the payload is never copied by a regex.
+    """
+    if img_b64.startswith(DATA_URL_PREFIX):
+        comma = img_b64.find(",", 0, 64)
+        header = img_b64[len(DATA_URL_PREFIX):comma] if comma != -1 else ""
+        fmt, _, encoding = header.partition(";")
+        if comma == -1 or encoding != "base64" or fmt.lower() not in MIME_TYPES:
+            raise ImageUploadError("Unsupported data URL")
+        return fmt.lower(), img_b64[comma + 1:]
+    # fallback: assume jpeg if no prefix
+    return "jpeg", img_b64
+
+
+class Base64Reader:
+    """File-like reader that decodes a base64 string a block at a time."""
+
+    def __init__(self, payload, offset=0):
+        if any(c in payload for c in "\r\n \t"):
+            payload = payload.translate({ord(c): None for c in "\r\n \t"})
+        remainder = len(payload) % 4
+        if remainder:
+            payload += "=" * (4 - remainder)
+        self.payload = payload
+        self.pos = offset
+        self.decoded_length = len(payload) // 4 * 3 - (len(payload) - len(payload.rstrip("=")))
+
+    def read(self, size=-1):
+        if self.pos >= len(self.payload):
+            return b""
+        if size is None or size < 0:
+            end = len(self.payload)
+        else:
+            end = min(len(self.payload), self.pos + max(4, (size // 3) * 4))
+        chunk = self.payload[self.pos:end]
+        self.pos = end
+        try:
+            return base64.b64decode(chunk, validate=True)
+        except binascii.Error as e:
+            raise ImageUploadError(f"Invalid base64 image data: {e}")
+
+
+class MultipartBase64Body:
+    """
+    A multipart/form-data body with a single `file` field whose contents are
+    decoded from base64 while the request is being sent. The total length is
+    known up front, so requests sends a normal Content-Length body.
+    """
+
+    def __init__(self, payload, filename, mime_type, field="file"):
+        self.boundary = uuid.uuid4().hex
+        self.head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {mime_type}\r\n\r\n"
+        ).encode()
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode()
+        self.reader = Base64Reader(payload)
+        self._head_sent = False
+        self._tail_sent = False
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return len(self.head) + self.reader.decoded_length + len(self.tail)
+
+    def read(self, size=8192):
+        if not self._head_sent:
+            self._head_sent = True
+            return self.head
+        data = self.reader.read(size)
+        if data:
+            return data
+        if not self._tail_sent:
+            self._tail_sent = True
+            return self.tail
+        return b""
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(64 * 1024)
+            if not chunk:
+                return
+            yield chunk
+
+
+class ImageUploader:
+    """
+    Uploads base64 product images to the image API.
+
+    One keep-alive Session is shared by all threads so the TLS handshake is
+    paid once per pooled connection rather than once per image. Batches go
+    through a bounded thread pool; each request has its own timeout and is
+    retried with exponential backoff on connection errors and 5xx/429.
+    """
+
+    def __init__(self, endpoint, max_workers=4, timeout=(3.05, 30), retries=2, backoff=0.5):
+        self.endpoint = endpoint
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._session = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # Built on first upload so importing this module doesn't pull in requests.
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix="image-upload")
+        return self._executor
+
+    def upload_base64(self, img_b64, filename_stem):
+        import requests
+        img_format, payload = split_data_url(img_b64)
+        filename = f"{filename_stem}.{img_format}"
+
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+            # A fresh body per attempt: the previous one was consumed by the send.
+            body = MultipartBase64Body(payload, filename, MIME_TYPES[img_format])
+            try:
+                response = self.session.post(
+                    self.endpoint,
+                    data=body,
+                    headers={"Content-Type": body.content_type},
+                    timeout=self.timeout
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = e
+                continue
+            except requests.RequestException as e:
+                raise ImageUploadError(f"Image upload failed: {e}") from e
+
+            if response.status_code == 200:
+                try:
+                    url = response.json().get("url")
+                except (ValueError, AttributeError) as e:
+                    raise ImageUploadError(f"Image upload returned an invalid response: {response.text[:200]}") from e
+                if not url:
+                    raise ImageUploadError("Image upload response has no url")
+                return url
+            if response.status_code in (429, 500, 502, 503, 504):
+                last_error = ImageUploadError(f"Image upload failed ({response.status_code}): {response.text}")
+                continue
+            raise ImageUploadError(f"Image upload failed: {response.text}")
+
+        raise ImageUploadError(f"Image upload failed after {self.retries + 1} attempts: {last_error}")
+
+    def upload_many(self, images, vendor_id):
+        """Upload a listing's images concurrently. Returns URLs in input order."""
+        futures = [
+            self.executor.submit(self.upload_base64, img, f"product_{vendor_id}_{idx}")
+            for idx, img in enumerate(images)
+        ]
+        urls, errors = [], []
+        for idx, future in enumerate(futures):
+            try:
+                urls.append(future.result())
+            except ImageUploadError as e:
+                errors.append(f"Image {idx}: {e}")
+        if errors:
+            raise ImageUploadError("; ".join(errors))
+        return urls
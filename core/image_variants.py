@@ -0,0 +1,210 @@
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy.orm import selectinload
+from core.imports import datetime, request, current_app
+from core.extensions import db
+from models.vendorModels import Products, ProductImages, ImageBlob, ImageVariant
+
+DEFAULT_SIZES = {"thumb": 150, "small": 320, "medium": 800}
+DEFAULT_FORMATS = ("webp", "jpeg")
+FORMAT_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+
+def render_variants(src_path, out_dir, digest, sizes, formats, quality=80):
+    """
+    Resize one source image into every size/format combination.
+    Runs inside a worker process, so it only touches the filesystem and
+    returns plain dicts for the parent to record.
+    """
+    from PIL import Image, ImageOps
+
+    results = []
+    with Image.open(src_path) as im:
+        # Let the JPEG decoder downscale while decoding; far cheaper than a full decode.
+        im.draft("RGB", (max(sizes.values()), max(sizes.values())))
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "transparency" in im.info else "RGB")
+
+        for size_name, edge in sorted(sizes.items(), key=lambda item: -item[1]):
+            resized = im.copy()
+            resized.thumbnail((edge, edge), Image.LANCZOS)
+
+            for fmt in formats:
+                frame = resized.convert("RGB") if fmt == "jpeg" and resized.mode != "RGB" else resized
+                filename = f"{digest}_{size_name}.{FORMAT_EXTENSIONS[fmt]}"
+                final_path = os.path.join(out_dir, filename)
+                tmp_path = f"{final_path}.tmp"
+
+                save_kwargs = {"quality": quality}
+                if fmt == "jpeg":
+                    save_kwargs.update(optimize=True, progressive=True)
+                else:
+                    save_kwargs.update(method=4)
+                frame.save(tmp_path, format=fmt.upper(), **save_kwargs)
+                os.replace(tmp_path, final_path)
+
+                results.append({
+                    "size_name": size_name,
+                    "format": fmt,
+                    "width": frame.width,
+                    "height": frame.height,
+                    "filename": filename,
+                    "size_bytes": os.path.getsize(final_path),
+                })
+    return results
+
+
+class VariantPipeline:
+    """
+    Background thumbnail generation for product images.
+
+    `submit()` puts a blob hash on a bounded backlog and returns at once.
+    A dispatcher thread feeds the backlog into a process pool, keeping at
+    most IMAGE_VARIANT_WORKERS renders in flight, and records the results
+    as ImageVariant rows. Blobs that don't fit in the backlog stay
+    `pending` and are picked up by the periodic sweep.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.store = None
+        self.backlog = None
+        self._pool = None
+        self._slots = None
+        self._pid = None
+        self._inflight = set()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, store=None):
+        self.app = app
+        self.store = store
+        app.config.setdefault("IMAGE_VARIANT_WORKERS", 2)
+        app.config.setdefault("IMAGE_VARIANT_BACKLOG", 500)
+        app.config.setdefault("IMAGE_VARIANT_SIZES", DEFAULT_SIZES)
+        app.config.setdefault("IMAGE_VARIANT_FORMATS", DEFAULT_FORMATS)
+        app.config.setdefault("IMAGE_VARIANT_QUALITY", 80)
+        self.backlog = queue.Queue(maxsize=app.config["IMAGE_VARIANT_BACKLOG"])
+        app.extensions["image_variants"] = self
+
+    def _ensure_started(self):
+        # Process pools and threads don't survive fork; (re)create them per process.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            workers = self.app.config["IMAGE_VARIANT_WORKERS"]
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+            self._slots = threading.BoundedSemaphore(workers)
+            self._pid = os.getpid()
+            threading.Thread(target=self._dispatch, name="image-variants", daemon=True).start()
+
+    def submit(self, digest):
+        """Queue variant generation for a blob. Returns False if the backlog is full."""
+        if not self.app.config["IMAGE_VARIANT_WORKERS"]:
+            return False
+        self._ensure_started()
+        with self._lock:
+            if digest in self._inflight:
+                return True
+            try:
+                self.backlog.put_nowait(digest)
+            except queue.Full:
+                return False
+            self._inflight.add(digest)
+        return True
+
+    def _dispatch(self):
+        while True:
+            digest = self.backlog.get()
+            self._slots.acquire()
+            try:
+                self._start_render(digest)
+            except Exception as e:
+                self._done(digest)
+                print(f"Could not start variant render for {digest}: {e}")
+
+    def _start_render(self, digest):
+        with self.app.app_context():
+            blob = db.session.get(ImageBlob, digest)
+            if blob is None or blob.variant_status == "ready":
+                self._done(digest)
+                return
+            src_path = self.store.path_for(blob.filename)
+
+        cfg = self.app.config
+        future = self._pool.submit(
+            render_variants, src_path, self.store.root, digest,
+            cfg["IMAGE_VARIANT_SIZES"], tuple(cfg["IMAGE_VARIANT_FORMATS"]), cfg["IMAGE_VARIANT_QUALITY"]
+        )
+        future.add_done_callback(lambda f: self._finish(digest, f))
+
+    def _finish(self, digest, future):
+        try:
+            with self.app.app_context():
+                blob = db.session.get(ImageBlob, digest)
+                if blob is None:
+                    return
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"Variant generation failed for {digest}: {e}")
+                    blob.variant_status = "failed"
+                    db.session.commit()
+                    return
+
+                ImageVariant.query.filter_by(blob_hash=digest).delete(synchronize_session=False)
+                for result in results:
+                    db.session.add(ImageVariant(
+                        blob_hash=digest,
+                        url=self.store.url_for(result["filename"]),
+                        created_at=datetime.utcnow(),
+                        **result
+                    ))
+                blob.variant_status = "ready"
+                db.session.commit()
+        finally:
+            self._done(digest)
+
+    def _done(self, digest):
+        with self._lock:
+            self._inflight.discard(digest)
+        self._slots.release()
+
+    def sweep_pending(self, limit=200):
+        """Re-queue blobs still waiting for variants. Registered as a scheduled job."""
+        digests = [row.sha256 for row in db.session.query(ImageBlob.sha256)
+                   .filter(ImageBlob.variant_status == "pending")
+                   .order_by(ImageBlob.created_at)
+                   .limit(limit)]
+        queued = sum(1 for digest in digests if self.submit(digest))
+        return {"pending_found": len(digests), "queued": queued, "backlog": self.backlog.qsize()}
+
+
+def requested_image_variant():
+    """(size, format) asked for via ?size=thumb&format=webp, or (None, None) for originals."""
+    size = request.args.get("size")
+    fmt = request.args.get("format")
+    if size not in current_app.config["IMAGE_VARIANT_SIZES"]:
+        size = None
+    if fmt not in current_app.config["IMAGE_VARIANT_FORMATS"]:
+        fmt = None
+    return size, fmt
+
+
+def product_image_options():
+    """Eager-load a product's live images and their variants in three queries total."""
+    return (
+        selectinload(Products.images.and_(ProductImages.is_deleted.is_(False)))
+        .selectinload(ProductImages.blob)
+        .selectinload(ImageBlob.variants)
+    )
+
+
+variant_pipeline = VariantPipeline()
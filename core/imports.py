@@ -5,7 +5,6 @@ from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from flask_migrate import Migrate
 from sqlalchemy import text, inspect
 from flask_bcrypt import Bcrypt
-from flasgger import Swagger
 from flask_mail import Mail, Message
 from flask_cors import CORS
 from sqlalchemy import func
@@ -14,8 +13,6 @@ import random
 import secrets
 import string
 import uuid
-import requests
-import cloudinary
 import os
 import hashlib
 import base64
@@ -0,0 +1,185 @@
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.utils import secure_filename
+from core.imports import datetime, timedelta
+from core.extensions import db
+from models.kycModels import KycSubmission
+
+DOCUMENT_FIELDS = ("id_document", "proof_of_address")
+
+
+class CloudinaryDocumentStore:
+    def __init__(self, folder="kyc_documents"):
+        self.folder = folder
+
+    def put(self, path):
+        import cloudinary.uploader
+
+        result = cloudinary.uploader.upload(path, folder=self.folder, resource_type="auto")
+        return result.get("secure_url")
+
+
+class LocalDocumentStore:
+    """Stand-in for Cloudinary in development: copies documents into a local directory."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def put(self, path):
+        os.makedirs(self.root, exist_ok=True)
+        dest = os.path.join(self.root, os.path.basename(path))
+        shutil.copyfile(path, dest)
+        return dest
+
+
+class KycIngestor:
+    """
+    Accepts KYC documents without waiting on the document store.
+
+    `stage()` writes the uploaded files to a local staging directory and
+    records a `KycSubmission`; once the caller commits, `submit()` hands
+    each document to a thread pool that uploads them in parallel. The
+    submission flips to `uploaded` when the last document lands. Failed
+    uploads keep their staged file and are retried by `sweep()`.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.store = None
+        self._executor = None
+        self._pid = None
+        self._inflight = set()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, store=None):
+        self.app = app
+        if not app.config.get("KYC_STAGING_DIR"):
+            app.config["KYC_STAGING_DIR"] = os.path.join(app.instance_path, "kyc_staging")
+        if not app.config.get("KYC_DOCUMENT_DIR"):
+            app.config["KYC_DOCUMENT_DIR"] = os.path.join(app.instance_path, "kyc_documents")
+        app.config.setdefault("KYC_UPLOAD_WORKERS", 4)
+        app.config.setdefault("KYC_UPLOAD_MAX_ATTEMPTS", 5)
+        app.config.setdefault("KYC_UPLOAD_RETRY_SECONDS", 300)
+
+        if store is None:
+            if app.config.get("CLOUDINARY_CLOUD_NAME"):
+                store = CloudinaryDocumentStore()
+            else:
+                store = LocalDocumentStore(app.config["KYC_DOCUMENT_DIR"])
+        self.store = store
+        app.extensions["kyc_ingest"] = self
+
+    @property
+    def executor(self):
+        # Thread pools don't survive fork; (re)create per process.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.app.config["KYC_UPLOAD_WORKERS"], thread_name_prefix="kyc-upload")
+                    self._inflight = set()
+                    self._pid = os.getpid()
+        return self._executor
+
+    # ------------------------------------------------------------------
+    # Request side
+    # ------------------------------------------------------------------
+    def stage(self, vendor_id, documents):
+        """
+        Save `documents` ({field: FileStorage}) to the staging directory and add
+        a KycSubmission to the current session. Call `submit()` after commit.
+        """
+        staging_dir = self.app.config["KYC_STAGING_DIR"]
+        os.makedirs(staging_dir, exist_ok=True)
+
+        submission = KycSubmission(vendor_id=vendor_id)
+        for field, document in documents.items():
+            ext = os.path.splitext(secure_filename(document.filename or ""))[1].lower()
+            path = os.path.join(staging_dir, f"{vendor_id}-{uuid.uuid4().hex}-{field}{ext}")
+            document.save(path)
+            setattr(submission, f"{field}_path", path)
+        db.session.add(submission)
+        return submission
+
+    def submit(self, submission_id):
+        """Queue background uploads for every document still staged on disk."""
+        executor = self.executor
+        with self._lock:
+            for field in DOCUMENT_FIELDS:
+                key = (submission_id, field)
+                if key in self._inflight:
+                    continue
+                self._inflight.add(key)
+                executor.submit(self._upload, submission_id, field)
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def _upload(self, submission_id, field):
+        path_column = getattr(KycSubmission, f"{field}_path")
+        attempts_column = getattr(KycSubmission, f"{field}_attempts")
+        try:
+            with self.app.app_context():
+                submission = db.session.get(KycSubmission, submission_id)
+                path = getattr(submission, f"{field}_path") if submission else None
+                if not path:
+                    return
+
+                try:
+                    url = self.store.put(path)
+                except Exception as e:
+                    print(f"KYC upload failed for submission {submission_id} ({field}): {e}")
+                    db.session.rollback()
+                    # Counted per document, so a pass where both uploads fail
+                    # uses up one attempt of each rather than two of the submission's.
+                    KycSubmission.query.filter_by(id=submission_id).update(
+                        {f"{field}_attempts": attempts_column + 1, "last_error": str(e)[:1000]},
+                        synchronize_session=False
+                    )
+                    KycSubmission.query.filter(
+                        KycSubmission.id == submission_id,
+                        KycSubmission.upload_status == "staged",
+                        attempts_column >= self.app.config["KYC_UPLOAD_MAX_ATTEMPTS"]
+                    ).update({"upload_status": "failed"}, synchronize_session=False)
+                    db.session.commit()
+                    return
+
+                # Each document only touches its own columns, so the two uploads
+                # of a submission can finish in any order.
+                KycSubmission.query.filter(KycSubmission.id == submission_id, path_column == path).update(
+                    {f"{field}_url": url, f"{field}_path": None}, synchronize_session=False)
+                KycSubmission.query.filter(
+                    KycSubmission.id == submission_id,
+                    KycSubmission.upload_status == "staged",
+                    KycSubmission.id_document_path.is_(None),
+                    KycSubmission.proof_of_address_path.is_(None)
+                ).update({"upload_status": "uploaded", "last_error": None}, synchronize_session=False)
+                db.session.commit()
+
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+        finally:
+            with self._lock:
+                self._inflight.discard((submission_id, field))
+
+    def sweep(self, limit=200):
+        """Re-queue submissions whose uploads stalled or failed. Registered as a scheduled job."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.app.config["KYC_UPLOAD_RETRY_SECONDS"])
+        ids = [row.id for row in db.session.query(KycSubmission.id)
+               .filter(KycSubmission.upload_status == "staged", KycSubmission.updated_at < cutoff)
+               .order_by(KycSubmission.id)
+               .limit(limit)]
+        for submission_id in ids:
+            self.submit(submission_id)
+        return {"requeued": len(ids)}
+
+
+kyc_ingestor = KycIngestor()
@@ -0,0 +1,139 @@
+import hmac
+import os
+import time
+
+from flask import g, Response
+from core.imports import request, current_app
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest, multiprocess, REGISTRY
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by endpoint.",
+    ["blueprint", "endpoint", "method"], buckets=LATENCY_BUCKETS
+)
+REQUEST_COUNT = Counter(
+    "http_requests_total", "Requests by endpoint and status code.",
+    ["blueprint", "endpoint", "method", "status"]
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size by endpoint (streamed responses excluded).",
+    ["blueprint", "endpoint"], buckets=SIZE_BUCKETS
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests currently being handled.",
+    ["blueprint"], multiprocess_mode="livesum"
+)
+
+# Connection pool (see core/db_engine.py). Utilisation = checked_out / capacity.
+# Pool gauges are labelled with the bind key ('primary', 'replica_0', ...).
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out", "Pooled connections currently in use.",
+    ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity", "pool_size + max_overflow of each worker's pool.",
+    ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+
+
+def _labels():
+    endpoint = request.endpoint or "unmatched"
+    blueprint = request.blueprint or (endpoint.split(".", 1)[0] if "." in endpoint else "app")
+    return blueprint, endpoint
+
+
+def multiprocess_enabled():
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def mark_process_dead(pid):
+    """Call from gunicorn's `child_exit` hook so a dead worker's live gauges are dropped."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request instrumentation exposed at /metrics.
+
+    Scrapes must send METRICS_TOKEN as a bearer token. Without a token,
+    /metrics answers 404 except on a debug or testing app, since endpoint
+    traffic and pool internals shouldn't be public.
+
+    Each worker only updates its own counters (prometheus_client values),
+    so recording a request takes no cross-process lock. With
+    PROMETHEUS_MULTIPROC_DIR set (it must be set before the workers start),
+    every worker writes its values to mmap'd files in that directory and
+    /metrics merges them, so any worker can answer a scrape for the whole
+    server.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("METRICS_TOKEN", None)
+        if not app.config["METRICS_ENABLED"]:
+            return
+
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+        app.add_url_rule("/metrics", "metrics", self.metrics_view, methods=["GET"])
+        app.extensions["metrics"] = self
+        if not app.config["METRICS_TOKEN"] and not (app.debug or app.testing):
+            app.logger.warning("METRICS_TOKEN is not set: /metrics is disabled until it is.")
+
+    def _before(self):
+        if request.endpoint == "metrics":
+            return
+        g._metrics_start = time.perf_counter()
+        g._metrics_blueprint = _labels()[0]
+        IN_PROGRESS.labels(g._metrics_blueprint).inc()
+
+    def _after(self, response):
+        start = g.get("_metrics_start")
+        if start is None:
+            return response
+        blueprint, endpoint = _labels()
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - start)
+        REQUEST_COUNT.labels(blueprint, endpoint, request.method, str(response.status_code)).inc()
+        if not response.is_streamed and response.content_length is not None:
+            RESPONSE_SIZE.labels(blueprint, endpoint).observe(response.content_length)
+        return response
+
+    def _teardown(self, exc):
+        # Runs even when a request dies before after_request, so the gauge can't leak.
+        blueprint = g.pop("_metrics_blueprint", None)
+        if blueprint is not None:
+            IN_PROGRESS.labels(blueprint).dec()
+
+    def metrics_view(self):
+        token = current_app.config["METRICS_TOKEN"]
+        if token:
+            supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+            # Bytes, since compare_digest raises TypeError on non-ASCII str.
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                return Response("Forbidden\n", status=403, mimetype="text/plain")
+        elif not (current_app.debug or current_app.testing):
+            return Response("Not Found\n", status=404, mimetype="text/plain")
+
+        if multiprocess_enabled():
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+request_metrics = RequestMetrics()
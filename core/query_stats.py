@@ -0,0 +1,142 @@
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from core.imports import request, current_app
+
+
+class QueryStats:
+    """Queries run and time spent in the database for one request (or one budget block)."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        # Statements arrive with bound parameters as placeholders, so the same
+        # lazy load repeated in a loop always produces the same text.
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold):
+        return [(statement, n) for statement, n in self.shapes.most_common() if n >= threshold]
+
+
+_budgets = threading.local()
+
+
+def _active_stats():
+    stats = []
+    if has_request_context():
+        request_stats = g.get("_query_stats")
+        if request_stats is not None:
+            stats.append(request_stats)
+    stats.extend(getattr(_budgets, "stack", ()))
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context rather than a per-connection stack, so a
+    # statement that raises (no after_cursor_execute) leaves nothing behind.
+    if context is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_stats_started", None)
+    if started is None:
+        return
+    duration = time.perf_counter() - started
+    for stats in _active_stats():
+        stats.record(statement, duration)
+
+
+def _install_listeners():
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _start_request():
+    g._query_stats = QueryStats()
+    g._query_stats_started = time.perf_counter()
+
+
+def _finish_request(response):
+    stats = g.get("_query_stats")
+    if stats is None:
+        return response
+    cfg = current_app.config
+
+    threshold = cfg["QUERY_STATS_N_PLUS_ONE_THRESHOLD"]
+    repeated = stats.repeated(threshold) if threshold else []
+    if repeated:
+        current_app.logger.warning(json.dumps({
+            "event": "n_plus_one",
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "path": request.path,
+            "query_count": stats.count,
+            "repeated": [{"count": n, "statement": " ".join(statement.split())[:500]}
+                         for statement, n in repeated[:5]],
+        }))
+
+    if cfg["QUERY_STATS_SERVER_TIMING"]:
+        total_ms = (time.perf_counter() - g._query_stats_started) * 1000
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries", app;dur={total_ms:.1f}'
+        )
+    return response
+
+
+def init_query_stats(app):
+    """
+    Count queries and database time per request. Requests that run the same
+    statement QUERY_STATS_N_PLUS_ONE_THRESHOLD or more times log an
+    `n_plus_one` warning, and every response carries a Server-Timing header.
+    """
+    app.config.setdefault("QUERY_STATS_ENABLED", True)
+    app.config.setdefault("QUERY_STATS_N_PLUS_ONE_THRESHOLD", 5)
+    app.config.setdefault("QUERY_STATS_SERVER_TIMING", True)
+    if not app.config["QUERY_STATS_ENABLED"]:
+        return
+
+    _install_listeners()
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+@contextmanager
+def query_budget(max_queries):
+    """
+    Fail if the block runs more than `max_queries` statements, e.g.
+
+        with query_budget(3):
+            client.get("/api/marketplace/popular-products")
+
+    Works with the Flask test client, which runs the request on the calling
+    thread. On failure the message lists the most repeated statements.
+    """
+    stats = QueryStats()
+    stack = getattr(_budgets, "stack", None)
+    if stack is None:
+        stack = _budgets.stack = []
+    _install_listeners()
+    stack.append(stats)
+    try:
+        yield stats
+    finally:
+        stack.remove(stats)
+
+    if stats.count > max_queries:
+        worst = "\n".join(f"  {n}x {' '.join(statement.split())[:200]}"
+                          for statement, n in stats.shapes.most_common(5))
+        raise AssertionError(f"Expected at most {max_queries} queries, ran {stats.count}:\n{worst}")
@@ -0,0 +1,245 @@
+import itertools
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_request_context, Response
+from sqlalchemy import select
+from core.imports import request, get_jwt, datetime, SQLAlchemyError
+from core.cache import TTLCache
+from core.extensions import db
+from models.jobModels import ReplicaHeartbeat
+
+HEARTBEAT_ROW_ID = 1
+STICKY_COOKIE = "db_sticky"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReplicaState:
+    def __init__(self, key):
+        self.key = key
+        self.healthy = False
+        self.lag = None
+        self.checked_at = 0.0
+        self.down_until = 0.0
+        self.last_error = None
+
+
+def _identity_key():
+    try:
+        claims = get_jwt()
+    except RuntimeError:  # no JWT verified on this request
+        return None
+    if not claims:
+        return None
+    return f"{claims.get('role')}:{claims.get('sub')}"
+
+
+class ReplicaRouter:
+    """
+    Routes the reads of `@read_only` views to read replicas.
+
+    Replicas are the SQLALCHEMY_BINDS named `replica_*` (built from
+    DATABASE_REPLICA_URLS). A read-only request is pinned to one healthy
+    replica for its whole life; RoutingSession then sends its plain SELECTs
+    there. The primary is used instead when:
+
+    - the caller made a write in the last REPLICA_STICKY_SECONDS (tracked
+      per user in this process and by a short-lived cookie, so it also holds
+      across workers for browsers), so users always read their own writes;
+    - the replica's heartbeat is more than REPLICA_MAX_LAG_SECONDS behind the
+      primary's, or the lag check failed;
+    - a query on the replica raised - the replica is taken out of rotation
+      for REPLICA_RETRY_SECONDS and the view is run again on the primary.
+
+    Locally, point DATABASE_URL and DATABASE_REPLICA_URLS at two SQLite files
+    (copy the first to make the second). Nothing replicates between them, so
+    set REPLICA_MAX_LAG_SECONDS=0 to skip the lag check, or leave it on to
+    watch reads fail over once the copy falls behind. With the lag check on,
+    replicas are only used once the primary has written its first heartbeat.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._states = {}
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+        self._recent_writers = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault("REPLICA_STICKY_SECONDS", 5)
+        app.config.setdefault("REPLICA_MAX_LAG_SECONDS", 60)  # 0 disables the lag check
+        app.config.setdefault("REPLICA_HEALTH_CHECK_SECONDS", 5)
+        app.config.setdefault("REPLICA_RETRY_SECONDS", 30)
+        app.config.setdefault("REPLICA_HEARTBEAT_SECONDS", 30)
+
+        binds = app.config.get("SQLALCHEMY_BINDS") or {}
+        self._states = {key: ReplicaState(key) for key in sorted(binds) if key.startswith("replica_")}
+        self._recent_writers = TTLCache(maxsize=100000, ttl=app.config["REPLICA_STICKY_SECONDS"])
+        app.after_request(self._remember_writes)
+        app.extensions["replica_router"] = self
+
+    @property
+    def enabled(self):
+        return bool(self._states)
+
+    # ---- health ----
+
+    def _check(self, state):
+        cfg = self.app.config
+        state.checked_at = time.monotonic()
+        if state.down_until > state.checked_at:
+            state.healthy = False
+            return
+        max_lag = cfg["REPLICA_MAX_LAG_SECONDS"]
+        try:
+            with db.engines[state.key].connect() as conn:
+                replica_beat = conn.execute(
+                    select(ReplicaHeartbeat.beat_at).where(ReplicaHeartbeat.id == HEARTBEAT_ROW_ID)
+                ).scalar()
+            if max_lag:
+                with db.engine.connect() as conn:
+                    primary_beat = conn.execute(
+                        select(ReplicaHeartbeat.beat_at).where(ReplicaHeartbeat.id == HEARTBEAT_ROW_ID)
+                    ).scalar()
+                # Compare the two copies of the same row rather than wall
+                # clocks, so the primary's heartbeat schedule isn't counted as lag.
+                if primary_beat is None:
+                    state.lag = None
+                elif replica_beat is None:
+                    state.lag = float("inf")
+                else:
+                    state.lag = max((primary_beat - replica_beat).total_seconds(), 0.0)
+                state.healthy = state.lag is not None and state.lag <= max_lag
+            else:
+                state.healthy = True
+            state.last_error = None
+        except SQLAlchemyError as e:
+            state.healthy = False
+            state.last_error = str(e)[:500]
+            state.down_until = time.monotonic() + cfg["REPLICA_RETRY_SECONDS"]
+            print(f"Read replica {state.key} failed its health check: {e}")
+
+    def _healthy_keys(self):
+        interval = self.app.config["REPLICA_HEALTH_CHECK_SECONDS"]
+        now = time.monotonic()
+        stale = [s for s in self._states.values() if now - s.checked_at >= interval]
+        # One request refreshes the state; the others use the last known result.
+        if stale and self._lock.acquire(blocking=False):
+            try:
+                for state in stale:
+                    self._check(state)
+            finally:
+                self._lock.release()
+        return [s.key for s in self._states.values() if s.healthy]
+
+    def mark_down(self, key, error):
+        state = self._states[key]
+        state.healthy = False
+        state.last_error = str(error)[:500]
+        state.down_until = time.monotonic() + self.app.config["REPLICA_RETRY_SECONDS"]
+        state.checked_at = 0.0
+
+    # ---- read-your-writes ----
+
+    def _is_sticky(self):
+        until = request.cookies.get(STICKY_COOKIE)
+        try:
+            if until and float(until) > time.time():
+                return True
+        except ValueError:
+            pass
+        key = _identity_key()
+        return key is not None and self._recent_writers.get(key) is not None
+
+    def _remember_writes(self, response):
+        if not self.enabled or request.method in SAFE_METHODS or response.status_code >= 400:
+            return response
+        sticky = self.app.config["REPLICA_STICKY_SECONDS"]
+        key = _identity_key()
+        if key is not None:
+            self._recent_writers.set(key, True)
+        response.set_cookie(STICKY_COOKIE, str(time.time() + sticky), max_age=sticky,
+                            httponly=True, samesite="Lax")
+        return response
+
+    # ---- routing ----
+
+    def choose(self):
+        """The replica key this request should read from, or None for the primary."""
+        if not self.enabled or self._is_sticky():
+            return None
+        keys = self._healthy_keys()
+        if not keys:
+            return None
+        return keys[next(self._rotation) % len(keys)]
+
+    def write_heartbeat(self):
+        """Stamp the primary's heartbeat row. Registered as a scheduled job."""
+        now = datetime.utcnow()
+        row = db.session.get(ReplicaHeartbeat, HEARTBEAT_ROW_ID)
+        if row is None:
+            db.session.add(ReplicaHeartbeat(id=HEARTBEAT_ROW_ID, beat_at=now))
+        else:
+            row.beat_at = now
+        db.session.commit()
+        return {"beat_at": now.isoformat()}
+
+
+replica_router = ReplicaRouter()
+
+
+def _stream_on_replica(body, replica):
+    """
+    Wrap a streamed response body whose queries run on `replica`. The body
+    is already being sent, so a failure can't be retried on the primary;
+    the replica is only taken out of rotation for later requests.
+    """
+    try:
+        yield from body
+    except SQLAlchemyError as e:
+        replica_router.mark_down(replica, e)
+        print(f"Read replica {replica} failed while streaming: {e}")
+        raise
+
+
+def read_only(view):
+    """
+    Let a GET view read from a replica. Put it below @jwt_required() so the
+    caller's identity is known when deciding on read-your-writes stickiness.
+    Streamed responses (stream_with_context) keep reading from the same
+    replica until the stream ends.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not has_request_context() or request.method not in SAFE_METHODS:
+            return view(*args, **kwargs)
+
+        g._db_replica = replica_router.choose()
+        g._db_replica_used = False
+        streaming = False
+        try:
+            response = view(*args, **kwargs)
+            replica = g.get("_db_replica")
+            if replica is not None and isinstance(response, Response) and response.is_streamed:
+                # The body's queries run after this returns, inside the request
+                # context kept alive by stream_with_context: leave the replica
+                # pinned in g, which goes away with that context.
+                streaming = True
+                response.response = _stream_on_replica(response.response, replica)
+            return response
+        except SQLAlchemyError as e:
+            replica = g.pop("_db_replica", None)
+            if replica is None or not g.pop("_db_replica_used", False):
+                raise
+            replica_router.mark_down(replica, e)
+            print(f"Read replica {replica} failed, retrying on primary: {e}")
+            db.session.rollback()
+            return view(*args, **kwargs)
+        finally:
+            if not streaming:
+                g.pop("_db_replica", None)
+    return wrapper
@@ -0,0 +1,182 @@
+import os
+import socket
+import threading
+import time
+import uuid
+
+import click
+from core.imports import datetime, timedelta, IntegrityError
+from core.extensions import db
+from models.jobModels import JobLock
+
+
+class ScheduledJob:
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.next_run = 0.0
+
+
+class Scheduler:
+    """
+    Minimal in-process periodic job runner.
+
+    Every gunicorn worker runs the scheduler loop, but a job only executes in
+    the worker that holds its lease row in `job_locks`, so starting several
+    workers at once never runs the same job twice. Leases expire, so a dead
+    leader is replaced on the next tick.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.jobs = {}
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._thread_pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault("SCHEDULER_ENABLED", True)
+        app.config.setdefault("SCHEDULER_TICK_SECONDS", 30)
+        app.extensions["scheduler"] = self
+
+        if app.config["SCHEDULER_ENABLED"]:
+            # Start lazily in the serving process (after any gunicorn fork),
+            # never from CLI commands such as `flask db upgrade`.
+            app.before_request(self.start)
+
+        @app.cli.command("run-job")
+        @click.argument("name")
+        def run_job_command(name):
+            """Run a scheduled job once, ignoring its lease."""
+            with app.app_context():
+                print(self.run_job(name, force=True))
+
+    def register(self, name, func, interval):
+        """Register `func` to run every `interval` seconds. `func` should return a dict of stats."""
+        self.jobs[name] = ScheduledJob(name, func, interval)
+
+    # ------------------------------------------------------------------
+    # Leader election
+    # ------------------------------------------------------------------
+    def _acquire_lease(self, name, lease_seconds):
+        now = datetime.utcnow()
+        expires = now + timedelta(seconds=lease_seconds)
+
+        updated = JobLock.query.filter(
+            JobLock.name == name,
+            (JobLock.lease_expires_at.is_(None)) |
+            (JobLock.lease_expires_at < now) |
+            (JobLock.owner == self.owner)
+        ).update({"owner": self.owner, "lease_expires_at": expires}, synchronize_session=False)
+        db.session.commit()
+        if updated:
+            return True
+
+        if db.session.get(JobLock, name) is not None:
+            return False
+
+        try:
+            db.session.add(JobLock(name=name, owner=self.owner, lease_expires_at=expires, run_count=0))
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()
+            return False
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    def run_job(self, name, force=False):
+        job = self.jobs[name]
+        # The lease must outlive the interval so other workers don't take over between runs.
+        if not force and not self._acquire_lease(name, job.interval * 2):
+            return None
+
+        lock = db.session.get(JobLock, name)
+        if lock is None:
+            lock = JobLock(name=name, run_count=0)
+            db.session.add(lock)
+        lock.last_started_at = datetime.utcnow()
+        db.session.commit()
+
+        started = time.perf_counter()
+        result, error = None, None
+        try:
+            result = job.func() or {}
+        except Exception as e:
+            db.session.rollback()
+            error = str(e)
+            print(f"Scheduled job '{name}' failed: {e}")
+        duration_ms = int((time.perf_counter() - started) * 1000)
+
+        lock = db.session.get(JobLock, name)
+        lock.last_finished_at = datetime.utcnow()
+        lock.last_duration_ms = duration_ms
+        lock.last_result = result
+        lock.last_error = error
+        lock.run_count = (lock.run_count or 0) + 1
+        db.session.commit()
+
+        return {"job": name, "duration_ms": duration_ms, "result": result, "error": error}
+
+    def tick(self):
+        now = time.monotonic()
+        for job in self.jobs.values():
+            if job.next_run > now:
+                continue
+            job.next_run = now + job.interval
+            try:
+                self.run_job(job.name)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Scheduler error while running '{job.name}': {e}")
+
+    def _loop(self):
+        with self.app.app_context():
+            while not self._stop.is_set():
+                try:
+                    self.tick()
+                finally:
+                    db.session.remove()
+                self._stop.wait(self.app.config["SCHEDULER_TICK_SECONDS"])
+
+    def start(self):
+        if self._thread_pid == os.getpid() or not self.jobs:
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+            threading.Thread(target=self._loop, name="scheduler", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        """Last-run information for every registered job."""
+        locks = {lock.name: lock for lock in JobLock.query.filter(JobLock.name.in_(list(self.jobs))).all()}
+        data = []
+        for name, job in self.jobs.items():
+            lock = locks.get(name)
+            data.append({
+                "name": name,
+                "interval_seconds": job.interval,
+                "leader": lock.owner if lock else None,
+                "lease_expires_at": lock.lease_expires_at if lock else None,
+                "last_started_at": lock.last_started_at if lock else None,
+                "last_finished_at": lock.last_finished_at if lock else None,
+                "last_duration_ms": lock.last_duration_ms if lock else None,
+                "last_result": lock.last_result if lock else None,
+                "last_error": lock.last_error if lock else None,
+                "run_count": lock.run_count if lock else 0,
+            })
+        return data
+
+
+scheduler = Scheduler()
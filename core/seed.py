@@ -0,0 +1,258 @@
+import time
+
+import click
+from sqlalchemy import select, insert, tuple_
+from core.extensions import db, bcrypt
+from core.admin_stats import reconcile_admin_stats
+from models.userModel import Buyers, Vendors
+from models.vendorModels import Category, Products, ProductImages, Storefront
+from models.orderModels import Order, OrderItem
+
+BATCH_SIZE = 500
+DEMO_PASSWORD = "password123"
+PLACEHOLDER_IMAGE = "https://via.placeholder.com/150"
+
+CATEGORIES = ["Electronics", "Fashion", "Books", "Home", "Beauty", "Sports"]
+STATES = ["Lagos", "Abuja", "Rivers", "Oyo", "Kano"]
+
+DEMO_VENDOR = {
+    "firstname": "John", "lastname": "Doe", "business_name": "Demo Store", "business_type": "Retail",
+    "email": "demo@vendor.com", "phone": "08012345678", "state": "Lagos", "country": "Nigeria",
+    "referral_code": "DEMO123",
+}
+DEMO_BUYER = {
+    "name": "Jane Doe", "email": "demo@buyer.com", "phone": "08087654321", "state": "Lagos",
+    "country": "Nigeria", "role": "buyer", "referral_code": "BUYER123",
+}
+DEMO_PRODUCTS = [
+    {"product_name": "Smartphone X10", "product_price": 120000,
+     "description": "Latest model smartphone with AI camera.", "category": "Electronics",
+     "status": "active", "visibility": True},
+    {"product_name": "Men's Sneakers", "product_price": 25000,
+     "description": "Comfortable and stylish sneakers.", "category": "Fashion",
+     "status": "active", "visibility": True},
+    {"product_name": "Python Programming", "product_price": 8000,
+     "description": "A beginner-friendly guide to Python programming.", "category": "Books",
+     "status": "inactive", "visibility": False},
+]
+DEMO_ORDERS = [
+    ("DEMO_ORDER_001", "pending"),
+    ("DEMO_ORDER_002", "shipped"),
+    ("DEMO_ORDER_003", "shipped"),
+    ("DEMO_ORDER_004", "delivered"),
+]
+ORDER_STATUSES = ["pending", "shipped", "delivered", "delivered"]
+
+
+def _chunks(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _existing(column, keys):
+    """Which of `keys` are already in `column`, checked with one IN query per batch."""
+    found = set()
+    for chunk in _chunks(list(keys)):
+        found.update(db.session.execute(select(column).where(column.in_(chunk))).scalars())
+    return found
+
+
+def _ids_by(key_column, id_column, keys):
+    ids = {}
+    for chunk in _chunks(list(keys)):
+        ids.update(db.session.execute(select(key_column, id_column).where(key_column.in_(chunk))).tuples().all())
+    return ids
+
+
+def _seeded_product_names(names):
+    """Which of `names` already exist as products of a seed vendor (demo or generated)."""
+    seed_vendors = select(Vendors.id).where(
+        (Vendors.email == DEMO_VENDOR["email"]) | Vendors.email.like("%@demo.example.com"))
+    found = set()
+    for chunk in _chunks(list(names)):
+        found.update(db.session.execute(
+            select(Products.product_name)
+            .where(Products.product_name.in_(chunk), Products.vendor_id.in_(seed_vendors))
+        ).scalars())
+    return found
+
+
+def _product_ids(keys):
+    """{(vendor_id, product_name): id} for the keys that exist."""
+    ids = {}
+    for chunk in _chunks(keys):
+        for product_id, vendor_id, name in db.session.execute(
+            select(Products.id, Products.vendor_id, Products.product_name)
+            .where(tuple_(Products.vendor_id, Products.product_name).in_(chunk))
+        ):
+            ids[(vendor_id, name)] = product_id
+    return ids
+
+
+def _insert_missing(model, rows, key):
+    """Multi-row INSERT of the rows whose `key` column value isn't in the table yet. Returns how many."""
+    column = getattr(model, key)
+    present = _existing(column, [row[key] for row in rows])
+    missing = [row for row in rows if row[key] not in present]
+    for chunk in _chunks(missing):
+        db.session.execute(insert(model.__table__).values(chunk))
+    return len(missing)
+
+
+def _vendor_rows(count, password):
+    rows = [dict(DEMO_VENDOR, password=password, kyc_status="verified")]
+    for i in range(1, count + 1):
+        rows.append({
+            "firstname": "Demo", "lastname": f"Vendor {i}", "business_name": f"Demo Store {i}",
+            "business_type": "Retail", "email": f"vendor{i}@demo.example.com", "phone": f"0801{i:07d}",
+            "password": password, "state": STATES[i % len(STATES)], "country": "Nigeria",
+            "referral_code": f"DEMOV{i}", "kyc_status": "verified",
+        })
+    return rows
+
+
+def _buyer_rows(count, password):
+    rows = [dict(DEMO_BUYER, password=password)]
+    for i in range(1, count + 1):
+        rows.append({
+            "name": f"Demo Buyer {i}", "email": f"buyer{i}@demo.example.com", "phone": f"0808{i:07d}",
+            "password": password, "state": STATES[i % len(STATES)], "country": "Nigeria",
+            "role": "buyer", "referral_code": f"DEMOB{i}",
+        })
+    return rows
+
+
+def _product_rows(count, vendor_ids, category_ids, demo_vendor_id):
+    rows = [{
+        "product_name": p["product_name"], "product_price": p["product_price"], "description": p["description"],
+        "category_id": category_ids[p["category"]], "vendor_id": demo_vendor_id,
+        "status": p["status"], "visibility": p["visibility"],
+    } for p in DEMO_PRODUCTS]
+    categories = [category_ids[name] for name in CATEGORIES]
+    for i in range(1, count + 1):
+        rows.append({
+            "product_name": f"Demo Product {i}", "product_price": 1000 + (i * 739) % 200000,
+            "description": f"Demo product number {i}.", "category_id": categories[i % len(categories)],
+            "vendor_id": vendor_ids[i % len(vendor_ids)], "status": "active", "visibility": True,
+        })
+    return rows
+
+
+def seed_demo_data(vendors=0, buyers=0, products=0, orders=0):
+    """
+    Insert the demo accounts, categories, products and orders, plus the
+    requested numbers of extra generated ones, in a single transaction.
+
+    Every row has a natural key (email, name, reference), so existence is
+    checked with one IN query per batch and only missing rows are inserted
+    with multi-row INSERTs; running it again inserts nothing. Returns the
+    number of rows inserted per table.
+    """
+    password = bcrypt.generate_password_hash(DEMO_PASSWORD).decode('utf-8')
+    created = {}
+    try:
+        created["category"] = _insert_missing(Category, [{"name": name} for name in CATEGORIES], "name")
+        category_ids = _ids_by(Category.name, Category.id, CATEGORIES)
+
+        vendor_rows = _vendor_rows(vendors, password)
+        created["vendors"] = _insert_missing(Vendors, vendor_rows, "email")
+        vendor_ids = _ids_by(Vendors.email, Vendors.id, [row["email"] for row in vendor_rows])
+        demo_vendor_id = vendor_ids[DEMO_VENDOR["email"]]
+
+        storefronts = [{"business_name": row["business_name"], "description": "", "vendor_id": vendor_ids[row["email"]]}
+                       for row in vendor_rows]
+        created["storefront"] = _insert_missing(Storefront, storefronts, "vendor_id")
+
+        buyer_rows = _buyer_rows(buyers, password)
+        created["buyers"] = _insert_missing(Buyers, buyer_rows, "email")
+        buyer_ids = _ids_by(Buyers.email, Buyers.id, [row["email"] for row in buyer_rows])
+
+        # Products are keyed by name among the seed vendors - which vendor a generated
+        # product lands on depends on --vendors, so it can differ between runs. Each
+        # new one gets a placeholder image.
+        product_rows = _product_rows(products, [vendor_ids[row["email"]] for row in vendor_rows],
+                                     category_ids, demo_vendor_id)
+        present = _seeded_product_names([row["product_name"] for row in product_rows])
+        missing = [row for row in product_rows if row["product_name"] not in present]
+        for chunk in _chunks(missing):
+            db.session.execute(insert(Products.__table__).values(chunk))
+        created["products"] = len(missing)
+
+        new_ids = _product_ids([(row["vendor_id"], row["product_name"]) for row in missing])
+        images = [{"product_id": product_id, "vendor_id": vendor_id, "image_url": PLACEHOLDER_IMAGE}
+                  for (vendor_id, _), product_id in new_ids.items()]
+        for chunk in _chunks(images):
+            db.session.execute(insert(ProductImages.__table__).values(chunk))
+        created["product_images"] = len(images)
+
+        created["order"], created["order_item"] = _seed_orders(
+            orders, [buyer_ids[row["email"]] for row in buyer_rows], demo_vendor_id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # Core inserts bypass the ORM hook that maintains the admin counters.
+    if any(created.values()):
+        reconcile_admin_stats(snapshot=False)
+    return created
+
+
+def _seed_orders(count, buyer_ids, demo_vendor_id):
+    """Orders keyed by reference; `buyer_ids` starts with the demo buyer."""
+    products = db.session.execute(
+        select(Products.id, Products.product_name, Products.product_price)
+        .where(Products.status == "active")
+        .order_by(Products.vendor_id != demo_vendor_id, Products.id)
+        .limit(200)
+    ).all()
+    if not products:
+        return 0, 0
+
+    demo_buyer_id = buyer_ids[0]
+    buyers = buyer_ids
+    # (reference, status, buyer, line items) - the demo orders take the demo vendor's first two products.
+    planned = [(reference, status, demo_buyer_id, products[:2]) for reference, status in DEMO_ORDERS]
+    for i in range(1, count + 1):
+        first = i % len(products)
+        planned.append((f"DEMO_ORDER_{i + len(DEMO_ORDERS):06d}", ORDER_STATUSES[i % len(ORDER_STATUSES)],
+                        buyers[i % len(buyers)], [products[first], products[(first + 7) % len(products)]]))
+
+    present = _existing(Order.reference, [reference for reference, *_ in planned])
+    planned = [order for order in planned if order[0] not in present]
+    if not planned:
+        return 0, 0
+
+    for chunk in _chunks(planned):
+        db.session.execute(insert(Order.__table__).values([
+            {"buyer_id": buyer_id, "reference": reference, "status": status,
+             "total_amount": float(sum(price for _, _, price in lines))}
+            for reference, status, buyer_id, lines in chunk
+        ]))
+    order_ids = _ids_by(Order.reference, Order.id, [reference for reference, *_ in planned])
+
+    items = [
+        {"order_id": order_ids[reference], "product_id": product_id, "product_name": name,
+         "quantity": 1, "price": price, "status": "pending"}
+        for reference, _, _, lines in planned for product_id, name, price in lines
+    ]
+    for chunk in _chunks(items):
+        db.session.execute(insert(OrderItem.__table__).values(chunk))
+    return len(planned), len(items)
+
+
+def init_seed(app):
+    @app.cli.command("seed")
+    @click.option("--vendors", default=0, help="Extra generated vendors besides demo@vendor.com.")
+    @click.option("--buyers", default=0, help="Extra generated buyers besides demo@buyer.com.")
+    @click.option("--products", default=0, help="Extra generated products, spread across the vendors.")
+    @click.option("--orders", default=0, help="Extra generated orders, spread across the buyers.")
+    def seed_command(vendors, buyers, products, orders):
+        """Create any missing tables and insert the demo data. Safe to run repeatedly."""
+        with app.app_context():
+            started = time.perf_counter()
+            db.create_all()
+            created = seed_demo_data(vendors, buyers, products, orders)
+            print(", ".join(f"{table}: {n}" for table, n in created.items()))
+            print(f"✅ Seeded in {time.perf_counter() - started:.1f}s "
+                  f"(demo logins demo@vendor.com / demo@buyer.com, password {DEMO_PASSWORD})")
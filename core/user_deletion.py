@@ -0,0 +1,275 @@
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, delete, update, func, case
+from core.imports import datetime, timedelta
+from core.extensions import db
+from core.identity import invalidate_user
+from core.admin_stats import apply_counter_deltas, product_removal_deltas
+from models.jobModels import UserDeletionJob
+from models.userModel import Buyers, Vendors
+from models.vendorModels import Products, ProductImages, Storefront, ImageBlob
+from models.cartModels import Cart, CartItem
+from models.favouriteModels import Favourites
+from models.orderModels import Order, OrderItem
+from models.kycModels import KycSubmission
+from models.referralModels import ReferralStat
+
+
+class Step:
+    """
+    One set-based pass over a dependant table: rows matching `where` are
+    deleted (or, with `values`, updated) a batch of primary keys at a time.
+    Steps only ever remove the rows they select, so re-running one after a
+    crash is harmless. `counters(keys)` gives the admin counter deltas for
+    deleting a batch; they're recorded in the batch's transaction.
+    """
+
+    def __init__(self, name, model, where, values=None, before_batch=None, counters=None):
+        self.name = name
+        self.model = model
+        self.where = where
+        self.values = values
+        self.before_batch = before_batch
+        self.counters = counters
+
+    @property
+    def pk(self):
+        return self.model.__mapper__.primary_key[0]
+
+    def next_batch(self, batch_size):
+        return list(db.session.execute(select(self.pk).where(self.where).limit(batch_size)).scalars())
+
+    def apply(self, keys):
+        if self.before_batch:
+            self.before_batch(keys)
+        if self.counters:
+            apply_counter_deltas(self.counters(keys))
+        if self.values is not None:
+            statement = update(self.model).where(self.pk.in_(keys)).values(self.values)
+        else:
+            statement = delete(self.model).where(self.pk.in_(keys))
+        db.session.execute(statement.execution_options(synchronize_session=False))
+
+
+def _release_image_refs(image_ids):
+    """Give back the blob references held by live image rows about to be deleted."""
+    counts = db.session.execute(
+        select(ProductImages.blob_hash, func.count())
+        .where(ProductImages.id.in_(image_ids),
+               ProductImages.is_deleted.is_(False),
+               ProductImages.blob_hash.isnot(None))
+        .group_by(ProductImages.blob_hash)
+    ).all()
+    for blob_hash, count in counts:
+        db.session.execute(
+            update(ImageBlob)
+            .where(ImageBlob.sha256 == blob_hash)
+            .values(ref_count=case((ImageBlob.ref_count > count, ImageBlob.ref_count - count), else_=0))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _removed(counter):
+    """Counter deltas for a step whose every row is one `counter`."""
+    return lambda keys: {counter: -len(keys)}
+
+
+def _removed_products(product_ids):
+    return product_removal_deltas(db.session.execute(
+        select(Products.status, Products.visibility, func.count())
+        .where(Products.id.in_(product_ids))
+        .group_by(Products.status, Products.visibility)
+    ).all())
+
+
+def buyer_steps(buyer_id):
+    carts = select(Cart.id).where(Cart.buyer_id == buyer_id)
+    orders = select(Order.id).where(Order.buyer_id == buyer_id)
+    return [
+        Step("cart_items", CartItem, CartItem.cart_id.in_(carts)),
+        Step("carts", Cart, Cart.buyer_id == buyer_id),
+        Step("favourites", Favourites, Favourites.buyer_id == buyer_id),
+        Step("order_items", OrderItem, OrderItem.order_id.in_(orders)),
+        Step("orders", Order, Order.buyer_id == buyer_id),
+        Step("referral_stats", ReferralStat,
+             (ReferralStat.owner_role == "buyer") & (ReferralStat.owner_id == buyer_id)),
+        Step("buyer", Buyers, Buyers.id == buyer_id, counters=_removed("buyers")),
+    ]
+
+
+def vendor_steps(vendor_id):
+    products = select(Products.id).where(Products.vendor_id == vendor_id)
+    return [
+        Step("cart_items", CartItem, CartItem.product_id.in_(products)),
+        Step("favourites", Favourites, Favourites.product_id.in_(products)),
+        # Buyers keep their order history; the line items just lose the product link.
+        Step("order_items_unlinked", OrderItem, OrderItem.product_id.in_(products), values={"product_id": None}),
+        Step("product_images", ProductImages,
+             ProductImages.product_id.in_(products) | (ProductImages.vendor_id == vendor_id),
+             before_batch=_release_image_refs),
+        Step("products", Products, Products.vendor_id == vendor_id, counters=_removed_products),
+        Step("storefront", Storefront, Storefront.vendor_id == vendor_id, counters=_removed("storefronts")),
+        Step("image_blobs_unlinked", ImageBlob, ImageBlob.uploaded_by == vendor_id, values={"uploaded_by": None}),
+        Step("kyc_submissions", KycSubmission, KycSubmission.vendor_id == vendor_id),
+        Step("referral_stats", ReferralStat,
+             (ReferralStat.owner_role == "vendor") & (ReferralStat.owner_id == vendor_id)),
+        Step("vendor", Vendors, Vendors.id == vendor_id, counters=_removed("vendors")),
+    ]
+
+
+STEP_BUILDERS = {"buyer": buyer_steps, "vendor": vendor_steps}
+
+
+class UserDeletionRunner:
+    """
+    Deletes a user and everything that depends on it without loading any of
+    it into the session.
+
+    `enqueue()` records a UserDeletionJob; once committed, `start()` runs it
+    on a background thread. Each step deletes dependants in dependency order
+    with batched `DELETE ... WHERE pk IN (...)` statements, committing the
+    step index and per-step row counts after every batch. `resume_stalled()`
+    (a scheduled job) picks up jobs whose heartbeat stopped.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault("USER_DELETION_BATCH_SIZE", 500)
+        app.config.setdefault("USER_DELETION_LEASE_SECONDS", 120)
+        app.config.setdefault("USER_DELETION_MAX_ATTEMPTS", 5)
+        app.extensions["user_deletion"] = self
+
+    @property
+    def executor(self):
+        # One deletion at a time per process keeps the write load predictable.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-deletion")
+                    self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+                    self._pid = os.getpid()
+        return self._executor
+
+    def enqueue(self, account_type, user_id, requested_by=None):
+        """Return the unfinished job for this user, or add a new one to the session."""
+        job = UserDeletionJob.query.filter(
+            UserDeletionJob.account_type == account_type,
+            UserDeletionJob.user_id == user_id,
+            UserDeletionJob.status.in_(("queued", "running"))
+        ).first()
+        if job is None:
+            job = UserDeletionJob(account_type=account_type, user_id=user_id,
+                                  requested_by=requested_by, progress={})
+            db.session.add(job)
+        return job
+
+    def start(self, job_id):
+        self.executor.submit(self._run_in_context, job_id)
+
+    def _run_in_context(self, job_id):
+        with self.app.app_context():
+            try:
+                self.run(job_id)
+            except Exception as e:
+                db.session.rollback()
+                print(f"User deletion job {job_id} failed: {e}")
+
+    def _claim(self, job_id):
+        """Take the job's lease unless another live worker holds it."""
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.app.config["USER_DELETION_LEASE_SECONDS"])
+        claimed = UserDeletionJob.query.filter(
+            UserDeletionJob.id == job_id,
+            (UserDeletionJob.status == "queued") |
+            ((UserDeletionJob.status == "running") & (UserDeletionJob.locked_at < stale))
+        ).update(
+            {"status": "running", "locked_by": self.owner, "locked_at": now,
+             "attempts": UserDeletionJob.attempts + 1},
+            synchronize_session=False
+        )
+        db.session.commit()
+        return claimed == 1
+
+    def run(self, job_id):
+        if not self._claim(job_id):
+            return None
+
+        job = db.session.get(UserDeletionJob, job_id)
+        steps = STEP_BUILDERS[job.account_type](job.user_id)
+        batch_size = self.app.config["USER_DELETION_BATCH_SIZE"]
+
+        try:
+            while job.current_step < len(steps):
+                step = steps[job.current_step]
+                keys = step.next_batch(batch_size)
+                if keys:
+                    step.apply(keys)
+                    progress = dict(job.progress or {})
+                    progress[step.name] = progress.get(step.name, 0) + len(keys)
+                    job.progress = progress
+                if len(keys) < batch_size:
+                    job.current_step += 1
+                job.locked_at = datetime.utcnow()
+                # Rows and progress land together, so a crash never double counts.
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(UserDeletionJob, job_id)
+            job.last_error = str(e)[:1000]
+            job.locked_by = None
+            job.locked_at = None
+            job.status = "failed" if job.attempts >= self.app.config["USER_DELETION_MAX_ATTEMPTS"] else "queued"
+            db.session.commit()
+            raise
+
+        job.status = "done"
+        job.locked_by = None
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+        invalidate_user(job.account_type, job.user_id)
+        return job.progress
+
+    def resume_stalled(self, limit=20):
+        """Restart queued jobs and jobs whose worker died. Registered as a scheduled job."""
+        stale = datetime.utcnow() - timedelta(seconds=self.app.config["USER_DELETION_LEASE_SECONDS"])
+        job_ids = [row.id for row in db.session.query(UserDeletionJob.id).filter(
+            (UserDeletionJob.status == "queued") |
+            ((UserDeletionJob.status == "running") & (UserDeletionJob.locked_at < stale))
+        ).order_by(UserDeletionJob.id).limit(limit)]
+        for job_id in job_ids:
+            self.start(job_id)
+        return {"resumed": len(job_ids)}
+
+    def describe(self, job):
+        steps = STEP_BUILDERS[job.account_type](job.user_id)
+        return {
+            "id": job.id,
+            "account_type": job.account_type,
+            "user_id": job.user_id,
+            "status": job.status,
+            "step": steps[job.current_step].name if job.current_step < len(steps) else None,
+            "steps_done": job.current_step,
+            "steps_total": len(steps),
+            "rows_deleted": job.progress or {},
+            "attempts": job.attempts,
+            "last_error": job.last_error,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+
+user_deletion = UserDeletionRunner()
@@ -0,0 +1,121 @@
+"""
+Production gunicorn settings. gunicorn picks this file up from the working
+directory, so from the repository root:
+
+    gunicorn
+
+which loads the app factory set in `wsgi_app` below, i.e. "main:create_app()".
+
+Every setting can be overridden with an environment variable:
+
+    GUNICORN_WORKER_CLASS   gthread (default), sync or gevent (pip install gevent psycogreen)
+    WEB_CONCURRENCY         worker processes (default sized from CPU count)
+    GUNICORN_THREADS        threads per gthread worker (default 4)
+    GUNICORN_WORKER_CONNECTIONS  concurrent requests per gevent worker (default 100)
+    GUNICORN_BIND           default 0.0.0.0:$PORT or 0.0.0.0:8000
+    GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE
+    GUNICORN_MAX_REQUESTS, GUNICORN_MAX_REQUESTS_JITTER
+
+The app is imported once in the master (preload_app) and forked, so workers
+share its memory copy-on-write and boot instantly. Anything the master
+opened that can't cross a fork - pooled database connections - is dropped in
+post_fork. Background threads (scheduler, upload and email pools) already
+start lazily per process.
+
+Keep DB_POOL_SIZE (core/db_engine.py) at least as large as the threads or
+worker connections of one worker, or requests will queue for connections.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+wsgi_app = "main:create_app()"
+
+cpu_count = multiprocessing.cpu_count()
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_class == "gevent":
+    # Patch before the app (and its database drivers) is preloaded, not in
+    # the worker after fork, so every lock and socket the app creates is
+    # already cooperative.
+    from gevent import monkey
+    monkey.patch_all()
+
+    try:
+        # psycopg2 is a C extension; psycogreen makes it yield to the hub
+        # while waiting on the server.
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    except ImportError:
+        pass
+    # mysqlclient can't be made cooperative: use PyMySQL (pure Python, covered
+    # by patch_all) with a mysql+pymysql:// DATABASE_URL under gevent.
+
+    workers = int(os.getenv("WEB_CONCURRENCY", cpu_count))
+    worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 100))
+elif worker_class == "sync":
+    workers = int(os.getenv("WEB_CONCURRENCY", cpu_count * 2 + 1))
+else:
+    worker_class = "gthread"
+    # Requests spend most of their time waiting on the database, so a few
+    # threads per process go further than extra processes.
+    workers = int(os.getenv("WEB_CONCURRENCY", cpu_count + 1))
+    threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks can't grow without bound; the
+# jitter keeps them from all restarting at the same moment.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+# Keep worker heartbeat files off disk-backed /tmp (a slow disk can get
+# healthy workers killed for missing their timeout).
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None  # empty disables
+errorlog = "-"
+
+# Serve the spec compiled by `flask build-openapi` rather than parsing every
+# route docstring again in each worker (see core/api_docs.py).
+os.environ.setdefault("SWAGGER_ENABLED", "false")
+
+# Metrics from every worker are merged through this directory (see
+# core/metrics.py). It must exist, empty, before the app is imported; a
+# directory per master process guarantees that unless one was configured.
+if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = os.path.join(tempfile.gettempdir(), f"rsc-prometheus-{os.getpid()}")
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+    _owns_metrics_dir = True
+else:
+    _owns_metrics_dir = False
+
+
+def on_exit(server):
+    if _owns_metrics_dir:
+        shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+
+
+def post_fork(server, worker):
+    from core.extensions import db
+
+    app = server.app.wsgi()  # the app preloaded in the master
+
+    # Connections inherited from the master would be shared by two
+    # processes; close=False leaves them for the master and gives this
+    # worker fresh pools.
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from core.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
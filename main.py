@@ -1,26 +1,66 @@
-from core.imports import jsonify, text, inspect, Flask
+from core.imports import Flask
 from core.config import Config
-from core.extensions import db, jwt, swagger, cors, bcrypt, migrate, mail
-from routes.auth import auth_bp, seed_demo_vendor, seed_demo_buyer
+from core.extensions import db, jwt, cors, bcrypt, migrate, mail
+from core.email_queue import email_queue
+from core.geolocation import geolocator
+from core.scheduler import scheduler
+from core.identity import init_identity_cache
+from core.image_variants import variant_pipeline
+from core.image_gc import ImageGarbageCollector
+from core.kyc_ingest import kyc_ingestor
+from core.admin_stats import init_admin_stats, fold_admin_stats_deltas, reconcile_admin_stats
+from core.user_deletion import user_deletion
+from core.metrics import request_metrics
+from core.query_stats import init_query_stats
+from core.db_engine import init_db_engine
+from core.replicas import replica_router
+from core.api_docs import init_api_docs
+from core.seed import init_seed
+from routes.auth import auth_bp, cleanup_expired_pending, profile_store
 from routes.admin import admin_bp
-from routes.vendor import seed_categories, seed_products, vendor_bp
+from routes.vendor import vendor_bp, product_store
 from routes.marketplace import marketplace_bp
 from routes.cart import cart_bp
 from routes.buyerOrders import buyer_orders
 from routes.buyers import buyers_bp
-from routes.vendorOrders import vendor_orders, seed_demo_orders
+from routes.vendorOrders import vendor_orders
+from routes.referrals import referrals_bp
+from routes.images import images_bp
+from routes.db_browser import db_browser_bp
 
-def create_app():
+def create_app(config=None):
+    """
+    Build the app. Nothing is created at import time: gunicorn loads
+    `main:create_app()` (see gunicorn.conf.py) and the flask CLI finds this
+    factory with FLASK_APP=main. `config` overrides Config, e.g. in tests.
+    """
     app = Flask(__name__)
     app.config.from_object(Config)
+    if config:
+        app.config.update(config)
 
+    request_metrics.init_app(app)
+    init_query_stats(app)
     db.init_app(app)
+    init_db_engine(app, db)
+    replica_router.init_app(app)
     jwt.init_app(app)
-    swagger.init_app(app)
+    init_api_docs(app)
     cors.init_app(app)
     bcrypt.init_app(app)
     mail.init_app(app)
     migrate.init_app(app, db)
+    email_queue.init_app(app)
+    geolocator.init_app(app)
+    scheduler.init_app(app)
+    init_identity_cache(app)
+    variant_pipeline.init_app(app, store=product_store)
+    image_gc = ImageGarbageCollector(product_store, profile_store)
+    image_gc.init_app(app)
+    kyc_ingestor.init_app(app)
+    init_admin_stats(app)
+    user_deletion.init_app(app)
+    init_seed(app)
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(admin_bp)
@@ -30,40 +70,46 @@ def create_app():
     app.register_blueprint(buyers_bp)
     app.register_blueprint(buyer_orders)
     app.register_blueprint(vendor_orders)
+    app.register_blueprint(referrals_bp)
+    app.register_blueprint(images_bp)
+    app.register_blueprint(db_browser_bp)
+    app.add_url_rule('/ping', 'ping', ping)
 
-    return app
+    scheduler.register(
+        "purge_expired_pending",
+        lambda: cleanup_expired_pending(app.config["PURGE_BATCH_SIZE"]),
+        interval=app.config["PURGE_INTERVAL_SECONDS"]
+    )
+    scheduler.register("sweep_image_variants", variant_pipeline.sweep_pending, interval=300)
+    scheduler.register("image_gc", image_gc.run, interval=app.config["IMAGE_GC_INTERVAL_SECONDS"])
+    scheduler.register("retry_kyc_uploads", kyc_ingestor.sweep, interval=300)
+    scheduler.register(
+        "fold_admin_stats",
+        fold_admin_stats_deltas,
+        interval=app.config["ADMIN_STATS_FOLD_SECONDS"]
+    )
+    scheduler.register(
+        "reconcile_admin_stats",
+        reconcile_admin_stats,
+        interval=app.config["ADMIN_STATS_RECONCILE_SECONDS"]
+    )
+    scheduler.register("resume_user_deletions", user_deletion.resume_stalled, interval=60)
+    if replica_router.enabled:
+        scheduler.register(
+            "replica_heartbeat",
+            replica_router.write_heartbeat,
+            interval=app.config["REPLICA_HEARTBEAT_SECONDS"]
+        )
 
-app = create_app()
+    return app
 
-@app.route('/ping')
 def ping():
     return "Ping received", 200
 
-@app.route("/view_db")
-def view_db():
-    try:
-        inspector = inspect(db.engine)
-        tables = inspector.get_table_names()
-        db_data = {}
-
-        for table in tables:
-            result = db.session.execute(text(f"SELECT * FROM `{table}`"))
-            rows = [dict(row._mapping) for row in result]
-            db_data[table] = rows
-
-        return jsonify(db_data)
-    except Exception as e:
-        return jsonify({"error": str(e)})
-    
 
 if __name__ == "__main__":
+    app = create_app()
     with app.app_context():
         db.create_all()
 
-        seed_demo_vendor()
-        seed_demo_buyer()
-        seed_categories()
-        seed_products()
-        seed_demo_orders()
-
     app.run(debug=True)
@@ -0,0 +1,191 @@
+"""Tables and columns the initial migration missed
+
+The initial migration only created buyers and vendors; every other table
+the app used at the time was created by db.create_all(). This adds them
+as they were then, so `flask db upgrade` builds the whole schema on an
+empty database. A database that was built with db.create_all() before
+the later migrations should be marked with `flask db stamp 4d2a91c7e5b3`
+first.
+
+Revision ID: 4d2a91c7e5b3
+Revises: ea7dcee4b6fa
+Create Date: 2026-10-19 09:12:41.302518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4d2a91c7e5b3'
+down_revision = 'ea7dcee4b6fa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('buyers', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_pic', sa.String(length=500), nullable=True))
+
+    with op.batch_alter_table('vendors', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_pic', sa.String(length=500), nullable=True))
+
+    op.create_table('admins',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('password', sa.String(length=200), nullable=False),
+    sa.Column('role', sa.String(length=50), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('admins', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_admins_email'), ['email'], unique=True)
+
+    op.create_table('pending_buyers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('password', sa.String(length=255), nullable=True),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('country', sa.String(length=100), nullable=True),
+    sa.Column('referral_code', sa.String(length=50), nullable=True),
+    sa.Column('otp_code', sa.String(length=6), nullable=False),
+    sa.Column('otp_expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('pending_vendors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('firstname', sa.String(length=255), nullable=False),
+    sa.Column('lastname', sa.String(length=255), nullable=False),
+    sa.Column('business_name', sa.String(length=255), nullable=False),
+    sa.Column('business_type', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=False),
+    sa.Column('password', sa.String(length=255), nullable=False),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('country', sa.String(length=100), nullable=True),
+    sa.Column('referral_code', sa.String(length=50), nullable=True),
+    sa.Column('otp_code', sa.String(length=6), nullable=False),
+    sa.Column('otp_expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email')
+    )
+    op.create_table('category',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_name', sa.String(length=150), nullable=False),
+    sa.Column('product_price', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('condition', sa.String(length=100), nullable=True),
+    sa.Column('date_posted', sa.DateTime(), nullable=True),
+    sa.Column('sold_date', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('visibility', sa.Boolean(), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('vendor_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['category_id'], ['category.id'], ),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendors.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('product_images',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('vendor_id', sa.Integer(), nullable=False),
+    sa.Column('image_url', sa.String(length=500), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendors.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('storefront',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('business_name', sa.String(length=150), nullable=False),
+    sa.Column('business_banner', sa.JSON(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('established_at', sa.DateTime(), nullable=True),
+    sa.Column('ratings', sa.Float(), nullable=True),
+    sa.Column('vendor_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendors.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('vendor_id')
+    )
+    op.create_table('cart',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('buyer_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['buyer_id'], ['buyers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('cart_item',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cart_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['cart_id'], ['cart.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('favourites',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('buyer_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('date_added', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['buyer_id'], ['buyers.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('order',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('buyer_id', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('reference', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['buyer_id'], ['buyers.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('reference')
+    )
+    op.create_table('order_item',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('product_name', sa.String(length=200), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['order.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('order_item')
+    op.drop_table('order')
+    op.drop_table('favourites')
+    op.drop_table('cart_item')
+    op.drop_table('cart')
+    op.drop_table('storefront')
+    op.drop_table('product_images')
+    op.drop_table('products')
+    op.drop_table('category')
+    op.drop_table('pending_vendors')
+    op.drop_table('pending_buyers')
+    with op.batch_alter_table('admins', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_admins_email'))
+
+    op.drop_table('admins')
+    with op.batch_alter_table('vendors', schema=None) as batch_op:
+        batch_op.drop_column('profile_pic')
+
+    with op.batch_alter_table('buyers', schema=None) as batch_op:
+        batch_op.drop_column('profile_pic')
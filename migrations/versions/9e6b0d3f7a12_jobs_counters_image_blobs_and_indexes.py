@@ -0,0 +1,369 @@
+"""Job tables, counters, image blobs and query indexes
+
+Revision ID: 9e6b0d3f7a12
+Revises: 4d2a91c7e5b3
+Create Date: 2026-10-19 09:48:05.117204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e6b0d3f7a12'
+down_revision = '4d2a91c7e5b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Scheduler leases and background jobs
+    op.create_table('job_locks',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('owner', sa.String(length=100), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('last_started_at', sa.DateTime(), nullable=True),
+    sa.Column('last_finished_at', sa.DateTime(), nullable=True),
+    sa.Column('last_duration_ms', sa.Integer(), nullable=True),
+    sa.Column('last_result', sa.JSON(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('run_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('email_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('recipient', sa.String(length=255), nullable=False),
+    sa.Column('subject', sa.String(length=255), nullable=False),
+    sa.Column('html_body', sa.Text(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('locked_by', sa.String(length=64), nullable=True),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('email_jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_email_jobs_status_next_attempt', ['status', 'next_attempt_at'], unique=False)
+
+    op.create_table('user_deletion_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('account_type', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('requested_by', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('current_step', sa.Integer(), nullable=False),
+    sa.Column('progress', sa.JSON(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('locked_by', sa.String(length=100), nullable=True),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('user_deletion_jobs', schema=None) as batch_op:
+        batch_op.create_index('ix_user_deletion_jobs_status', ['status', 'locked_at'], unique=False)
+        batch_op.create_index('ix_user_deletion_jobs_target', ['account_type', 'user_id'], unique=False)
+
+    op.create_table('replica_heartbeat',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('beat_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Password resets and KYC
+    op.create_table('password_reset_tokens',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('otp_code', sa.String(length=6), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('password_reset_tokens', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_password_reset_tokens_email'), ['email'], unique=False)
+        batch_op.create_index(batch_op.f('ix_password_reset_tokens_expires_at'), ['expires_at'], unique=False)
+
+    op.create_table('kyc_submissions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('vendor_id', sa.Integer(), nullable=False),
+    sa.Column('id_document_path', sa.String(length=500), nullable=True),
+    sa.Column('proof_of_address_path', sa.String(length=500), nullable=True),
+    sa.Column('id_document_url', sa.String(length=500), nullable=True),
+    sa.Column('proof_of_address_url', sa.String(length=500), nullable=True),
+    sa.Column('upload_status', sa.String(length=20), nullable=False),
+    sa.Column('id_document_attempts', sa.Integer(), nullable=False),
+    sa.Column('proof_of_address_attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('review_status', sa.String(length=20), nullable=False),
+    sa.Column('reviewed_by', sa.Integer(), nullable=True),
+    sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+    sa.Column('review_note', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['reviewed_by'], ['admins.id'], ),
+    sa.ForeignKeyConstraint(['vendor_id'], ['vendors.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('kyc_submissions', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_kyc_submissions_vendor_id'), ['vendor_id'], unique=False)
+        batch_op.create_index('ix_kyc_submissions_review_queue', ['review_status', 'id'], unique=False)
+        batch_op.create_index('ix_kyc_submissions_upload_status', ['upload_status', 'updated_at'], unique=False)
+
+    # Referral counters
+    op.create_table('referral_stats',
+    sa.Column('referral_code', sa.String(length=200), nullable=False),
+    sa.Column('owner_role', sa.String(length=20), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('referral_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('referral_code')
+    )
+    with op.batch_alter_table('referral_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_referral_stats_referral_count'), ['referral_count'], unique=False)
+        batch_op.create_index('ix_referral_stats_owner', ['owner_role', 'owner_id'], unique=False)
+
+    op.create_table('referrals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('referrer_code', sa.String(length=200), nullable=False),
+    sa.Column('referee_role', sa.String(length=20), nullable=False),
+    sa.Column('referee_id', sa.Integer(), nullable=False),
+    sa.Column('referee_code', sa.String(length=200), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('referrals', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_referrals_referee_code'), ['referee_code'], unique=False)
+        batch_op.create_index(batch_op.f('ix_referrals_referrer_code'), ['referrer_code'], unique=False)
+
+    # Admin dashboard counters
+    op.create_table('admin_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('buyers', sa.Integer(), nullable=False),
+    sa.Column('vendors', sa.Integer(), nullable=False),
+    sa.Column('storefronts', sa.Integer(), nullable=False),
+    sa.Column('products_total', sa.Integer(), nullable=False),
+    sa.Column('products_active', sa.Integer(), nullable=False),
+    sa.Column('products_inactive', sa.Integer(), nullable=False),
+    sa.Column('products_hidden', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('admin_stats_deltas',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('buyers', sa.Integer(), nullable=False),
+    sa.Column('vendors', sa.Integer(), nullable=False),
+    sa.Column('storefronts', sa.Integer(), nullable=False),
+    sa.Column('products_total', sa.Integer(), nullable=False),
+    sa.Column('products_active', sa.Integer(), nullable=False),
+    sa.Column('products_inactive', sa.Integer(), nullable=False),
+    sa.Column('products_hidden', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('admin_stats_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('taken_at', sa.DateTime(), nullable=False),
+    sa.Column('buyers', sa.Integer(), nullable=False),
+    sa.Column('vendors', sa.Integer(), nullable=False),
+    sa.Column('storefronts', sa.Integer(), nullable=False),
+    sa.Column('products_total', sa.Integer(), nullable=False),
+    sa.Column('products_active', sa.Integer(), nullable=False),
+    sa.Column('products_inactive', sa.Integer(), nullable=False),
+    sa.Column('products_hidden', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('admin_stats_snapshots', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_admin_stats_snapshots_taken_at'), ['taken_at'], unique=False)
+
+    # Content-addressed image storage
+    op.create_table('image_blobs',
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(length=200), nullable=False),
+    sa.Column('url', sa.String(length=500), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('uploaded_by', sa.Integer(), nullable=True),
+    sa.Column('variant_status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['uploaded_by'], ['vendors.id'], ),
+    sa.PrimaryKeyConstraint('sha256')
+    )
+    with op.batch_alter_table('image_blobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_image_blobs_uploaded_by'), ['uploaded_by'], unique=False)
+        batch_op.create_index(batch_op.f('ix_image_blobs_url'), ['url'], unique=True)
+        batch_op.create_index(batch_op.f('ix_image_blobs_variant_status'), ['variant_status'], unique=False)
+
+    op.create_table('image_variants',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('blob_hash', sa.String(length=64), nullable=False),
+    sa.Column('size_name', sa.String(length=20), nullable=False),
+    sa.Column('format', sa.String(length=10), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('height', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=200), nullable=False),
+    sa.Column('url', sa.String(length=500), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['blob_hash'], ['image_blobs.sha256'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('blob_hash', 'size_name', 'format', name='uq_image_variant')
+    )
+
+    # New columns on existing tables. is_deleted gets a server default so
+    # existing image rows can take the NOT NULL column.
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('quantity', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_products_category_id'), ['category_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_products_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_products_vendor_id'), ['vendor_id'], unique=False)
+
+    with op.batch_alter_table('product_images', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('blob_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('is_deleted', sa.Boolean(), server_default=sa.false(), nullable=False))
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+        batch_op.create_foreign_key('fk_product_images_blob_hash_image_blobs', 'image_blobs', ['blob_hash'], ['sha256'])
+        batch_op.create_index(batch_op.f('ix_product_images_blob_hash'), ['blob_hash'], unique=False)
+        batch_op.create_index(batch_op.f('ix_product_images_deleted_at'), ['deleted_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_product_images_product_id'), ['product_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_product_images_vendor_id'), ['vendor_id'], unique=False)
+
+    # Indexes for the listing, referral, purge and cascade queries
+    with op.batch_alter_table('buyers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_buyers_referral_code'), ['referral_code'], unique=False)
+        batch_op.create_index(batch_op.f('ix_buyers_referred_by'), ['referred_by'], unique=False)
+        batch_op.create_index('ix_buyers_country_id', ['country', 'id'], unique=False)
+
+    with op.batch_alter_table('vendors', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_vendors_referral_code'), ['referral_code'], unique=False)
+        batch_op.create_index(batch_op.f('ix_vendors_referred_by'), ['referred_by'], unique=False)
+        batch_op.create_index('ix_vendors_kyc_status_id', ['kyc_status', 'id'], unique=False)
+        batch_op.create_index('ix_vendors_country_id', ['country', 'id'], unique=False)
+
+    with op.batch_alter_table('pending_buyers', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_pending_buyers_otp_expires_at'), ['otp_expires_at'], unique=False)
+
+    with op.batch_alter_table('pending_vendors', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_pending_vendors_otp_expires_at'), ['otp_expires_at'], unique=False)
+
+    with op.batch_alter_table('cart', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cart_buyer_id'), ['buyer_id'], unique=False)
+
+    with op.batch_alter_table('cart_item', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cart_item_cart_id'), ['cart_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cart_item_product_id'), ['product_id'], unique=False)
+
+    with op.batch_alter_table('favourites', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_favourites_buyer_id'), ['buyer_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_favourites_product_id'), ['product_id'], unique=False)
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_buyer_id'), ['buyer_id'], unique=False)
+
+    with op.batch_alter_table('order_item', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_order_item_order_id'), ['order_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_order_item_product_id'), ['product_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('order_item', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_item_product_id'))
+        batch_op.drop_index(batch_op.f('ix_order_item_order_id'))
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_order_buyer_id'))
+
+    with op.batch_alter_table('favourites', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_favourites_product_id'))
+        batch_op.drop_index(batch_op.f('ix_favourites_buyer_id'))
+
+    with op.batch_alter_table('cart_item', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cart_item_product_id'))
+        batch_op.drop_index(batch_op.f('ix_cart_item_cart_id'))
+
+    with op.batch_alter_table('cart', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cart_buyer_id'))
+
+    with op.batch_alter_table('pending_vendors', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_pending_vendors_otp_expires_at'))
+
+    with op.batch_alter_table('pending_buyers', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_pending_buyers_otp_expires_at'))
+
+    with op.batch_alter_table('vendors', schema=None) as batch_op:
+        batch_op.drop_index('ix_vendors_country_id')
+        batch_op.drop_index('ix_vendors_kyc_status_id')
+        batch_op.drop_index(batch_op.f('ix_vendors_referred_by'))
+        batch_op.drop_index(batch_op.f('ix_vendors_referral_code'))
+
+    with op.batch_alter_table('buyers', schema=None) as batch_op:
+        batch_op.drop_index('ix_buyers_country_id')
+        batch_op.drop_index(batch_op.f('ix_buyers_referred_by'))
+        batch_op.drop_index(batch_op.f('ix_buyers_referral_code'))
+
+    with op.batch_alter_table('product_images', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_images_vendor_id'))
+        batch_op.drop_index(batch_op.f('ix_product_images_product_id'))
+        batch_op.drop_index(batch_op.f('ix_product_images_deleted_at'))
+        batch_op.drop_index(batch_op.f('ix_product_images_blob_hash'))
+        batch_op.drop_constraint('fk_product_images_blob_hash_image_blobs', type_='foreignkey')
+        batch_op.drop_column('deleted_at')
+        batch_op.drop_column('is_deleted')
+        batch_op.drop_column('blob_hash')
+
+    with op.batch_alter_table('products', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_products_vendor_id'))
+        batch_op.drop_index(batch_op.f('ix_products_created_at'))
+        batch_op.drop_index(batch_op.f('ix_products_category_id'))
+        batch_op.drop_column('quantity')
+
+    op.drop_table('image_variants')
+    with op.batch_alter_table('image_blobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_image_blobs_variant_status'))
+        batch_op.drop_index(batch_op.f('ix_image_blobs_url'))
+        batch_op.drop_index(batch_op.f('ix_image_blobs_uploaded_by'))
+
+    op.drop_table('image_blobs')
+    with op.batch_alter_table('admin_stats_snapshots', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_admin_stats_snapshots_taken_at'))
+
+    op.drop_table('admin_stats_snapshots')
+    op.drop_table('admin_stats_deltas')
+    op.drop_table('admin_stats')
+    with op.batch_alter_table('referrals', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_referrals_referrer_code'))
+        batch_op.drop_index(batch_op.f('ix_referrals_referee_code'))
+
+    op.drop_table('referrals')
+    with op.batch_alter_table('referral_stats', schema=None) as batch_op:
+        batch_op.drop_index('ix_referral_stats_owner')
+        batch_op.drop_index(batch_op.f('ix_referral_stats_referral_count'))
+
+    op.drop_table('referral_stats')
+    with op.batch_alter_table('kyc_submissions', schema=None) as batch_op:
+        batch_op.drop_index('ix_kyc_submissions_upload_status')
+        batch_op.drop_index('ix_kyc_submissions_review_queue')
+        batch_op.drop_index(batch_op.f('ix_kyc_submissions_vendor_id'))
+
+    op.drop_table('kyc_submissions')
+    with op.batch_alter_table('password_reset_tokens', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_password_reset_tokens_expires_at'))
+        batch_op.drop_index(batch_op.f('ix_password_reset_tokens_email'))
+
+    op.drop_table('password_reset_tokens')
+    op.drop_table('replica_heartbeat')
+    with op.batch_alter_table('user_deletion_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_deletion_jobs_target')
+        batch_op.drop_index('ix_user_deletion_jobs_status')
+
+    op.drop_table('user_deletion_jobs')
+    with op.batch_alter_table('email_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_email_jobs_status_next_attempt')
+
+    op.drop_table('email_jobs')
+    op.drop_table('job_locks')
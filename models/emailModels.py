@@ -0,0 +1,26 @@
+from core.extensions import db
+from core.imports import datetime
+
+
+class EmailJob(db.Model):
+    __tablename__ = "email_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html_body = db.Column(db.Text, nullable=False)
+
+    status = db.Column(db.String(20), default="queued", nullable=False)  # 'queued', 'sending', 'sent', 'failed'
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    locked_by = db.Column(db.String(64), nullable=True)  # worker that claimed the job
+    locked_at = db.Column(db.DateTime, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_email_jobs_status_next_attempt", "status", "next_attempt_at"),
+    )
@@ -0,0 +1,64 @@
+from core.extensions import db
+from core.imports import datetime
+
+
+class JobLock(db.Model):
+    """
+    One row per scheduled job. Doubles as the leader-election lease (only the
+    worker holding an unexpired lease runs the job) and as the record of the
+    job's last run.
+    """
+    __tablename__ = "job_locks"
+
+    name = db.Column(db.String(100), primary_key=True)
+    owner = db.Column(db.String(100), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+
+    last_started_at = db.Column(db.DateTime, nullable=True)
+    last_finished_at = db.Column(db.DateTime, nullable=True)
+    last_duration_ms = db.Column(db.Integer, nullable=True)
+    last_result = db.Column(db.JSON, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    run_count = db.Column(db.Integer, default=0, nullable=False)
+
+
+class UserDeletionJob(db.Model):
+    """
+    A buyer or vendor being deleted in the background (see core/user_deletion.py).
+    `current_step` and `progress` are committed after every batch, so a job
+    that dies part-way resumes where it stopped.
+    """
+    __tablename__ = "user_deletion_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    account_type = db.Column(db.String(20), nullable=False)  # 'buyer', 'vendor'
+    user_id = db.Column(db.Integer, nullable=False)
+    requested_by = db.Column(db.Integer, nullable=True)  # admin id
+
+    status = db.Column(db.String(20), default="queued", nullable=False)  # 'queued', 'running', 'done', 'failed'
+    current_step = db.Column(db.Integer, default=0, nullable=False)
+    progress = db.Column(db.JSON, nullable=True)  # {step name: rows affected}
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)  # heartbeat, refreshed every batch
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_user_deletion_jobs_target", "account_type", "user_id"),
+        db.Index("ix_user_deletion_jobs_status", "status", "locked_at"),
+    )
+
+
+class ReplicaHeartbeat(db.Model):
+    """
+    Single row the primary stamps on a schedule. Reading it back from a read
+    replica shows how far behind that replica is (see core/replicas.py).
+    """
+    __tablename__ = "replica_heartbeat"
+
+    id = db.Column(db.Integer, primary_key=True)  # always 1
+    beat_at = db.Column(db.DateTime, nullable=False)
@@ -0,0 +1,37 @@
+from core.extensions import db
+from core.imports import datetime
+
+
+class KycSubmission(db.Model):
+    __tablename__ = "kyc_submissions"
+
+    id = db.Column(db.Integer, primary_key=True)
+    vendor_id = db.Column(db.Integer, db.ForeignKey("vendors.id"), nullable=False, index=True)
+
+    # Local staging copies, removed once the document store has the file.
+    id_document_path = db.Column(db.String(500), nullable=True)
+    proof_of_address_path = db.Column(db.String(500), nullable=True)
+    id_document_url = db.Column(db.String(500), nullable=True)
+    proof_of_address_url = db.Column(db.String(500), nullable=True)
+
+    upload_status = db.Column(db.String(20), default="staged", nullable=False)  # 'staged', 'uploaded', 'failed'
+    # Failed uploads per document; the two documents upload independently.
+    id_document_attempts = db.Column(db.Integer, default=0, nullable=False)
+    proof_of_address_attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+
+    review_status = db.Column(db.String(20), default="pending", nullable=False)  # 'pending', 'verified', 'rejected'
+    reviewed_by = db.Column(db.Integer, db.ForeignKey("admins.id"), nullable=True)
+    reviewed_at = db.Column(db.DateTime, nullable=True)
+    review_note = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    vendor = db.relationship("Vendors")
+
+    __table_args__ = (
+        # The admin queue walks pending submissions by id.
+        db.Index("ix_kyc_submissions_review_queue", "review_status", "id"),
+        db.Index("ix_kyc_submissions_upload_status", "upload_status", "updated_at"),
+    )
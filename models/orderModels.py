@@ -3,7 +3,7 @@ from core.imports import datetime
 
 class Order(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    buyer_id = db.Column(db.Integer, db.ForeignKey("buyers.id"), nullable=False)
+    buyer_id = db.Column(db.Integer, db.ForeignKey("buyers.id"), nullable=False, index=True)
     total_amount = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(50), default="pending")  # pending, shipped, delivered
     reference = db.Column(db.String(100), unique=True, nullable=True)
@@ -14,8 +14,8 @@ class Order(db.Model):
 
 class OrderItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=True)
+    order_id = db.Column(db.Integer, db.ForeignKey("order.id"), nullable=False, index=True)
+    product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=True, index=True)
     product_name = db.Column(db.String(200), nullable=False)  # snapshot of product name
     quantity = db.Column(db.Integer, nullable=False)
     price = db.Column(db.Float, nullable=False)  # price per unit
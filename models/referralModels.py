@@ -0,0 +1,29 @@
+from core.extensions import db
+from core.imports import datetime
+
+
+class ReferralStat(db.Model):
+    """Per-code referral counter, maintained when a referred account verifies its email."""
+    __tablename__ = "referral_stats"
+
+    referral_code = db.Column(db.String(200), primary_key=True)
+    owner_role = db.Column(db.String(20), nullable=False)  # 'buyer', 'vendor'
+    owner_id = db.Column(db.Integer, nullable=False)
+    referral_count = db.Column(db.Integer, default=0, nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_referral_stats_owner", "owner_role", "owner_id"),
+    )
+
+
+class Referral(db.Model):
+    """One edge of the referral tree: `referrer_code` brought in the referee account."""
+    __tablename__ = "referrals"
+
+    id = db.Column(db.Integer, primary_key=True)
+    referrer_code = db.Column(db.String(200), nullable=False, index=True)
+    referee_role = db.Column(db.String(20), nullable=False)
+    referee_id = db.Column(db.Integer, nullable=False)
+    referee_code = db.Column(db.String(200), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,52 @@
+from core.extensions import db
+from core.imports import datetime
+
+
+class AdminStats(db.Model):
+    """
+    Single-row table of platform counters. Writes append to admin_stats_deltas
+    instead of updating this row; a scheduled job folds those in, and another
+    reconciles the row against real counts (see core/admin_stats.py).
+    """
+    __tablename__ = "admin_stats"
+
+    id = db.Column(db.Integer, primary_key=True)  # always 1
+    buyers = db.Column(db.Integer, default=0, nullable=False)
+    vendors = db.Column(db.Integer, default=0, nullable=False)
+    storefronts = db.Column(db.Integer, default=0, nullable=False)
+    products_total = db.Column(db.Integer, default=0, nullable=False)
+    products_active = db.Column(db.Integer, default=0, nullable=False)  # status 'active' and visible
+    products_inactive = db.Column(db.Integer, default=0, nullable=False)  # status != 'active'
+    products_hidden = db.Column(db.Integer, default=0, nullable=False)  # visibility False
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    reconciled_at = db.Column(db.DateTime, nullable=True)
+
+
+class AdminStatsDelta(db.Model):
+    """Insert-only counter changes, one row per flush or bulk write, until folded into admin_stats."""
+    __tablename__ = "admin_stats_deltas"
+
+    id = db.Column(db.Integer, primary_key=True)
+    buyers = db.Column(db.Integer, default=0, nullable=False)
+    vendors = db.Column(db.Integer, default=0, nullable=False)
+    storefronts = db.Column(db.Integer, default=0, nullable=False)
+    products_total = db.Column(db.Integer, default=0, nullable=False)
+    products_active = db.Column(db.Integer, default=0, nullable=False)
+    products_inactive = db.Column(db.Integer, default=0, nullable=False)
+    products_hidden = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class AdminStatsSnapshot(db.Model):
+    """Counter values recorded by each reconcile run, for trend charts."""
+    __tablename__ = "admin_stats_snapshots"
+
+    id = db.Column(db.Integer, primary_key=True)
+    taken_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    buyers = db.Column(db.Integer, nullable=False)
+    vendors = db.Column(db.Integer, nullable=False)
+    storefronts = db.Column(db.Integer, nullable=False)
+    products_total = db.Column(db.Integer, nullable=False)
+    products_active = db.Column(db.Integer, nullable=False)
+    products_inactive = db.Column(db.Integer, nullable=False)
+    products_hidden = db.Column(db.Integer, nullable=False)
@@ -18,13 +18,18 @@ class Buyers(db.Model):
     phone = db.Column(db.String(20), nullable=True)
     password = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(200), nullable=False)
-    referral_code = db.Column(db.String(200), nullable=False)
-    referred_by = db.Column(db.String(200), nullable=True)
+    referral_code = db.Column(db.String(200), nullable=False, index=True)
+    referred_by = db.Column(db.String(200), nullable=True, index=True)
     profile_pic = db.Column(db.String(500), nullable=True)
 
     state = db.Column(db.String(200))
     country = db.Column(db.String(200))
 
+    __table_args__ = (
+        # Admin user listing: filter by country, page by id.
+        db.Index("ix_buyers_country_id", "country", "id"),
+    )
+
 
 class Vendors(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -40,9 +45,15 @@ class Vendors(db.Model):
     state = db.Column(db.String(200))
     country = db.Column(db.String(200))
 
-    referral_code = db.Column(db.String(200), nullable=False)
-    referred_by = db.Column(db.String(200), nullable=True)
-    kyc_status = db.Column(db.String(50), default="unverified")  # 'unverified', 'pending', 'verified'
+    referral_code = db.Column(db.String(200), nullable=False, index=True)
+    referred_by = db.Column(db.String(200), nullable=True, index=True)
+    kyc_status = db.Column(db.String(50), default="unverified")  # 'unverified', 'pending', 'verified', 'rejected'
+
+    __table_args__ = (
+        # Admin user listing: filter by kyc_status or country, page by id.
+        db.Index("ix_vendors_kyc_status_id", "kyc_status", "id"),
+        db.Index("ix_vendors_country_id", "country", "id"),
+    )
 
 
 
@@ -57,7 +68,7 @@ class PendingBuyer(db.Model):
     country = db.Column(db.String(100))
     referral_code = db.Column(db.String(50))
     otp_code = db.Column(db.String(6), nullable=False)
-    otp_expires_at = db.Column(db.DateTime, nullable=False)
+    otp_expires_at = db.Column(db.DateTime, nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
@@ -75,5 +86,14 @@ class PendingVendor(db.Model):
     country = db.Column(db.String(100))
     referral_code = db.Column(db.String(50))
     otp_code = db.Column(db.String(6), nullable=False)
-    otp_expires_at = db.Column(db.DateTime, nullable=False)
+    otp_expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class PasswordResetToken(db.Model):
+    __tablename__ = "password_reset_tokens"
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(255), nullable=False, index=True)
+    otp_code = db.Column(db.String(6), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
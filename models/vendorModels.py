@@ -10,6 +10,7 @@ class Products(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     product_name = db.Column(db.String(150), nullable=False)
     product_price = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, default=0)  # units in stock
     description = db.Column(db.Text, nullable=False)
     condition = db.Column(db.String(100), nullable=True)
     date_posted = db.Column(db.DateTime, default=datetime.utcnow)
@@ -18,25 +19,80 @@ class Products(db.Model):
     status = db.Column(db.String(50), default="active")   # 'active', 'inactive'
     visibility = db.Column(db.Boolean, default=True)      # True = visible, False = hidden
 
-    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False, index=True)
     category = db.relationship('Category', backref='products')
 
-    vendor_id = db.Column(db.Integer, db.ForeignKey('vendors.id'), nullable=False)
+    vendor_id = db.Column(db.Integer, db.ForeignKey('vendors.id'), nullable=False, index=True)
     vendor = db.relationship('Vendors', backref='products')
 
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def image_urls(self, size=None, fmt=None):
+        """URLs of the product's live images, using the `size` variant where one exists."""
+        urls = []
+        for image in self.images:
+            if image.is_deleted:
+                continue
+            url = image.blob.variant_url(size, fmt) if size and image.blob else None
+            urls.append(url or image.image_url)
+        return urls
 
 
 class ProductImages(db.Model):
     __tablename__ = "product_images"
     id = db.Column(db.Integer, primary_key=True)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
-    vendor_id = db.Column(db.Integer, db.ForeignKey('vendors.id'), nullable=False)  # who uploaded
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False, index=True)
+    vendor_id = db.Column(db.Integer, db.ForeignKey('vendors.id'), nullable=False, index=True)  # who uploaded
     image_url = db.Column(db.String(500), nullable=False)
+    blob_hash = db.Column(db.String(64), db.ForeignKey('image_blobs.sha256'), nullable=True, index=True)
+    is_deleted = db.Column(db.Boolean, default=False, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     product = db.relationship('Products', backref='images')
     vendor = db.relationship('Vendors')
+    blob = db.relationship('ImageBlob')
+
+
+class ImageBlob(db.Model):
+    """A stored image file, named by the SHA-256 of its contents."""
+    __tablename__ = "image_blobs"
+    sha256 = db.Column(db.String(64), primary_key=True)
+    filename = db.Column(db.String(200), nullable=False)
+    url = db.Column(db.String(500), nullable=False, unique=True, index=True)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    ref_count = db.Column(db.Integer, default=0, nullable=False)  # live ProductImages rows using this blob
+    uploaded_by = db.Column(db.Integer, db.ForeignKey('vendors.id'), nullable=True, index=True)
+    variant_status = db.Column(db.String(20), default="pending", nullable=False, index=True)  # 'pending', 'ready', 'failed'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    variants = db.relationship('ImageVariant', backref='blob', cascade="all, delete-orphan")
+
+    def variant_url(self, size, fmt=None):
+        for variant in self.variants:
+            if variant.size_name == size and (fmt is None or variant.format == fmt):
+                return variant.url
+        return None
+
+
+class ImageVariant(db.Model):
+    """A resized copy of an ImageBlob, generated in the background."""
+    __tablename__ = "image_variants"
+    id = db.Column(db.Integer, primary_key=True)
+    blob_hash = db.Column(db.String(64), db.ForeignKey('image_blobs.sha256'), nullable=False)
+    size_name = db.Column(db.String(20), nullable=False)  # 'thumb', 'small', 'medium'
+    format = db.Column(db.String(10), nullable=False)     # 'webp', 'jpeg'
+    width = db.Column(db.Integer, nullable=False)
+    height = db.Column(db.Integer, nullable=False)
+    filename = db.Column(db.String(200), nullable=False)
+    url = db.Column(db.String(500), nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('blob_hash', 'size_name', 'format', name='uq_image_variant'),
+    )
 
 
 class Storefront(db.Model):
@@ -1,10 +1,132 @@
-from core.imports import Blueprint, get_jwt_identity, jsonify, jwt_required, request, get_jwt
+import csv
+import io
+import json
+
+from flask import Response, stream_with_context
+from sqlalchemy import select, literal, null, or_
+from sqlalchemy.orm import joinedload
+from core.imports import Blueprint, get_jwt_identity, jsonify, jwt_required, request, get_jwt, datetime, timedelta, func
 from models.userModel import Buyers, Vendors, Admins
 from models.vendorModels import Products, Storefront
+from models.kycModels import KycSubmission
+from models.statsModels import AdminStatsSnapshot
+from models.jobModels import UserDeletionJob
 from core.extensions import db, bcrypt
+from core.scheduler import scheduler
+from core.admin_stats import current_admin_stats, apply_counter_deltas, product_moderation_deltas
+from core.user_deletion import user_deletion
+from core.replicas import read_only
 
 admin_bp = Blueprint('admin', __name__)
 
+USER_MODELS = {"buyer": Buyers, "vendor": Vendors}
+USER_EXPORT_FIELDS = ["account_type", "id", "name", "business_name", "email", "phone", "role",
+                      "kyc_status", "business_type", "state", "country", "referral_code", "referred_by"]
+EXPORT_BATCH_SIZE = 1000
+
+
+def _user_columns(account_type):
+    """The same labelled columns for both tables, so rows can be merged and exported alike."""
+    if account_type == "buyer":
+        return [
+            literal("buyer").label("account_type"), Buyers.id, Buyers.name,
+            null().label("business_name"), Buyers.email, Buyers.phone, Buyers.role,
+            null().label("kyc_status"), null().label("business_type"), Buyers.state, Buyers.country,
+            Buyers.referral_code, Buyers.referred_by,
+        ]
+    return [
+        literal("vendor").label("account_type"), Vendors.id,
+        # SQL concatenation is NULL if either part is; a missing half just drops out.
+        func.trim(func.coalesce(Vendors.firstname, "") + " " + func.coalesce(Vendors.lastname, "")).label("name"),
+        Vendors.business_name, Vendors.email, Vendors.phone, literal("vendor").label("role"),
+        Vendors.kyc_status, Vendors.business_type, Vendors.state, Vendors.country,
+        Vendors.referral_code, Vendors.referred_by,
+    ]
+
+
+def user_listing_queries(args):
+    """
+    Build one filtered select per account type requested in `args`.
+    Raises ValueError for an unknown role or an impossible filter combination.
+    """
+    role = args.get("role")
+    kyc_status = args.get("kyc_status")
+    country = args.get("country")
+    email_prefix = args.get("email_prefix")
+
+    if role and role not in USER_MODELS:
+        raise ValueError("role must be buyer or vendor")
+    if kyc_status and role == "buyer":
+        raise ValueError("kyc_status only applies to vendors")
+
+    account_types = [role] if role else ["vendor"] if kyc_status else ["buyer", "vendor"]
+    queries = []
+    for account_type in account_types:
+        model = USER_MODELS[account_type]
+        query = select(*_user_columns(account_type))
+        if kyc_status:
+            query = query.where(model.kyc_status == kyc_status)
+        if country:
+            query = query.where(model.country == country)
+        if email_prefix:
+            query = query.where(model.email.startswith(email_prefix.strip(), autoescape=True))
+        queries.append((account_type, query))
+    return queries
+
+
+def _parse_user_cursor(cursor):
+    """'vendor:120' -> (120, 'vendor'); None -> (None, None)."""
+    if not cursor:
+        return None, None
+    account_type, _, user_id = cursor.partition(":")
+    if account_type not in USER_MODELS or not user_id.isdigit():
+        raise ValueError("Invalid cursor")
+    return int(user_id), account_type
+
+
+MAX_BULK_PRODUCT_IDS = 10000
+
+
+def _parse_datetime(value, field):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be an ISO 8601 datetime")
+
+
+def _parse_id(value, field):
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).isdigit():
+        raise ValueError(f"{field} must be a positive integer")
+    return int(value)
+
+
+def _product_selection(data):
+    """WHERE clauses for a bulk moderation request: an id list or a filter, never neither."""
+    ids = data.get("ids")
+    if ids is not None:
+        if not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise ValueError("ids must be a non-empty list of integers")
+        if len(ids) > MAX_BULK_PRODUCT_IDS:
+            raise ValueError(f"At most {MAX_BULK_PRODUCT_IDS} ids per request")
+        return [Products.id.in_(set(ids))]
+
+    criteria = data.get("filter") or {}
+    if not isinstance(criteria, dict):
+        raise ValueError("filter must be an object")
+    clauses = []
+    if criteria.get("vendor_id") is not None:
+        clauses.append(Products.vendor_id == _parse_id(criteria["vendor_id"], "vendor_id"))
+    if criteria.get("category_id") is not None:
+        clauses.append(Products.category_id == _parse_id(criteria["category_id"], "category_id"))
+    if criteria.get("created_from"):
+        clauses.append(Products.created_at >= _parse_datetime(criteria["created_from"], "created_from"))
+    if criteria.get("created_to"):
+        clauses.append(Products.created_at < _parse_datetime(criteria["created_to"], "created_to"))
+    if not clauses:
+        raise ValueError("Provide ids or a filter with vendor_id, category_id, created_from or created_to")
+    return clauses
+
+
 def seed_admin_accounts():
     """
     Populate the Admins table with 2 default admin accounts.
@@ -50,7 +172,10 @@ def get_admin_stats():
     tags:
       - Admin
     summary: Get platform statistics (Admin only)
-    description: Returns counts of users, storefronts, and products.
+    description: |
+      Returns counts of users, storefronts, and products. Served from the
+      admin_stats counter row plus the delta rows every write appends, which a
+      periodic job folds in; another checks the row against the real tables.
     security:
       - Bearer: []
     parameters:
@@ -79,6 +204,8 @@ def get_admin_stats():
                 total: { type: integer, example: 500 }
                 active: { type: integer, example: 420 }
                 inactive_or_hidden: { type: integer, example: 80 }
+            updated_at: { type: string, example: "2025-01-01T12:00:00" }
+            reconciled_at: { type: string, example: "2025-01-01T11:00:00" }
       403:
         description: Forbidden (not admin)
         schema:
@@ -90,27 +217,103 @@ def get_admin_stats():
     if claims.get("role") != "admin":
         return jsonify({"error": "Forbidden"}), 403
 
-    total_buyers = Buyers.query.count()
-    total_vendors = Vendors.query.count()
-    total_storefronts = Storefront.query.count()
-    total_products = Products.query.count()
-    active_products = Products.query.filter_by(status="active", visibility=True).count()
-    inactive_products = Products.query.filter(
-        (Products.status != "active") | (Products.visibility == False)
-    ).count()
+    stats = current_admin_stats()
 
     return jsonify({
         "users": {
-            "buyers": total_buyers,
-            "vendors": total_vendors,
-            "total_accounts": total_buyers + total_vendors
+            "buyers": stats.buyers,
+            "vendors": stats.vendors,
+            "total_accounts": stats.buyers + stats.vendors
         },
-        "storefronts": total_storefronts,
+        "storefronts": stats.storefronts,
         "products": {
-            "total": total_products,
-            "active": active_products,
-            "inactive_or_hidden": inactive_products
-        }
+            "total": stats.products_total,
+            "active": stats.products_active,
+            "inactive_or_hidden": stats.products_total - stats.products_active
+        },
+        "updated_at": stats.updated_at.isoformat() if stats.updated_at else None,
+        "reconciled_at": stats.reconciled_at.isoformat() if stats.reconciled_at else None
+    }), 200
+
+
+# =========================
+# /api/admin/stats/history (GET)
+# =========================
+@admin_bp.route('/api/admin/stats/history', methods=['GET'])
+@jwt_required()
+@read_only
+def get_admin_stats_history():
+    """
+    Admin: Platform statistics over time
+    ---
+    tags:
+      - Admin
+    summary: Counter snapshots for trend charts (Admin only)
+    description: One snapshot is recorded each time the stats reconcile job runs.
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token in format: Bearer <your_token>'
+        required: true
+        type: string
+        default: "Bearer "
+      - name: days
+        in: query
+        type: integer
+        required: false
+        default: 30
+        description: How far back to go (max 365)
+    responses:
+      200:
+        description: Snapshots, oldest first
+        schema:
+          type: object
+          properties:
+            snapshots:
+              type: array
+              items:
+                type: object
+                properties:
+                  taken_at: { type: string, example: "2025-01-01T12:00:00" }
+                  buyers: { type: integer, example: 120 }
+                  vendors: { type: integer, example: 45 }
+                  storefronts: { type: integer, example: 30 }
+                  products_total: { type: integer, example: 500 }
+                  products_active: { type: integer, example: 420 }
+      403:
+        description: Forbidden (not admin)
+        schema:
+          type: object
+          properties:
+            error: { type: string, example: Forbidden }
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    days = min(max(request.args.get("days", 30, type=int), 1), 365)
+    since = datetime.utcnow() - timedelta(days=days)
+
+    snapshots = (AdminStatsSnapshot.query
+                 .filter(AdminStatsSnapshot.taken_at >= since)
+                 .order_by(AdminStatsSnapshot.taken_at)
+                 .all())
+
+    return jsonify({
+        "snapshots": [
+            {
+                "taken_at": snap.taken_at.isoformat(),
+                "buyers": snap.buyers,
+                "vendors": snap.vendors,
+                "storefronts": snap.storefronts,
+                "products_total": snap.products_total,
+                "products_active": snap.products_active,
+                "products_inactive": snap.products_inactive,
+                "products_hidden": snap.products_hidden
+            } for snap in snapshots
+        ]
     }), 200
 
 
@@ -119,13 +322,17 @@ def get_admin_stats():
 # =========================
 @admin_bp.route('/api/admin/users', methods=['GET'])
 @jwt_required()
+@read_only
 def get_users():
     """
-    Get all users (buyers and vendors).
+    Get users (buyers and vendors), one page at a time.
     ---
     tags:
       - Admin
-    summary: List all users (Admin only)
+    summary: List users with filters and keyset pagination (Admin only)
+    description: |
+      Users are ordered by id (buyers before vendors on a tie). Pass the
+      previous page's next_cursor to get the next page.
     security:
       - Bearer: []
     parameters:
@@ -135,9 +342,47 @@ def get_users():
         required: true
         type: string
         default: "Bearer "
+      - name: role
+        in: query
+        type: string
+        enum: [buyer, vendor]
+        required: false
+      - name: kyc_status
+        in: query
+        type: string
+        enum: [unverified, pending, verified, rejected]
+        required: false
+        description: Vendors only; implies role=vendor
+      - name: country
+        in: query
+        type: string
+        required: false
+      - name: email_prefix
+        in: query
+        type: string
+        required: false
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        example: "vendor:120"
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
     responses:
       200:
-        description: List of all users (buyers and vendors)
+        description: One page of users
+        schema:
+          type: object
+          properties:
+            count: { type: integer, example: 50 }
+            users: { type: array, items: { type: object } }
+            next_cursor: { type: string, example: "vendor:120" }
+      400:
+        description: Invalid filter or cursor
       403:
         description: Forbidden (not an admin)
         schema:
@@ -149,39 +394,133 @@ def get_users():
     if claims.get("role") != "admin":
         return jsonify({"error": "Forbidden"}), 403
 
-    buyers = Buyers.query.all()
-    buyers_list = [
-        {
-            "id": b.id,
-            "name": b.name,
-            "email": b.email,
-            "phone": b.phone,
-            "role": b.role,
-            "referral_code": b.referral_code,
-            "referred_by": b.referred_by,
-            "account_type": "buyer"
-        } for b in buyers
-    ]
+    try:
+        queries = user_listing_queries(request.args)
+        after_id, after_type = _parse_user_cursor(request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
 
-    vendors = Vendors.query.all()
-    vendors_list = [
-        {
-            "id": v.id,
-            "name": f"{v.firstname} {v.lastname}".strip(),
-            "business_name": v.business_name,
-            "kyc_status": v.kyc_status,
-            "business_type": v.business_type,
-            "email": v.email,
-            "phone": v.phone,
-            "role": "vendor",
-            "referral_code": v.referral_code,
-            "referred_by": v.referred_by,
-            "account_type": "vendor"
-        } for v in vendors
-    ]
+    # Each table is read by primary key from the cursor on, then the two
+    # short runs are merged; nothing beyond limit + 1 rows per table is loaded.
+    rows = []
+    for account_type, query in queries:
+        model = USER_MODELS[account_type]
+        if after_id is not None:
+            if after_type is not None and account_type > after_type:
+                query = query.where(model.id >= after_id)
+            else:
+                query = query.where(model.id > after_id)
+        rows.extend(dict(row._mapping) for row in
+                    db.session.execute(query.order_by(model.id).limit(limit + 1)))
+
+    rows.sort(key=lambda r: (r["id"], r["account_type"]))
+    page = rows[:limit]
+    next_cursor = f"{page[-1]['account_type']}:{page[-1]['id']}" if len(rows) > limit else None
 
-    all_users = sorted(buyers_list + vendors_list, key=lambda x: x["id"])
-    return jsonify({"count": len(all_users), "users": all_users}), 200
+    return jsonify({"count": len(page), "users": page, "next_cursor": next_cursor}), 200
+
+
+# =========================
+# /api/admin/users/export (GET)
+# =========================
+@admin_bp.route('/api/admin/users/export', methods=['GET'])
+@jwt_required()
+@read_only
+def export_users():
+    """
+    Admin: Export users as CSV or NDJSON
+    ---
+    tags:
+      - Admin
+    summary: Stream every matching user (Admin only)
+    description: |
+      Accepts the same filters as /api/admin/users. Rows are read from the
+      database in batches and written out as they arrive, so memory use does
+      not grow with the number of users.
+    produces:
+      - text/csv
+      - application/x-ndjson
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token in format: Bearer <your_token>'
+        required: true
+        type: string
+        default: "Bearer "
+      - name: format
+        in: query
+        type: string
+        enum: [csv, ndjson]
+        default: csv
+      - name: role
+        in: query
+        type: string
+        enum: [buyer, vendor]
+        required: false
+      - name: kyc_status
+        in: query
+        type: string
+        required: false
+      - name: country
+        in: query
+        type: string
+        required: false
+      - name: email_prefix
+        in: query
+        type: string
+        required: false
+    responses:
+      200:
+        description: The export file
+      400:
+        description: Invalid filter or format
+      403:
+        description: Forbidden (not an admin)
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    export_format = request.args.get("format", "csv")
+    if export_format not in ("csv", "ndjson"):
+        return jsonify({"error": "format must be csv or ndjson"}), 400
+    try:
+        queries = user_listing_queries(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=USER_EXPORT_FIELDS) if export_format == "csv" else None
+        if writer:
+            writer.writeheader()
+
+        for account_type, query in queries:
+            model = USER_MODELS[account_type]
+            result = db.session.execute(query.order_by(model.id).execution_options(yield_per=EXPORT_BATCH_SIZE))
+            for batch in result.partitions():
+                for row in batch:
+                    if writer:
+                        writer.writerow(row._mapping)
+                    else:
+                        buffer.write(json.dumps(dict(row._mapping), default=str))
+                        buffer.write("\n")
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    extension = "csv" if export_format == "csv" else "ndjson"
+    filename = f"users-{datetime.utcnow():%Y%m%d-%H%M%S}.{extension}"
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv" if export_format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 # =========================
@@ -195,6 +534,10 @@ def delete_user(account_type, user_id):
     ---
     tags:
       - Admin
+    description: |
+      Starts a background job that removes the user and everything that
+      depends on it in batches. Poll /api/admin/deletion-jobs/<job_id> for
+      progress. Repeating the request returns the job already in progress.
     security:
       - Bearer: []
     parameters:
@@ -216,12 +559,21 @@ def delete_user(account_type, user_id):
         required: true
         description: The ID of the user
     responses:
-      200:
-        description: User deleted
+      202:
+        description: Deletion started
         schema:
           type: object
           properties:
-            message: { type: string, example: Buyer 5 deleted successfully }
+            message: { type: string, example: Deletion of buyer 5 started }
+            job:
+              type: object
+              properties:
+                id: { type: integer, example: 12 }
+                status: { type: string, example: queued }
+                step: { type: string, example: cart_items }
+                steps_done: { type: integer, example: 0 }
+                steps_total: { type: integer, example: 7 }
+                rows_deleted: { type: object, example: {} }
       400:
         description: Invalid account type
         schema:
@@ -249,13 +601,69 @@ def delete_user(account_type, user_id):
     if not model:
         return jsonify({"error": "Invalid account type"}), 400
 
-    user = model.query.get(user_id)
-    if not user:
+    if not db.session.query(model.id).filter(model.id == user_id).first():
         return jsonify({"error": "User not found"}), 404
 
-    db.session.delete(user)
+    job = user_deletion.enqueue(account_type, user_id, requested_by=int(get_jwt_identity()))
     db.session.commit()
-    return jsonify({"message": f"{account_type.capitalize()} {user_id} deleted successfully"}), 200
+    user_deletion.start(job.id)
+
+    return jsonify({
+        "message": f"Deletion of {account_type} {user_id} started",
+        "job": user_deletion.describe(job)
+    }), 202
+
+
+# =========================
+# GET /api/admin/deletion-jobs/<job_id>
+# =========================
+@admin_bp.route('/api/admin/deletion-jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_deletion_job(job_id):
+    """
+    Admin: Progress of a user deletion
+    ---
+    tags:
+      - Admin
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token in format: Bearer <your_token>'
+        required: true
+        type: string
+        default: "Bearer "
+      - name: job_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Job status
+        schema:
+          type: object
+          properties:
+            id: { type: integer, example: 12 }
+            status: { type: string, example: running }
+            step: { type: string, example: products }
+            steps_done: { type: integer, example: 4 }
+            steps_total: { type: integer, example: 10 }
+            rows_deleted: { type: object, example: { cart_items: 310, favourites: 1200 } }
+      403:
+        description: Forbidden (not admin)
+      404:
+        description: Job not found
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    job = db.session.get(UserDeletionJob, job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify(user_deletion.describe(job)), 200
 
 
 # =========================
@@ -263,6 +671,7 @@ def delete_user(account_type, user_id):
 # =========================
 @admin_bp.route('/api/admin/users/<string:account_type>/<int:user_id>', methods=['GET'])
 @jwt_required()
+@read_only
 def get_user_details(account_type, user_id):
     """
     Admin: Get details of a single user (buyer/vendor).
@@ -321,7 +730,7 @@ def get_user_details(account_type, user_id):
                 "product_name": fav.product.product_name,
                 "product_price": fav.product.product_price,
                 "description": fav.product.description,
-                "images": fav.product.product_images,
+                "images": fav.product.image_urls(),
                 "category": fav.product.category.name if fav.product.category else None,
                 "vendor": {
                     "id": fav.product.vendor.id,
@@ -355,7 +764,7 @@ def get_user_details(account_type, user_id):
                 "product_name": p.product_name,
                 "product_price": p.product_price,
                 "description": p.description,
-                "images": p.product_images,
+                "images": p.image_urls(),
                 "category": p.category.name if p.category else None,
                 "status": p.status,
                 "visibility": p.visibility
@@ -534,11 +943,138 @@ def update_product_status(product_id):
     }), 200
 
 
+# =========================
+# PATCH /api/admin/products/bulk-status
+# =========================
+@admin_bp.route('/api/admin/products/bulk-status', methods=['PATCH'])
+@jwt_required()
+def bulk_update_product_status():
+    """
+    Admin: Set status/visibility on many products at once
+    ---
+    tags:
+      - Admin
+    description: |
+      Select products either by `ids` or by `filter` (at least one of
+      vendor_id, category_id, created_from, created_to) and apply the new
+      status and/or visibility in a single UPDATE. Products already in the
+      target state are left alone and not counted.
+    consumes:
+      - application/json
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token in format: Bearer <your_token>'
+        required: true
+        type: string
+        default: "Bearer "
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            ids:
+              type: array
+              items: { type: integer }
+              example: [12, 13, 14]
+            filter:
+              type: object
+              properties:
+                vendor_id: { type: integer, example: 7 }
+                category_id: { type: integer, example: 2 }
+                created_from: { type: string, example: "2025-01-01T00:00:00" }
+                created_to: { type: string, example: "2025-02-01T00:00:00" }
+            status:
+              type: string
+              enum: [active, inactive]
+              example: inactive
+            visibility:
+              type: boolean
+              example: false
+    responses:
+      200:
+        description: Products updated
+        schema:
+          type: object
+          properties:
+            matched: { type: integer, example: 1200 }
+            updated: { type: integer, example: 1185 }
+            status: { type: string, example: inactive }
+            visibility: { type: boolean, example: false }
+      400:
+        description: Missing or invalid selection, status or visibility
+      403:
+        description: Forbidden (not admin)
+        schema:
+          type: object
+          properties:
+            error: { type: string, example: Forbidden }
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+
+    status = data.get("status")
+    if status is not None and status not in ["active", "inactive"]:
+        return jsonify({"error": "Invalid status"}), 400
+    visibility = data.get("visibility")
+    if visibility is not None and not isinstance(visibility, bool):
+        return jsonify({"error": "visibility must be true or false"}), 400
+    if status is None and visibility is None:
+        return jsonify({"error": "Provide status and/or visibility"}), 400
+
+    try:
+        selection = _product_selection(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    matched = db.session.query(func.count(Products.id)).filter(*selection).scalar()
+
+    # Only touch rows whose state actually changes.
+    changes = []
+    if status is not None:
+        changes.append(or_(Products.status != status, Products.status.is_(None)))
+    if visibility is not None:
+        changes.append(or_(Products.visibility != visibility, Products.visibility.is_(None)))
+    to_change = (*selection, or_(*changes))
+
+    # One GROUP BY gives the counter adjustment for the whole batch.
+    groups = (db.session.query(Products.status, Products.visibility, func.count(Products.id))
+              .filter(*to_change)
+              .group_by(Products.status, Products.visibility)
+              .all())
+
+    values = {}
+    if status is not None:
+        values["status"] = status
+    if visibility is not None:
+        values["visibility"] = visibility
+    updated = Products.query.filter(*to_change).update(values, synchronize_session=False)
+
+    apply_counter_deltas(product_moderation_deltas(groups, status, visibility))
+    db.session.commit()
+
+    return jsonify({
+        "matched": matched,
+        "updated": updated,
+        "status": status,
+        "visibility": visibility
+    }), 200
+
+
 # =========================
 # GET /api/admin/storefronts/<storefront_id>
 # =========================
 @admin_bp.route('/api/admin/storefronts/<int:storefront_id>', methods=['GET'])
 @jwt_required()
+@read_only
 def get_storefront_details(storefront_id):
     """
     Admin: Get details of a single storefront (vendor info + products)
@@ -589,7 +1125,7 @@ def get_storefront_details(storefront_id):
             "product_name": p.product_name,
             "product_price": p.product_price,
             "description": p.description,
-            "images": p.product_images,
+            "images": p.image_urls(),
             "status": p.status,
             "visibility": p.visibility,
             "category": p.category.name if p.category else None
@@ -614,3 +1150,244 @@ def get_storefront_details(storefront_id):
         "products": products,
         "products_count": len(products)
     }), 200
+
+
+# =========================
+# GET /api/admin/jobs
+# =========================
+@admin_bp.route('/api/admin/jobs', methods=['GET'])
+@jwt_required()
+def get_scheduled_jobs():
+    """
+    Admin: Get scheduled job status
+    ---
+    tags:
+      - Admin
+    summary: Last run, duration and result counts of each periodic job (Admin only)
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token in format: Bearer <your_token>'
+        required: true
+        type: string
+        default: "Bearer "
+    responses:
+      200:
+        description: Scheduled jobs
+        schema:
+          type: object
+          properties:
+            jobs:
+              type: array
+              items:
+                type: object
+                properties:
+                  name: { type: string, example: purge_expired_pending }
+                  interval_seconds: { type: integer, example: 900 }
+                  leader: { type: string, example: "web-1-4211-a1b2c3" }
+                  last_duration_ms: { type: integer, example: 42 }
+                  last_result:
+                    type: object
+                    example: { pending_buyers: 12, pending_vendors: 3, password_reset_tokens: 40 }
+                  run_count: { type: integer, example: 96 }
+      403:
+        description: Forbidden (not admin)
+        schema:
+          type: object
+          properties:
+            error: { type: string, example: Forbidden }
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    return jsonify({"jobs": scheduler.status()}), 200
+
+
+# =========================
+# GET /api/admin/kyc/queue
+# =========================
+@admin_bp.route('/api/admin/kyc/queue', methods=['GET'])
+@jwt_required()
+@read_only
+def get_kyc_queue():
+    """
+    Admin: Page through KYC submissions awaiting review
+    ---
+    tags:
+      - Admin
+    summary: Pending KYC submissions, oldest first, keyset-paginated (Admin only)
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token in format: Bearer <your_token>'
+        required: true
+        type: string
+        default: "Bearer "
+      - name: after_id
+        in: query
+        type: integer
+        required: false
+        description: Cursor from the previous page's next_cursor
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+        description: Page size (max 200)
+      - name: upload_status
+        in: query
+        type: string
+        enum: [staged, uploaded, failed]
+        required: false
+        description: Only return submissions in this upload state
+    responses:
+      200:
+        description: One page of the review queue
+        schema:
+          type: object
+          properties:
+            submissions:
+              type: array
+              items:
+                type: object
+                properties:
+                  id: { type: integer, example: 42 }
+                  vendor_id: { type: integer, example: 7 }
+                  business_name: { type: string, example: Ade Stores }
+                  upload_status: { type: string, example: uploaded }
+                  id_document_url: { type: string }
+                  proof_of_address_url: { type: string }
+                  submitted_at: { type: string, example: "2025-01-01T12:00:00" }
+            next_cursor: { type: integer, example: 91 }
+      403:
+        description: Forbidden (not admin)
+        schema:
+          type: object
+          properties:
+            error: { type: string, example: Forbidden }
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    after_id = request.args.get("after_id", 0, type=int)
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+    upload_status = request.args.get("upload_status")
+
+    # Seeks on (review_status, id) instead of OFFSET, so deep pages cost the same as the first.
+    query = (KycSubmission.query
+             .options(joinedload(KycSubmission.vendor))
+             .filter(KycSubmission.review_status == "pending", KycSubmission.id > after_id))
+    if upload_status:
+        query = query.filter(KycSubmission.upload_status == upload_status)
+    rows = query.order_by(KycSubmission.id).limit(limit + 1).all()
+
+    page = rows[:limit]
+    return jsonify({
+        "submissions": [
+            {
+                "id": s.id,
+                "vendor_id": s.vendor_id,
+                "business_name": s.vendor.business_name if s.vendor else None,
+                "email": s.vendor.email if s.vendor else None,
+                "upload_status": s.upload_status,
+                "upload_error": s.last_error,
+                "id_document_url": s.id_document_url,
+                "proof_of_address_url": s.proof_of_address_url,
+                "submitted_at": s.created_at.isoformat() if s.created_at else None
+            } for s in page
+        ],
+        "next_cursor": page[-1].id if len(rows) > limit else None
+    }), 200
+
+
+# =========================
+# POST /api/admin/kyc/<submission_id>/review
+# =========================
+@admin_bp.route('/api/admin/kyc/<int:submission_id>/review', methods=['POST'])
+@jwt_required()
+def review_kyc_submission(submission_id):
+    """
+    Admin: Approve or reject a KYC submission
+    ---
+    tags:
+      - Admin
+    consumes:
+      - application/json
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token in format: Bearer <your_token>'
+        required: true
+        type: string
+        default: "Bearer "
+      - name: submission_id
+        in: path
+        type: integer
+        required: true
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            decision:
+              type: string
+              enum: [verified, rejected]
+              example: verified
+            note:
+              type: string
+              example: Name on ID does not match account
+    responses:
+      200:
+        description: Submission reviewed; the vendor's kyc_status is updated
+        schema:
+          type: object
+          properties:
+            message: { type: string, example: KYC submission 42 verified }
+            kyc_status: { type: string, example: verified }
+      400:
+        description: Invalid decision
+      403:
+        description: Forbidden (not admin)
+      404:
+        description: Submission not found
+      409:
+        description: Already reviewed, or documents still uploading
+    """
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    data = request.get_json() or {}
+    decision = data.get("decision")
+    if decision not in ("verified", "rejected"):
+        return jsonify({"error": "decision must be 'verified' or 'rejected'"}), 400
+
+    submission = KycSubmission.query.get(submission_id)
+    if not submission:
+        return jsonify({"error": "Submission not found"}), 404
+    if submission.review_status != "pending":
+        return jsonify({"error": f"Submission already {submission.review_status}"}), 409
+    if decision == "verified" and submission.upload_status != "uploaded":
+        return jsonify({"error": "Documents are still being uploaded"}), 409
+
+    submission.review_status = decision
+    submission.review_note = data.get("note")
+    submission.reviewed_by = int(get_jwt_identity())
+    submission.reviewed_at = datetime.utcnow()
+    if submission.vendor:
+        submission.vendor.kyc_status = decision
+    db.session.commit()
+
+    return jsonify({
+        "message": f"KYC submission {submission_id} {decision}",
+        "kyc_status": decision
+    }), 200
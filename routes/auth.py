@@ -1,11 +1,18 @@
 #text/x-generic auth.py ( Python script, UTF-8 Unicode text executable, with CRLF line terminators )
 #text/x-generic auth.py ( Python script, UTF-8 Unicode text executable, with CRLF line terminators )
-from core.imports import Blueprint, jsonify, request, render_template, create_access_token, jwt_required, secrets, uuid, get_jwt_identity, get_jwt, requests, random, string, cloudinary, os, load_dotenv, datetime, Message, timedelta, IntegrityError
+from core.imports import Blueprint, jsonify, request, render_template, current_app, create_access_token, jwt_required, secrets, uuid, get_jwt_identity, get_jwt, random, string, os, load_dotenv, datetime, timedelta, IntegrityError
 from core.config import Config
 from core.extensions import db, bcrypt, mail
+from core.email_queue import email_queue
+from core.geolocation import geolocator
+from core.image_store import ImageStore, UploadTooLarge
+from core.identity import current_identity, current_user_row, invalidate_user
+from core.kyc_ingest import kyc_ingestor
+from routes.referrals import record_referral
 import traceback
 from models.userModel import Buyers, Vendors, PendingBuyer, PendingVendor, Admins, PasswordResetToken
 from models.vendorModels import Storefront
+from models.kycModels import KycSubmission
 from werkzeug.utils import secure_filename
 from sqlalchemy import func
 load_dotenv() 
@@ -16,17 +23,36 @@ auth_bp = Blueprint('auth', __name__)
 UPLOAD_FOLDER = '/home/realvlcj/api.bizengo.com/images'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
+profile_store = ImageStore(UPLOAD_FOLDER, "https://api.bizengo.com/images")
+
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def cleanup_expired_pending():
+def _purge_in_batches(model, expiry_column, cutoff, batch_size):
+    """Delete rows whose expiry is before `cutoff`, one bounded batch per transaction."""
+    deleted = 0
+    while True:
+        ids = [row.id for row in db.session.query(model.id)
+               .filter(expiry_column < cutoff)
+               .limit(batch_size)]
+        if not ids:
+            break
+        model.query.filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+    return deleted
+
+def cleanup_expired_pending(batch_size=1000):
+    """Purge expired pending signups and password reset tokens. Returns deleted counts."""
     now = datetime.utcnow()
-    expired_buyers = PendingBuyer.query.filter(PendingBuyer.otp_expires_at < now).all()
-    expired_vendors = PendingVendor.query.filter(PendingVendor.otp_expires_at < now).all()
-    
-    for record in expired_buyers + expired_vendors:
-        db.session.delete(record)
-    db.session.commit()
+    return {
+        "pending_buyers": _purge_in_batches(PendingBuyer, PendingBuyer.otp_expires_at, now, batch_size),
+        "pending_vendors": _purge_in_batches(PendingVendor, PendingVendor.otp_expires_at, now, batch_size),
+        "password_reset_tokens": _purge_in_batches(
+            PasswordResetToken, PasswordResetToken.expires_at, now, batch_size),
+    }
 
 def generate_referral_code(length=8, prefix=""):
     """Generate a secure random alphanumeric referral code with optional prefix."""
@@ -36,12 +62,11 @@ def generate_referral_code(length=8, prefix=""):
     return f"{prefix}{code}{unique_suffix}"
 
 def send_email(to, subject, body):
-    msg = Message(subject=subject, recipients=[to])
-    msg.html = body
-    try:
-        mail.send(msg)
-    except Exception as e:
-        print(f"Error sending email: {e}")
+    """
+    Queue an email for background delivery. The job is added to the current
+    session, so it is only sent once the caller commits.
+    """
+    email_queue.enqueue(to, subject, body)
 
 def send_otp_email(email, otp, purpose="verification"):
     # Customize content based on purpose
@@ -68,66 +93,31 @@ def send_otp_email(email, otp, purpose="verification"):
 
 def get_location_from_ip(ip_address):
     """
-    Get state and country from IP address using ipinfo.io (or any GeoIP service).
+    Get state and country from IP address using the local GeoIP database or
+    the lookup cache. Never waits on a remote service.
     """
-    try:
-        response = requests.get(f"https://ipinfo.io/{ip_address}/json")
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("region"), data.get("country")  # state, country
-    except Exception:
-        pass
-    return None, None
-
-def seed_demo_vendor():
-    vendor = Vendors.query.filter_by(email="demo@vendor.com").first()
-    if not vendor:
-        raw_password = "password123"  # demo login password
-        hashed_password = bcrypt.generate_password_hash(raw_password).decode('utf-8')
-
-        vendor = Vendors(
-            firstname="John",
-            lastname="Doe",
-            business_name="Demo Store",
-            business_type="Retail",
-            email="demo@vendor.com",
-            phone="08012345678",
-            password=hashed_password,
-            state="Lagos",
-            country="Nigeria",
-            referral_code="DEMO123"
-        )
-        db.session.add(vendor)
-        db.session.commit()
+    return geolocator.locate(ip_address)
 
-        print(f"✅ Demo vendor created (email=demo@vendor.com, password={raw_password})")
-    else:
-        print("ℹ️ Demo vendor already exists.")
-    return vendor
-
-def seed_demo_buyer():
-    buyer = Buyers.query.filter_by(email="demo@buyer.com").first()
-    if not buyer:
-        raw_password = "password123"
-        hashed_password = bcrypt.generate_password_hash(raw_password).decode('utf-8')
-
-        buyer = Buyers(
-            name="Jane Doe",
-            email="demo@buyer.com",
-            phone="08087654321",
-            password=hashed_password,
-            state="Lagos",
-            country="Nigeria",
-            role="buyer",
-            referral_code="BUYER123"
-        )
-        db.session.add(buyer)
-        db.session.commit()
+def fill_location_later(ip_address, email, role):
+    """
+    Resolve the IP remotely in the background and fill in whichever of
+    state/country is still empty on the pending (or already verified) account.
+    """
+    app = current_app._get_current_object()
+    models = (PendingBuyer, Buyers) if role == "buyer" else (PendingVendor, Vendors)
+
+    def apply(state, country):
+        with app.app_context():
+            for model in models:
+                if state:
+                    model.query.filter(model.email == email, model.state.is_(None)).update(
+                        {"state": state}, synchronize_session=False)
+                if country:
+                    model.query.filter(model.email == email, model.country.is_(None)).update(
+                        {"country": country}, synchronize_session=False)
+            db.session.commit()
 
-        print(f"✅ Demo buyer created (email=demo@buyer.com, password={raw_password})")
-    else:
-        print("ℹ️ Demo buyer already exists.")
-    return buyer
+    geolocator.locate_later(ip_address, apply)
 
 @auth_bp.route('/api/auth/signup/buyer', methods=['POST'])
 def signup_buyer():
@@ -151,8 +141,9 @@ def signup_buyer():
          return jsonify({"message": "Account is pending verification"}), 409
 
     # IP-based location if missing
+    ip_address = None
     if not state or not country:
-        ip_address = request.headers.get("X-Forwarded-For", request.remote_addr)
+        ip_address = geolocator.client_ip(request.headers.get("X-Forwarded-For"), request.remote_addr)
         ip_state, ip_country = get_location_from_ip(ip_address)
         state = state or ip_state
         country = country or ip_country
@@ -178,6 +169,9 @@ def signup_buyer():
     db.session.add(pending)
     db.session.commit()
 
+    if ip_address and (not state or not country):
+        fill_location_later(ip_address, email, "buyer")
+
     return jsonify({"message": "Verification code sent to email"}), 201
 
 
@@ -204,8 +198,9 @@ def signup_vendor():
     elif PendingVendor.query.filter_by(email=email).first():
          return jsonify({"message": "Pending verification for this email exists"}), 409
 
+    ip_address = None
     if not state or not country:
-        ip_address = request.headers.get("X-Forwarded-For", request.remote_addr)
+        ip_address = geolocator.client_ip(request.headers.get("X-Forwarded-For"), request.remote_addr)
         ip_state, ip_country = get_location_from_ip(ip_address)
         state = state or ip_state
         country = country or ip_country
@@ -234,6 +229,9 @@ def signup_vendor():
     db.session.add(pending)
     db.session.commit()
 
+    if ip_address and (not state or not country):
+        fill_location_later(ip_address, email, "vendor")
+
     # TODO: send email with otp_code
     print(f"Sending OTP {otp_code} to {email}")
 
@@ -309,6 +307,8 @@ def verify_email():
     db.session.delete(pending)
 
     try:
+        db.session.flush()
+        record_referral(new_user, role)
         db.session.commit()
     except IntegrityError:
         db.session.rollback()
@@ -396,14 +396,14 @@ def resend_verification():
     if pending_buyer:
         pending_buyer.otp_code = otp_code
         pending_buyer.otp_expires_at = otp_expiry
-        db.session.commit()
         send_otp_email(email, otp_code)
+        db.session.commit()
 
     elif pending_vendor:
         pending_vendor.otp_code = otp_code
         pending_vendor.otp_expires_at = otp_expiry
-        db.session.commit()
         send_otp_email(email, otp_code)
+        db.session.commit()
 
     return jsonify({"message": "A new verification code has been sent to your email"}), 200
 
@@ -435,9 +435,9 @@ def request_password_reset():
     reset_token.expires_at = otp_expiry
     
     db.session.add(reset_token)
+    send_otp_email(email, otp_code, purpose="password_reset")
     db.session.commit()
 
-    send_otp_email(email, otp_code, purpose="password_reset")
     return jsonify({"message": "If an account with this email exists, a reset OTP has been sent."}), 200
 
 
@@ -487,15 +487,12 @@ def reset_password():
 @auth_bp.route('/api/user/profile', methods=['GET'])
 @jwt_required()
 def profile():
-    user_id = get_jwt_identity()
-
-    claims = get_jwt()
-    user_type = claims.get("role")
+    user_type = current_identity().role
 
     user_data = {}
 
     if user_type == "buyer":
-        user = Buyers.query.get(user_id)
+        user = current_user_row()
         if not user:
             return jsonify({"error": "User not found"}), 404
 
@@ -513,7 +510,7 @@ def profile():
         }
 
     elif user_type == "vendor":
-        user = Vendors.query.get(user_id)
+        user = current_user_row()
         if not user:
             return jsonify({"error": "User not found"}), 404
 
@@ -588,9 +585,7 @@ def update_profile_details():
       409:
         description: Email already in use
     """
-    user_id = get_jwt_identity()
-    claims = get_jwt()
-    user_type = claims.get("role")
+    user_type = current_identity().role
 
     data = request.get_json()
     if not data:
@@ -599,7 +594,7 @@ def update_profile_details():
     updated = False
 
     if user_type == "buyer":
-        user = Buyers.query.get(user_id)
+        user = current_user_row()
         if not user:
             return jsonify({"message": "User not found"}), 404
 
@@ -620,7 +615,7 @@ def update_profile_details():
             updated = True
 
     elif user_type == "vendor":
-        user = Vendors.query.get(user_id)
+        user = current_user_row()
         if not user:
             return jsonify({"message": "User not found"}), 404
 
@@ -660,6 +655,7 @@ def update_profile_details():
         return jsonify({"message": "No fields were updated"}), 200 
 
     db.session.commit()
+    invalidate_user(user_type, user.id)
 
     return jsonify({"message": "User details updated successfully"}), 200
 
@@ -667,15 +663,11 @@ def update_profile_details():
 @auth_bp.route("/api/upload-profile-pic", methods=["POST"])
 @jwt_required()
 def upload_profile_pic():
-    user_id = get_jwt_identity()
-    claims = get_jwt()
-    role = claims.get("role")
+    role = current_identity().role
 
     user = None
-    if role == "buyer":
-        user = Buyers.query.get(user_id)
-    elif role == "vendor":
-        user = Vendors.query.get(user_id)
+    if role in ("buyer", "vendor"):
+        user = current_user_row()
     
     if not user:
         return jsonify({"message": "User not found"}), 404
@@ -690,21 +682,19 @@ def upload_profile_pic():
         
     if file and allowed_file(file.filename):
         original_ext = file.filename.rsplit('.', 1)[1].lower()
-        filename = secure_filename(f"{role}_{user.id}_profile.{original_ext}")
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
 
         try:
-            os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-            
-            file.save(file_path)
-
-            profile_pic_url = f"https://api.bizengo.com/images/{filename}"
+            _, filename, _, _ = profile_store.save_stream(file.stream, original_ext)
+            profile_pic_url = profile_store.url_for(filename)
 
             user.profile_pic = profile_pic_url
             db.session.commit()
+            invalidate_user(role, user.id)
 
             return jsonify({"profile_pic_url": profile_pic_url}), 200
 
+        except UploadTooLarge as e:
+            return jsonify({"message": str(e)}), 413
         except Exception as e:
             print("File upload error:", e)
             traceback.print_exc()
@@ -745,6 +735,14 @@ def get_kyc_status():
             kyc_status:
               type: string
               example: "verified"
+            submission:
+              type: object
+              description: Latest KYC submission, or null if none was made
+              properties:
+                id: { type: integer, example: 42 }
+                upload_status: { type: string, example: uploaded }
+                review_status: { type: string, example: pending }
+                review_note: { type: string, example: null }
       401:
         description: Unauthorized — missing or invalid JWT token
       403:
@@ -752,16 +750,28 @@ def get_kyc_status():
       404:
         description: Vendor not found
     """
-    identity = get_jwt_identity()   # {"id": ..., "type": ...}
-    user_id = identity.get("id")
+    identity = current_identity()
+    if identity.role != "vendor":
+        return jsonify({"error": "Only vendors have a KYC status"}), 403
 
-    vendor = Vendors.query.get(user_id)
+    vendor = identity.row
     if not vendor:
         return jsonify({"error": "Vendor not found"}), 404
 
+    latest = (KycSubmission.query
+              .filter_by(vendor_id=vendor.id)
+              .order_by(KycSubmission.id.desc())
+              .first())
+
     return jsonify({
         "id": vendor.id,
         "kyc_status": vendor.kyc_status,
+        "submission": {
+            "id": latest.id,
+            "upload_status": latest.upload_status,
+            "review_status": latest.review_status,
+            "review_note": latest.review_note,
+        } if latest else None
     }), 200
 
 
@@ -776,7 +786,8 @@ tags:
 summary: Upload and submit KYC documents for verification
 description: |
   Allows the authenticated user to upload KYC documents such as ID card, passport, or proof of address.
-  Files are uploaded to Cloudinary, and the returned URLs are stored with the user's KYC status.
+  Files are staged on the server and returned immediately; uploads to the document store happen
+  in the background. Poll /api/user/kyc-status to follow the submission.
 consumes:
   - multipart/form-data
 security:
@@ -800,8 +811,8 @@ parameters:
     required: false
     description: Document proving address (utility bill, bank statement)
 responses:
-  200:
-    description: KYC documents uploaded successfully
+  202:
+    description: KYC documents accepted for processing
     schema:
       type: object
       properties:
@@ -811,22 +822,19 @@ responses:
         kyc_status:
           type: string
           example: pending
-        uploaded_files:
-          type: object
-          properties:
-            id_document_url:
-              type: string
-              example: "https://res.cloudinary.com/demo/image/upload/v1690000000/id_card.jpg"
-            proof_of_address_url:
-              type: string
-              example: "https://res.cloudinary.com/demo/image/upload/v1690000000/proof_address.jpg"
+        submission_id:
+          type: integer
+          example: 42
+        upload_status:
+          type: string
+          example: staged
   400:
     description: Missing required file
   404:
     description: User not found
     """
-    current_user_id = get_jwt_identity()
-    user = Vendors.query.get(current_user_id)
+    identity = current_identity()
+    user = identity.row if identity.role == "vendor" else None
 
     if not user:
         return jsonify({"error": "User not found"}), 404
@@ -840,77 +848,22 @@ responses:
     if not proof_of_address:
       return jsonify({"error": "Proof of address is needed"}), 400
 
-    uploaded_files = {}
-
     try:
-        id_upload = cloudinary.uploader.upload(id_document, folder="kyc_documents")
-        uploaded_files["id_document_url"] = id_upload.get("secure_url")
-
-        proof_upload = cloudinary.uploader.upload(proof_of_address, folder="kyc_documents")
-        uploaded_files["proof_of_address_url"] = proof_upload.get("secure_url")
-
+        submission = kyc_ingestor.stage(user.id, {
+            "id_document": id_document,
+            "proof_of_address": proof_of_address,
+        })
         user.kyc_status = "pending"
-        user.id_document_url = uploaded_files.get("id_document_url")
-        user.proof_of_address_url = uploaded_files.get("proof_of_address_url")
-
         db.session.commit()
-
-        return jsonify({
-            "message": "KYC documents submitted successfully",
-            "kyc_status": user.kyc_status,
-            "uploaded_files": uploaded_files
-        }), 200
-
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": f"Upload failed: {str(e)}"}), 500
 
-
-"""
-@auth_bp.route('/api/referrals', methods=['GET'])
-@jwt_required()
-def referral_stat():
-    ""
-    Get Referral Statistics
-    ---
-    tags:
-      - User
-    security:
-      - Bearer: []
-    parameters:
-      - name: Authorization
-        in: header
-        description: 'JWT token as: Bearer <your_token>'
-        required: true
-        schema:
-          type: string
-          example: "Bearer eyJhbGciOiJIUzI1NiIsInR5cCI6..."
-    responses:
-      200:
-        description: Referral statistics retrieved successfully
-        schema:
-          type: object
-          properties:
-            referral_code:
-              type: string
-              example: ABCD1234
-            referral_count:
-              type: integer
-              example: 5
-      401:
-        description: Unauthorized — missing or invalid JWT token
-      404:
-        description: User not found
-    "
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user:
-        return jsonify({"message": "User not found"}), 404
-
-    referral_count = User.query.filter_by(referred_by=user.referral_code).count()
+    kyc_ingestor.submit(submission.id)
 
     return jsonify({
-        "referral_code": user.referral_code,
-        "referral_count": referral_count
-    }), 200
-"""
+        "message": "KYC documents submitted successfully",
+        "kyc_status": user.kyc_status,
+        "submission_id": submission.id,
+        "upload_status": submission.upload_status
+    }), 202
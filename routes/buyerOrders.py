@@ -1,6 +1,6 @@
 from core.imports import Blueprint, jwt_required, get_jwt_identity, jsonify, request, SQLAlchemyError
 from core.extensions import db
-from models.userModel import Buyers
+from core.identity import current_identity
 from models.cartModels import Cart, CartItem
 from models.vendorModels import Products
 from models.orderModels import Order, OrderItem
@@ -102,15 +102,15 @@ def create_order():
     """
     user_id = get_jwt_identity()
   
-    user = Buyers.query.get(user_id)
-    if not user:
+    identity = current_identity()
+    if identity.role != "buyer" or not identity.exists():
         return jsonify({"message": "User not found"}), 404
 
     data = request.get_json()
     order_reference = data.get("reference")
     items = data.get("items", [])
 
-    cart = Cart.query.filter_by(user_id=user_id).first()
+    cart = Cart.query.filter_by(buyer_id=user_id).first()
     if not items and cart:
         items = [{'product_id': ci.product_id, 'quantity': ci.quantity} for ci in cart.cart_items]
 
@@ -121,7 +121,7 @@ def create_order():
     order_items = []
 
     try:
-        new_order = Order(user_id=user_id, total_amount=0, status="pending", reference=order_reference)
+        new_order = Order(buyer_id=user_id, total_amount=0, status="pending", reference=order_reference)
         db.session.add(new_order)
         db.session.flush()
 
@@ -246,12 +246,12 @@ def get_user_orders():
               example: "User not found"
     """
     user_id = get_jwt_identity()
-    user = Buyers.query.get(user_id)
+    identity = current_identity()
     
-    if not user:
+    if identity.role != "buyer" or not identity.exists():
         return jsonify({"message": "User not found"}), 404
 
-    orders = Order.query.filter_by(user_id=user_id).order_by(Order.created_at.desc()).all()
+    orders = Order.query.filter_by(buyer_id=user_id).order_by(Order.created_at.desc()).all()
     orders_data = []
 
     for order in orders:
@@ -2,6 +2,9 @@ from core.imports import Blueprint, jsonify, get_jwt_identity, jwt_required, req
 from core.extensions import db
 from models.vendorModels import Products, Storefront
 from models.favouriteModels import Favourites
+from core.image_variants import requested_image_variant, product_image_options
+from sqlalchemy.orm import joinedload
+from core.replicas import read_only
 
 
 buyers_bp = Blueprint("buyers", __name__)
@@ -69,6 +72,18 @@ def get_favourites():
     ---
     tags:
       - Marketplace
+    parameters:
+      - name: size
+        in: query
+        type: string
+        enum: [thumb, small, medium]
+        required: false
+        description: Return resized image variants instead of the originals
+      - name: format
+        in: query
+        type: string
+        enum: [webp, jpeg]
+        required: false
     responses:
       200:
         description: List of favourite products
@@ -80,7 +95,18 @@ def get_favourites():
     if user_type != "buyer":
         return jsonify({"error": "Only buyers can view favourites"}), 403
 
-    favourites = Favourites.query.filter_by(buyer_id=user_id).all()
+    size, fmt = requested_image_variant()
+
+    favourites = (
+        Favourites.query
+        .options(
+            joinedload(Favourites.product).joinedload(Products.category),
+            joinedload(Favourites.product).joinedload(Products.vendor),
+            joinedload(Favourites.product).options(product_image_options())
+        )
+        .filter_by(buyer_id=user_id)
+        .all()
+    )
 
     product_list = []
     for fav in favourites:
@@ -90,7 +116,7 @@ def get_favourites():
             "product_name": product.product_name,
             "product_price": product.product_price,
             "description": product.description,
-            "images": product.product_images,
+            "images": product.image_urls(size, fmt),
             "category": product.category.name if product.category else None,
             "vendor": {
                 "id": product.vendor.id,
@@ -107,6 +133,7 @@ def get_favourites():
 
 @buyers_bp.route('/api/admin/storefronts', methods=['GET'])
 @jwt_required()
+@read_only
 def get_storefronts():
     """
     Get all storefronts
@@ -1,6 +1,6 @@
 from core.imports import Blueprint, jsonify, get_jwt_identity, jwt_required, request, get_jwt
 from core.extensions import db
-from models.userModel import Buyers
+from core.identity import current_identity
 from flask import current_app
 from models.vendorModels import Products
 from models.orderModels import Order, OrderItem
@@ -90,8 +90,7 @@ def get_cart():
     if role != "buyer":
         return jsonify({"message": "Unauthorized"}), 403
 
-    buyer = Buyers.query.get(buyer_id)
-    if not buyer:
+    if not current_identity().exists():
         return jsonify({"message": "Buyer not found"}), 404
 
     # Get or create cart for buyer
@@ -110,7 +109,7 @@ def get_cart():
                 "quantity": item.quantity,
                 "available_stock": getattr(product, "quantity_in_stock", None),  
                 "category": product.category.name if product.category else None,
-                "product_images": product.product_images,
+                "product_images": product.image_urls(),
                 "status": product.status,
                 "visibility": product.visibility
             })
@@ -179,8 +178,8 @@ def add_to_cart():
     """
     buyer_id = get_jwt_identity()
 
-    buyer = Buyers.query.get(buyer_id)
-    if not buyer:
+    identity = current_identity()
+    if identity.role != "buyer" or not identity.exists():
         return jsonify({"message": "Buyer not found"}), 404
     
     data = request.get_json()
@@ -0,0 +1,269 @@
+import json
+import threading
+
+from flask import Response, stream_with_context
+from sqlalchemy import MetaData, Table, select, func
+from core.imports import Blueprint, jsonify, jwt_required, request, get_jwt, text, inspect
+from core.extensions import db
+from core.replicas import read_only
+
+db_browser_bp = Blueprint('db_browser', __name__)
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+DUMP_BATCH_SIZE = 1000
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def _table(name):
+    """Reflected Table for `name`, or None if no such table. Reflection is cached per process."""
+    table = _tables.get(name)
+    if table is not None:
+        return table
+    if name not in inspect(db.engine).get_table_names():
+        return None
+    with _tables_lock:
+        if name not in _tables:
+            _tables[name] = Table(name, MetaData(), autoload_with=db.engine)
+    return _tables[name]
+
+
+def _row_estimates(table_names):
+    """
+    Approximate row counts from the database's own statistics, so listing
+    tables never scans them. SQLite keeps no such statistics; there an exact
+    count is used, which is fine for the small databases it serves.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        rows = db.session.execute(text(
+            "SELECT c.relname, c.reltuples::bigint FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relkind = 'r' AND n.nspname = current_schema()"
+        ))
+        return {name: max(int(count), 0) for name, count in rows}
+    if dialect in ("mysql", "mariadb"):
+        rows = db.session.execute(text(
+            "SELECT table_name, table_rows FROM information_schema.tables WHERE table_schema = DATABASE()"
+        ))
+        return {name: int(count or 0) for name, count in rows}
+    return {
+        name: db.session.execute(select(func.count()).select_from(_table(name))).scalar()
+        for name in table_names
+    }
+
+
+def _primary_key(table):
+    columns = list(table.primary_key.columns)
+    return columns[0] if len(columns) == 1 else None
+
+
+def _cursor_value(column, raw):
+    """`raw` converted to the key column's Python type; ValueError if it doesn't parse."""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return raw
+    try:
+        return python_type(raw)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid cursor for {column.name}: {raw!r}")
+
+
+def _admin_only():
+    claims = get_jwt()
+    if claims.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+    return None
+
+
+@db_browser_bp.route("/view_db", methods=['GET'])
+@jwt_required()
+def list_tables():
+    """
+    Admin: List database tables
+    ---
+    tags:
+      - Admin
+    summary: Tables with estimated row counts (Admin only)
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token in format: Bearer <your_token>'
+        required: true
+        type: string
+        default: "Bearer "
+    responses:
+      200:
+        description: Tables
+        schema:
+          type: object
+          properties:
+            tables:
+              type: array
+              items:
+                type: object
+                properties:
+                  name: { type: string, example: products }
+                  estimated_rows: { type: integer, example: 52000 }
+                  primary_key: { type: string, example: id }
+      403:
+        description: Forbidden (not admin)
+    """
+    forbidden = _admin_only()
+    if forbidden:
+        return forbidden
+
+    try:
+        names = sorted(inspect(db.engine).get_table_names())
+        estimates = _row_estimates(names)
+        tables = []
+        for name in names:
+            pk = _primary_key(_table(name))
+            tables.append({
+                "name": name,
+                "estimated_rows": estimates.get(name),
+                "primary_key": pk.name if pk is not None else None
+            })
+        return jsonify({"tables": tables}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@db_browser_bp.route("/view_db/<string:table_name>", methods=['GET'])
+@jwt_required()
+@read_only
+def browse_table(table_name):
+    """
+    Admin: Page through one table
+    ---
+    tags:
+      - Admin
+    summary: Rows of a table in primary-key order, keyset-paginated (Admin only)
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token in format: Bearer <your_token>'
+        required: true
+        type: string
+        default: "Bearer "
+      - name: table_name
+        in: path
+        type: string
+        required: true
+      - name: after
+        in: query
+        type: string
+        required: false
+        description: Primary key of the last row of the previous page (its next_cursor)
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 100
+        description: Page size (max 1000)
+    responses:
+      200:
+        description: One page of rows
+        schema:
+          type: object
+          properties:
+            table: { type: string, example: products }
+            rows: { type: array, items: { type: object } }
+            next_cursor: { type: string, example: "200" }
+      400:
+        description: Table has no single-column primary key, or the cursor does not parse
+      403:
+        description: Forbidden (not admin)
+      404:
+        description: No such table
+    """
+    forbidden = _admin_only()
+    if forbidden:
+        return forbidden
+
+    table = _table(table_name)
+    if table is None:
+        return jsonify({"error": "Table not found"}), 404
+    pk = _primary_key(table)
+    if pk is None:
+        return jsonify({"error": "Table has no single-column primary key to page on"}), 400
+
+    limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    query = select(table).order_by(pk).limit(limit + 1)
+    after = request.args.get("after")
+    if after is not None:
+        try:
+            query = query.where(pk > _cursor_value(pk, after))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    rows = [dict(row._mapping) for row in db.session.execute(query)]
+    page = rows[:limit]
+    next_cursor = str(page[-1][pk.name]) if len(rows) > limit else None
+
+    return jsonify({"table": table_name, "rows": page, "next_cursor": next_cursor}), 200
+
+
+@db_browser_bp.route("/view_db/<string:table_name>/dump", methods=['GET'])
+@jwt_required()
+@read_only
+def dump_table(table_name):
+    """
+    Admin: Stream a whole table as NDJSON
+    ---
+    tags:
+      - Admin
+    summary: One JSON object per line, read with a server-side cursor (Admin only)
+    produces:
+      - application/x-ndjson
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token in format: Bearer <your_token>'
+        required: true
+        type: string
+        default: "Bearer "
+      - name: table_name
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: The table's rows
+      403:
+        description: Forbidden (not admin)
+      404:
+        description: No such table
+    """
+    forbidden = _admin_only()
+    if forbidden:
+        return forbidden
+
+    table = _table(table_name)
+    if table is None:
+        return jsonify({"error": "Table not found"}), 404
+    pk = _primary_key(table)
+
+    query = select(table)
+    if pk is not None:
+        query = query.order_by(pk)
+
+    def generate():
+        result = db.session.execute(query.execution_options(yield_per=DUMP_BATCH_SIZE))
+        for batch in result.partitions():
+            yield "".join(json.dumps(dict(row._mapping), default=str) + "\n" for row in batch)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{table_name}.ndjson"'}
+    )
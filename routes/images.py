@@ -0,0 +1,142 @@
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from werkzeug.security import safe_join
+from core.imports import Blueprint, request, current_app
+from flask import send_file, abort
+from routes.auth import profile_store
+from routes.vendor import product_store
+
+images_bp = Blueprint('images', __name__)
+
+# <sha256>.<ext> or <sha256>_<variant>.<ext>: the name changes whenever the bytes do.
+CONTENT_HASH_NAME = re.compile(r"^([0-9a-f]{64})(?:_[a-z]+)?\.[a-z0-9]+$")
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+MUTABLE_MAX_AGE = 3600
+
+
+class HotObjectCache:
+    """
+    Byte-budgeted LRU of small, frequently requested image files.
+    A file is only admitted on its second request, so one-off fetches of
+    full-size photos don't evict the hot thumbnails.
+    """
+
+    def __init__(self, max_bytes, max_object_bytes=256 * 1024):
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._data.move_to_end(key)
+            return item
+
+    def offer(self, key, path, mtime, length):
+        """Cache `path` if it is small and has been asked for before. Returns the cached entry or None."""
+        if length > self.max_object_bytes or length > self.max_bytes:
+            return None
+        with self._lock:
+            if key not in self._seen:
+                self._seen[key] = True
+                if len(self._seen) > 10000:
+                    self._seen.popitem(last=False)
+                return None
+        with open(path, "rb") as f:
+            data = f.read()
+        with self._lock:
+            current = self._data.get(key)
+            if current is not None:
+                if current[1] == mtime:
+                    return current
+                # The file was rewritten since it was cached.
+                del self._data[key]
+                self.size -= len(current[0])
+            self._data[key] = (data, mtime)
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, (evicted, _) = self._data.popitem(last=False)
+                self.size -= len(evicted)
+            return self._data.get(key)
+
+
+_hot_cache = None
+_hot_cache_lock = threading.Lock()
+
+
+def hot_cache():
+    global _hot_cache
+    budget = current_app.config.get("IMAGE_HOT_CACHE_BYTES", 0)
+    if not budget:
+        return None
+    if _hot_cache is None:
+        with _hot_cache_lock:
+            if _hot_cache is None:
+                _hot_cache = HotObjectCache(budget)
+    return _hot_cache
+
+
+def serve_image(root, filename):
+    # Never expose in-progress uploads (.upload-*) or half-written variants (*.tmp).
+    if os.path.basename(filename).startswith(".") or filename.endswith(".tmp"):
+        abort(404)
+    path = safe_join(root, filename)
+    if path is None:
+        abort(404)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        abort(404)
+
+    match = CONTENT_HASH_NAME.match(filename)
+    # The file name is the content hash, so it is a strong validator for free.
+    etag = filename if match else None
+
+    cache = hot_cache()
+    entry = None
+    if cache is not None:
+        key = path
+        entry = cache.get(key)
+        if entry is not None and entry[1] != stat.st_mtime:
+            entry = None
+        if entry is None:
+            entry = cache.offer(key, path, stat.st_mtime, stat.st_size)
+
+    if entry is not None:
+        response = current_app.response_class(
+            entry[0], mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        response.last_modified = stat.st_mtime
+        response.set_etag(etag or f"{int(stat.st_mtime)}-{stat.st_size}")
+        response.make_conditional(request, accept_ranges=True, complete_length=stat.st_size)
+    else:
+        # send_file handles Range/If-None-Match and hands the open file to the
+        # server's wsgi.file_wrapper (sendfile under gunicorn), or emits
+        # X-Sendfile when USE_X_SENDFILE is enabled behind nginx/Apache.
+        response = send_file(path, conditional=True, etag=etag if etag else True,
+                             last_modified=stat.st_mtime)
+
+    response.cache_control.public = True
+    if match:
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = MUTABLE_MAX_AGE
+    return response
+
+
+@images_bp.route('/images/products/<path:filename>', methods=['GET'])
+def product_image(filename):
+    return serve_image(product_store.root, filename)
+
+
+@images_bp.route('/images/<path:filename>', methods=['GET'])
+def profile_image(filename):
+    return serve_image(profile_store.root, filename)
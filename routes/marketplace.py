@@ -1,15 +1,31 @@
 from core.imports import Blueprint, jsonify
 from models.vendorModels import Products
+from core.image_variants import requested_image_variant, product_image_options
+from sqlalchemy.orm import joinedload
+from core.replicas import read_only
 
 marketplace_bp = Blueprint('marketplace', __name__)
 
 @marketplace_bp.route('/api/marketplace/popular-products', methods=['GET'])
+@read_only
 def popular_products():
     """
     Get all popular products (active and visible)
     ---
     tags:
       - Marketplace
+    parameters:
+      - name: size
+        in: query
+        type: string
+        enum: [thumb, small, medium]
+        required: false
+        description: Return resized image variants instead of the originals
+      - name: format
+        in: query
+        type: string
+        enum: [webp, jpeg]
+        required: false
     responses:
       200:
         description: List of popular products
@@ -63,8 +79,16 @@ def popular_products():
               type: integer
               example: 10
     """
+    size, fmt = requested_image_variant()
+
     # Fetch only active & visible products
-    products = Products.query.filter_by(status="active", visibility=True).order_by(Products.id.desc()).all()
+    products = (
+        Products.query
+        .options(product_image_options(), joinedload(Products.category), joinedload(Products.vendor))
+        .filter_by(status="active", visibility=True)
+        .order_by(Products.id.desc())
+        .all()
+    )
 
     product_list = []
     for product in products:
@@ -73,7 +97,7 @@ def popular_products():
             "product_name": product.product_name,
             "product_price": product.product_price,
             "category": product.category.name if product.category else None,
-            "images": product.product_images,
+            "images": product.image_urls(size, fmt),
             "vendor": {
                 "id": product.vendor.id,
                 "business_name": product.vendor.business_name,
@@ -88,6 +112,7 @@ def popular_products():
 
 
 @marketplace_bp.route('/api/marketplace/products/<int:product_id>', methods=['GET'])
+@read_only
 def product_details(product_id):
     """
     Get details of a specific product by ID
@@ -159,7 +184,7 @@ def product_details(product_id):
         "product_price": product.product_price,
         "description": product.description,
         "category": product.category.name if product.category else None,
-        "images": product.product_images,
+        "images": product.image_urls(),
         "status": product.status,
         "visibility": product.visibility,
         "vendor": {
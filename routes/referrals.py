@@ -0,0 +1,264 @@
+from core.imports import Blueprint, jsonify, jwt_required, request, func, IntegrityError
+from core.extensions import db
+from core.identity import current_identity
+from models.userModel import Buyers, Vendors
+from models.referralModels import ReferralStat, Referral
+from core.replicas import read_only
+
+referrals_bp = Blueprint('referrals', __name__)
+
+
+def _count_referrals(referral_code):
+    """Slow path used only to backfill a counter that predates the referral_stats table."""
+    return (
+        db.session.query(func.count(Buyers.id)).filter(Buyers.referred_by == referral_code).scalar() +
+        db.session.query(func.count(Vendors.id)).filter(Vendors.referred_by == referral_code).scalar()
+    )
+
+
+def _find_code_owner(referral_code):
+    buyer = db.session.query(Buyers.id).filter(Buyers.referral_code == referral_code).first()
+    if buyer:
+        return "buyer", buyer.id
+    vendor = db.session.query(Vendors.id).filter(Vendors.referral_code == referral_code).first()
+    if vendor:
+        return "vendor", vendor.id
+    return None, None
+
+
+def ensure_referral_stat(referral_code, owner_role, owner_id):
+    """Return the counter row for `referral_code`, creating (and backfilling) it if missing."""
+    stat = db.session.get(ReferralStat, referral_code)
+    if stat is not None:
+        return stat
+
+    stat = ReferralStat(
+        referral_code=referral_code,
+        owner_role=owner_role,
+        owner_id=owner_id,
+        referral_count=_count_referrals(referral_code)
+    )
+    try:
+        with db.session.begin_nested():
+            db.session.add(stat)
+    except IntegrityError:
+        # Another request created it first.
+        stat = db.session.get(ReferralStat, referral_code)
+    return stat
+
+
+def record_referral(new_user, role):
+    """
+    Called from verify_email in the same transaction that creates `new_user`.
+    Opens the new user's own counter and bumps the referrer's counter in place.
+    """
+    db.session.add(ReferralStat(
+        referral_code=new_user.referral_code,
+        owner_role=role,
+        owner_id=new_user.id,
+        referral_count=0
+    ))
+
+    code = new_user.referred_by
+    if not code:
+        return
+
+    owner_role, owner_id = _find_code_owner(code)
+    if owner_role is None:
+        return
+
+    db.session.add(Referral(
+        referrer_code=code,
+        referee_role=role,
+        referee_id=new_user.id,
+        referee_code=new_user.referral_code
+    ))
+
+    updated = ReferralStat.query.filter_by(referral_code=code).update(
+        {"referral_count": ReferralStat.referral_count + 1}, synchronize_session=False
+    )
+    if not updated:
+        # Backfill counts the new user too, since it has already been flushed.
+        ensure_referral_stat(code, owner_role, owner_id)
+
+
+def _own_referral_stat():
+    """
+    The current user's ReferralStat row, created from the account on first
+    use for accounts that predate the referral tables. None if the user is
+    not a buyer or vendor, or no longer exists.
+    """
+    identity = current_identity()
+    if identity.role not in ("buyer", "vendor"):
+        return None
+
+    stat = ReferralStat.query.filter_by(owner_role=identity.role, owner_id=identity.id).first()
+    if stat is None:
+        user = identity.row
+        if not user:
+            return None
+        stat = ensure_referral_stat(user.referral_code, identity.role, user.id)
+        db.session.commit()
+    return stat
+
+
+@referrals_bp.route('/api/referrals', methods=['GET'])
+@jwt_required()
+def referral_stat():
+    """
+    Get Referral Statistics
+    ---
+    tags:
+      - User
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token as: Bearer <your_token>'
+        required: true
+        schema:
+          type: string
+          example: "Bearer eyJhbGciOiJIUzI1NiIsInR5cCI6..."
+    responses:
+      200:
+        description: Referral statistics retrieved successfully
+        schema:
+          type: object
+          properties:
+            referral_code:
+              type: string
+              example: ABCD1234
+            referral_count:
+              type: integer
+              example: 5
+      401:
+        description: Unauthorized — missing or invalid JWT token
+      404:
+        description: User not found
+    """
+    stat = _own_referral_stat()
+    if stat is None:
+        return jsonify({"message": "User not found"}), 404
+
+    return jsonify({
+        "referral_code": stat.referral_code,
+        "referral_count": stat.referral_count
+    }), 200
+
+
+@referrals_bp.route('/api/referrals/tree', methods=['GET'])
+@jwt_required()
+def referral_tree():
+    """
+    Get accounts referred by the current user, with their own referral counts
+    ---
+    tags:
+      - User
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token as: Bearer <your_token>'
+        required: true
+        type: string
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 50
+    responses:
+      200:
+        description: Direct referrals
+      404:
+        description: User not found
+    """
+    stat = _own_referral_stat()
+    if stat is None:
+        return jsonify({"message": "User not found"}), 404
+
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 200)
+    rows = (
+        db.session.query(Referral, ReferralStat.referral_count)
+        .outerjoin(ReferralStat, ReferralStat.referral_code == Referral.referee_code)
+        .filter(Referral.referrer_code == stat.referral_code)
+        .order_by(Referral.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+    return jsonify({
+        "referral_code": stat.referral_code,
+        "referral_count": stat.referral_count,
+        "referrals": [
+            {
+                "role": ref.referee_role,
+                "id": ref.referee_id,
+                "referral_code": ref.referee_code,
+                "referral_count": count or 0,
+                "joined_at": ref.created_at
+            } for ref, count in rows
+        ]
+    }), 200
+
+
+@referrals_bp.route('/api/referrals/leaderboard', methods=['GET'])
+@jwt_required()
+@read_only
+def referral_leaderboard():
+    """
+    Top referrers
+    ---
+    tags:
+      - User
+    security:
+      - Bearer: []
+    parameters:
+      - name: Authorization
+        in: header
+        description: 'JWT token as: Bearer <your_token>'
+        required: true
+        type: string
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        default: 10
+    responses:
+      200:
+        description: Referral codes with the most verified referrals
+        schema:
+          type: object
+          properties:
+            leaderboard:
+              type: array
+              items:
+                type: object
+                properties:
+                  rank: { type: integer, example: 1 }
+                  referral_code: { type: string, example: ABCD1234 }
+                  role: { type: string, example: vendor }
+                  referral_count: { type: integer, example: 42 }
+    """
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+
+    # Served by the index on referral_count: a bounded index scan, not a sort over all users.
+    top = (
+        ReferralStat.query
+        .filter(ReferralStat.referral_count > 0)
+        .order_by(ReferralStat.referral_count.desc())
+        .limit(limit)
+        .all()
+    )
+
+    return jsonify({
+        "leaderboard": [
+            {
+                "rank": rank,
+                "referral_code": stat.referral_code,
+                "role": stat.owner_role,
+                "referral_count": stat.referral_count
+            } for rank, stat in enumerate(top, start=1)
+        ]
+    }), 200
@@ -1,14 +1,19 @@
 
 #text/x-generic vendor.py ( Python script, UTF-8 Unicode text executable, with CRLF line terminators )
-from core.imports import Blueprint, request, jsonify, jwt_required, get_jwt_identity, requests, base64, BytesIO, re
-from models.vendorModels import Category, Products, Storefront, ProductImages
-from models.userModel import Vendors
+from core.imports import Blueprint, request, jsonify, jwt_required, get_jwt_identity, datetime
+from core.config import Config
+from models.vendorModels import Category, Products, Storefront, ProductImages, ImageBlob
 from models.orderModels import Order
 from core.extensions import db
-import os
-import uuid
+from core.identity import current_identity
+from core.image_store import ImageStore, UploadTooLarge
+from core.image_uploader import ImageUploader, ImageUploadError, DATA_URL_PREFIX
+from core.image_variants import variant_pipeline, requested_image_variant, product_image_options
+import mimetypes
+from collections import Counter
 from werkzeug.utils import secure_filename
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
 import traceback
 
@@ -16,123 +21,98 @@ import traceback
 vendor_bp = Blueprint('vendor', __name__)
 
 UPLOAD_FOLDER = '/home/realvlcj/api.bizengo.com/images/products'
+PRODUCT_IMAGE_BASE_URL = 'https://api.bizengo.com/images/products'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 
+product_store = ImageStore(UPLOAD_FOLDER, PRODUCT_IMAGE_BASE_URL)
+image_uploader = ImageUploader(
+    Config.IMAGE_UPLOAD_URL,
+    max_workers=Config.IMAGE_UPLOAD_WORKERS,
+    timeout=(Config.IMAGE_UPLOAD_CONNECT_TIMEOUT, Config.IMAGE_UPLOAD_READ_TIMEOUT),
+    retries=Config.IMAGE_UPLOAD_RETRIES
+)
+
 def allowed_file(filename):
     """Checks if a filename has an allowed extension."""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def seed_categories():
-    categories = ["Electronics", "Fashion", "Books"]
-    created = []
-    for name in categories:
-        if not Category.query.filter_by(name=name).first():
-            category = Category(name=name)
-            db.session.add(category)
-            created.append(name)
+def store_product_image(stream, ext, vendor_id):
+    """Stream an upload into the content-addressed store and return its ImageBlob."""
+    digest, filename, size, created = product_store.save_stream(stream, ext)
+
+    blob = db.session.get(ImageBlob, digest)
+    if blob:
+        return blob
+
+    blob = ImageBlob(
+        sha256=digest,
+        filename=filename,
+        url=product_store.url_for(filename),
+        size_bytes=size,
+        content_type=mimetypes.guess_type(filename)[0],
+        uploaded_by=vendor_id,
+        ref_count=0
+    )
+    try:
+        with db.session.begin_nested():
+            db.session.add(blob)
+    except IntegrityError:
+        # Same bytes uploaded concurrently by another request.
+        blob = db.session.get(ImageBlob, digest)
     db.session.commit()
-    if created:
-        print(f"✅ Categories created: {', '.join(created)}")
-    else:
-        print("ℹ️ Categories already exist.")
-
-def seed_products():
-    vendor = Vendors.query.filter_by(email="demo@vendor.com").first()
-    if not vendor:
-        print("❌ No demo vendor found. Run seed_demo_vendor() first.")
-        return
-    
-    sample_products = [
-        {
-            "product_name": "Smartphone X10",
-            "product_price": 120000,
-            "description": "Latest model smartphone with AI camera.",
-            "category": "Electronics",
-            "images": ["https://via.placeholder.com/150"],
-            "status": "active",
-            "visibility": True
-        },
-        {
-            "product_name": "Men's Sneakers",
-            "product_price": 25000,
-            "description": "Comfortable and stylish sneakers.",
-            "category": "Fashion",
-            "images": ["https://via.placeholder.com/150"],
-            "status": "active",
-            "visibility": True
-        },
-        {
-            "product_name": "Python Programming",
-            "product_price": 8000,
-            "description": "A beginner-friendly guide to Python programming.",
-            "category": "Books",
-            "images": ["https://via.placeholder.com/150"],
-            "status": "inactive",
-            "visibility": False
-        }
-    ]
 
-    for prod in sample_products:
-        exists = Products.query.filter_by(product_name=prod["product_name"]).first()
-        if not exists:
-            category = Category.query.filter_by(name=prod["category"]).first()
-            if not category:
-                print(f"⚠️ Category {prod['category']} not found. Run seed_categories() first.")
-                continue
-            new_product = Products(
-                product_name=prod["product_name"],
-                product_price=prod["product_price"],
-                description=prod["description"],
-                product_images=prod["images"],
-                category_id=category.id,
-                vendor_id=vendor.id,
-                status=prod["status"],
-                visibility=prod["visibility"]
-            )
-            db.session.add(new_product)
-            print(f"✅ Product added: {prod['product_name']}")
-        else:
-            print(f"ℹ️ Product already exists: {prod['product_name']}")
-    db.session.commit()
+    variant_pipeline.submit(digest)
+    return blob
 
-def upload_base64_image(img_b64, vendor_id, idx):
-    # Detect prefix (optional, if sent with data:image/...;base64)
-    match = re.match(r"data:image/(png|jpeg|jpg);base64,(.*)", img_b64, re.DOTALL)
-    if match:
-        img_format = match.group(1).lower()   # png / jpeg / jpg
-        img_data = match.group(2)
-    else:
-        # fallback: assume jpeg if no prefix
-        img_format = "jpeg"
-        img_data = img_b64
-
-    # Decode base64
-    img_bytes = base64.b64decode(img_data)
-
-    # Pick correct mimetype
-    mime_type = f"image/{img_format if img_format != 'jpg' else 'jpeg'}"
-
-    files = {
-        "file": (f"product_{vendor_id}_{idx}.{img_format}", BytesIO(img_bytes), mime_type)
-    }
+def attach_blobs(urls):
+    """
+    Map image URLs to stored blobs and take one reference per URL.
+    Returns {url: sha256} for the URLs that belong to the store.
+    """
+    if not urls:
+        return {}
+    rows = db.session.query(ImageBlob.url, ImageBlob.sha256).filter(ImageBlob.url.in_(set(urls))).all()
+    by_url = {url: digest for url, digest in rows}
+
+    uses = Counter(by_url[url] for url in urls if url in by_url)
+    for digest, count in uses.items():
+        ImageBlob.query.filter_by(sha256=digest).update(
+            {"ref_count": ImageBlob.ref_count + count}, synchronize_session=False
+        )
+    return by_url
 
-    # Upload to external API (adjust headers/auth if needed)
-    response = requests.post("https://api.bizengo.com/images", files=files)
+def release_blob(digest):
+    if digest:
+        ImageBlob.query.filter(ImageBlob.sha256 == digest, ImageBlob.ref_count > 0).update(
+            {"ref_count": ImageBlob.ref_count - 1}, synchronize_session=False
+        )
 
-    if response.status_code == 200:
-        return response.json().get("url")
-    else:
-        raise Exception(f"Image upload failed: {response.text}")
+def upload_base64_images(images, vendor_id):
+    """Upload several base64 images in parallel over pooled connections; URLs keep input order."""
+    return image_uploader.upload_many(images, vendor_id)
+
+def resolve_image_urls(images, vendor_id):
+    """
+    Product images are sent as URLs (from /api/vendor/upload-file) or as
+    base64 data URLs. Upload the data URLs in parallel and return every
+    image as a URL, in input order.
+    """
+    pending = [img for img in images if img.startswith(DATA_URL_PREFIX)]
+    if not pending:
+        return list(images)
+    uploaded = iter(upload_base64_images(pending, vendor_id))
+    return [next(uploaded) if img.startswith(DATA_URL_PREFIX) else img for img in images]
     
     
 @vendor_bp.route('/api/vendor/my-products', methods=['GET'])
 @jwt_required()
 def get_my_products():
     current_vendor_id = get_jwt_identity()
+    size, fmt = requested_image_variant()
 
     products = Products.query.options(
-        joinedload(Products.images),
+        product_image_options(),
         joinedload(Products.category)
     ).filter(
         Products.vendor_id == current_vendor_id,
@@ -141,7 +121,7 @@ def get_my_products():
 
     product_list = []
     for product in products:
-        active_images = [img.image_url for img in product.images if not img.is_deleted]
+        active_images = product.image_urls(size, fmt)
 
         product_list.append({
             "product_id": product.id,
@@ -164,9 +144,8 @@ def get_my_products():
 @vendor_bp.route('/api/vendor/add-product', methods=['POST'])
 @jwt_required()
 def add_product():
-    vendor_id_str = get_jwt_identity()
-    vendor = Vendors.query.get(vendor_id_str)
-    if not vendor:
+    vendor = current_identity()
+    if vendor.role != "vendor" or not vendor.exists():
         return jsonify({"error": "Vendor not found"}), 404
 
     data = request.get_json()
@@ -181,8 +160,8 @@ def add_product():
     if not all([product_name, product_price, quantity, category_name, description]):
         return jsonify({"error": "Missing required fields"}), 400
     
-    if not image_urls or not isinstance(image_urls, list):
-         return jsonify({"error": "The 'images' field must be a non-empty list of URLs"}), 400
+    if not image_urls or not isinstance(image_urls, list) or not all(isinstance(url, str) and url for url in image_urls):
+         return jsonify({"error": "The 'images' field must be a non-empty list of URLs or base64 data URLs"}), 400
 
     clean_product_name = product_name.strip()
 
@@ -197,6 +176,12 @@ def add_product():
             "product_id": existing_product.id
         }), 409
 
+    # Upload before touching the database so no transaction waits on the network.
+    try:
+        image_urls = resolve_image_urls(image_urls, vendor.id)
+    except ImageUploadError as e:
+        return jsonify({"error": "Failed to upload product images.", "details": str(e)}), 502
+
     try:
         category = Category.query.filter(func.lower(Category.name) == category_name.lower()).first()
         if not category:
@@ -216,11 +201,13 @@ def add_product():
         
         db.session.flush()
 
+        blob_hashes = attach_blobs(image_urls)
         for url in image_urls:
             product_image = ProductImages(
                 product_id=new_product.id,
                 vendor_id=vendor.id,
-                image_url=url
+                image_url=url,
+                blob_hash=blob_hashes.get(url)
             )
             db.session.add(product_image)
 
@@ -260,18 +247,11 @@ def upload_file():
         if file and allowed_file(file.filename):
             try:
                 original_ext = file.filename.rsplit('.', 1)[1].lower()
-                unique_id = uuid.uuid4().hex
-                filename = secure_filename(f"{vendor_id_str}_{unique_id}.{original_ext}")
-                
-                save_path = os.path.join(UPLOAD_FOLDER, filename)
-
-                os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-                
-                file.save(save_path)
-
-                file_url = f"https://api.bizengo.com/images/products/{filename}"
-                uploaded_urls.append(file_url)
+                blob = store_product_image(file.stream, original_ext, int(vendor_id_str))
+                uploaded_urls.append(blob.url)
 
+            except UploadTooLarge as e:
+                errors.append(f"'{secure_filename(file.filename)}': {str(e)}")
             except Exception as e:
                 errors.append(f"Could not save file '{secure_filename(file.filename)}': {str(e)}")
                 traceback.print_exc()
@@ -291,6 +271,34 @@ def upload_file():
     return jsonify(response), 200
 
 
+@vendor_bp.route('/api/vendor/upload-file/stream', methods=['PUT'])
+@jwt_required()
+def upload_file_stream():
+    """
+    Upload a single image as the raw request body (no multipart).
+    The body is hashed and written to disk in chunks as it arrives, and an
+    image we already have is deduplicated on that digest. A client-supplied
+    hash is never trusted: it would let anyone claim any stored image.
+    """
+    vendor_id = int(get_jwt_identity())
+
+    filename = request.args.get('filename', '')
+    if not allowed_file(filename):
+        return jsonify({"error": "A 'filename' query parameter with an allowed extension is required"}), 400
+    ext = filename.rsplit('.', 1)[1].lower()
+
+    try:
+        blob = store_product_image(request.stream, ext, vendor_id)
+    except UploadTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except Exception as e:
+        db.session.rollback()
+        traceback.print_exc()
+        return jsonify({"error": "Could not save file", "details": str(e)}), 500
+
+    return jsonify({"url": blob.url, "sha256": blob.sha256, "size": blob.size_bytes}), 201
+
+
 @vendor_bp.route('/api/vendor/edit-product/<int:product_id>', methods=['PUT'])
 @jwt_required()
 def edit_product(product_id):
@@ -306,6 +314,12 @@ def edit_product(product_id):
         return jsonify({"error": "Product not found or you are not authorized to edit it"}), 404
 
     try:
+        # Upload first, before any change is flushed and holds the product row.
+        new_image_urls = []
+        if 'new_images' in data and isinstance(data['new_images'], list):
+            new_image_urls = [url for url in data['new_images'] if isinstance(url, str) and url]
+            new_image_urls = resolve_image_urls(new_image_urls, int(current_vendor_id))
+
         if 'product_name' in data:
             product.product_name = str(data['product_name'])
         if 'product_price' in data:
@@ -329,20 +343,23 @@ def edit_product(product_id):
                 db.session.add(category)
             product.category = category
 
-        if 'new_images' in data and isinstance(data['new_images'], list):
-            new_image_urls = data['new_images']
-            
+        if new_image_urls:
+            blob_hashes = attach_blobs(new_image_urls)
+
             for url in new_image_urls:
-                if isinstance(url, str) and url:
-                    new_product_image = ProductImages(
-                        product_id=product.id,
-                        vendor_id=int(current_vendor_id),
-                        image_url=url
-                    )
-                    db.session.add(new_product_image)
+                new_product_image = ProductImages(
+                    product_id=product.id,
+                    vendor_id=int(current_vendor_id),
+                    image_url=url,
+                    blob_hash=blob_hashes.get(url)
+                )
+                db.session.add(new_product_image)
 
         db.session.commit()
 
+    except ImageUploadError as e:
+        db.session.rollback()
+        return jsonify({"error": "Failed to upload product images.", "details": str(e)}), 502
     except (ValueError, TypeError) as e:
         db.session.rollback()
         return jsonify({"error": "Invalid data format provided.", "details": str(e)}), 400
@@ -367,7 +384,10 @@ def delete_image(image_id):
     if not image_to_delete:
         return jsonify({"error": "Image not found or you do not have permission to delete it."}), 404
 
-    image_to_delete.is_deleted = True
+    if not image_to_delete.is_deleted:
+        image_to_delete.is_deleted = True
+        image_to_delete.deleted_at = datetime.utcnow()
+        release_blob(image_to_delete.blob_hash)
     db.session.commit()
 
     return jsonify({"message": f"Image {image_id} has been marked as deleted."}), 200
@@ -499,7 +519,7 @@ def get_storefront_details():
             "product_name": product.product_name,
             "product_price": product.product_price,
             "description": product.description,
-            "images": product.product_images,
+            "images": product.image_urls(),
             "status": product.status,
             "visibility": product.visibility,
             "category": product.category.name if product.category else None
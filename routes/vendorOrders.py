@@ -1,78 +1,12 @@
 from core.imports import Blueprint, current_app, jsonify, get_jwt_identity, jwt_required, get_jwt, request, hashlib, hmac
+from sqlalchemy.orm import contains_eager
 from core.extensions import db
 from models.orderModels import OrderItem, Order
 from models.vendorModels import Products
-from models.userModel import Buyers, Vendors
+from models.userModel import Buyers
 
 vendor_orders = Blueprint("vendor_orders", __name__)
 
-def seed_demo_orders():
-    buyer = Buyers.query.filter_by(email="demo@buyer.com").first()
-    vendor = Vendors.query.filter_by(email="demo@vendor.com").first()
-
-    if not buyer or not vendor:
-        print("❌ Demo buyer/vendor not found. Run seed_demo_buyer() and seed_demo_vendor() first.")
-        return
-
-    # Grab vendor's active products
-    products = Products.query.filter_by(vendor_id=vendor.id, status="active").all()
-    if not products:
-        print("❌ No active products found for demo vendor. Run seed_products() first.")
-        return
-
-    demo_orders = [
-        {"reference": "DEMO_ORDER_001", "status": "pending"},
-        {"reference": "DEMO_ORDER_002", "status": "shipped"},
-        {"reference": "DEMO_ORDER_003", "status": "shipped"},
-        {"reference": "DEMO_ORDER_004", "status": "delivered"},
-    ]
-
-    created_orders = []
-    for demo in demo_orders:
-        exists = Order.query.filter_by(reference=demo["reference"]).first()
-        if exists:
-            print(f"ℹ️ {demo['reference']} already exists.")
-            continue
-
-        # Create order for demo buyer
-        new_order = Order(
-            buyer_id=buyer.id,
-            total_amount=0,
-            status=demo["status"],
-            reference=demo["reference"],
-        )
-        db.session.add(new_order)
-        db.session.flush()  # so new_order.id is available
-
-        total_amount = 0
-        order_items = []
-
-        # Add 1–2 products from vendor to each order
-        for product in products[:2]:
-            quantity = 1
-            line_total = product.product_price * quantity
-            total_amount += line_total
-
-            order_item = OrderItem(
-                order_id=new_order.id,
-                product_id=product.id,
-                product_name=product.product_name,
-                quantity=quantity,
-                price=product.product_price,
-                status="pending"  # default
-            )
-            db.session.add(order_item)
-            order_items.append(order_item)
-
-        # Update total after adding items
-        new_order.total_amount = total_amount
-        created_orders.append(new_order)
-
-    db.session.commit()
-    print(f"✅ Created {len(created_orders)} demo orders for buyer={buyer.email}, vendor={vendor.business_name}")
-    return created_orders
-
-
 @vendor_orders.route('/api/vendor/orders', methods=['GET'])
 @jwt_required()
 def get_vendor_orders():
@@ -153,6 +87,7 @@ def get_vendor_orders():
         .join(Products, OrderItem.product_id == Products.id)
         .join(Order, OrderItem.order_id == Order.id)
         .filter(Products.vendor_id == vendor_id)
+        .options(contains_eager(OrderItem.order).joinedload(Order.buyer))
         .order_by(Order.created_at.desc())
         .all()
     )
@@ -160,7 +95,7 @@ def get_vendor_orders():
     orders_map = {}
     for item in order_items:
         order = item.order
-        buyer = Buyers.query.get(order.buyer_id)
+        buyer = order.buyer
         if order.id not in orders_map:
             orders_map[order.id] = {
                 "order_id": order.id,
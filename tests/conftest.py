@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+# Config reads the environment once, when core.config is first imported.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ["SCHEDULER_ENABLED"] = "false"
+os.environ["SWAGGER_ENABLED"] = "false"
+os.environ["EMAIL_QUEUE_WORKERS"] = "0"
+os.environ["METRICS_ENABLED"] = "false"
+
+from main import create_app
+from core.extensions import db
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Build apps on SQLite files under tmp_path; keyword arguments override the config."""
+    apps = []
+
+    def make(**config):
+        config.setdefault("TESTING", True)
+        config.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'primary.db'}")
+        config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {})
+        config.setdefault("SQLALCHEMY_BINDS", {})
+        app = create_app(config)
+        with app.app_context():
+            db.create_all()
+        apps.append(app)
+        return app
+
+    yield make
+
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
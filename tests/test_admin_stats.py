@@ -0,0 +1,85 @@
+from sqlalchemy import delete
+
+from core.admin_stats import current_admin_stats, fold_admin_stats_deltas, reconcile_admin_stats
+from core.extensions import db
+from models.statsModels import AdminStats, AdminStatsDelta
+from models.userModel import Buyers, Vendors
+from models.vendorModels import Category, Products
+
+
+def add_buyers(*names):
+    for name in names:
+        db.session.add(Buyers(name=name, email=f"{name}@example.com", password="x",
+                              role="buyer", referral_code=name.upper()))
+    db.session.commit()
+
+
+def test_writes_append_deltas_instead_of_updating_the_row(app):
+    with app.app_context():
+        reconcile_admin_stats(snapshot=False)
+        add_buyers("ann", "bob")
+
+        assert db.session.get(AdminStats, 1).buyers == 0
+        assert AdminStatsDelta.query.count() == 1
+        assert current_admin_stats().buyers == 2
+
+
+def test_fold_moves_deltas_into_the_row(app):
+    with app.app_context():
+        add_buyers("ann")
+        add_buyers("bob")
+        db.session.add(Products(product_name="Lamp", product_price=5000, description="A lamp",
+                                category=Category(name="Home"), status="inactive",
+                                vendor=Vendors(firstname="Ada", lastname="Vendor", business_name="Ada's",
+                                               business_type="Retail", email="ada@example.com",
+                                               password="x", referral_code="ADA1")))
+        db.session.commit()
+
+        assert fold_admin_stats_deltas() == {"folded": 3}
+
+        stats = db.session.get(AdminStats, 1)
+        assert (stats.buyers, stats.vendors, stats.products_total, stats.products_inactive) == (2, 1, 1, 1)
+        assert AdminStatsDelta.query.count() == 0
+        assert current_admin_stats().buyers == 2
+
+
+def test_reconcile_corrects_drift_and_keeps_later_deltas(app):
+    with app.app_context():
+        reconcile_admin_stats(snapshot=False)
+        add_buyers("ann", "bob")
+        # Lose the delta, as a bulk delete bypassing the ORM would.
+        db.session.execute(delete(AdminStatsDelta))
+        db.session.commit()
+        assert current_admin_stats().buyers == 0
+
+        assert reconcile_admin_stats(snapshot=False) == {"drift": {"buyers": 2}}
+        add_buyers("cy")
+
+        assert db.session.get(AdminStats, 1).buyers == 2
+        assert current_admin_stats().buyers == 3
+
+
+def test_user_deletion_records_exact_negative_deltas(app):
+    from core.user_deletion import user_deletion
+
+    with app.app_context():
+        vendor = Vendors(firstname="Ada", lastname="Vendor", business_name="Ada's", business_type="Retail",
+                         email="ada@example.com", password="x", referral_code="ADA1")
+        category = Category(name="Home")
+        db.session.add_all([
+            Products(product_name="Lamp", product_price=5000, description="A lamp",
+                     category=category, vendor=vendor),
+            Products(product_name="Rug", product_price=9000, description="A rug",
+                     category=category, vendor=vendor, visibility=False),
+        ])
+        add_buyers("ann")
+        reconcile_admin_stats(snapshot=False)
+
+        job = user_deletion.enqueue("vendor", vendor.id)
+        db.session.commit()
+        user_deletion.run(job.id)
+
+        stats = current_admin_stats()
+        assert (stats.buyers, stats.vendors, stats.products_total,
+                stats.products_active, stats.products_hidden) == (1, 0, 0, 0, 0)
+        assert reconcile_admin_stats(snapshot=False) == {"drift": {}}
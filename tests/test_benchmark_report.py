@@ -0,0 +1,38 @@
+from benchmarks.report import failing, regressions, summarize
+
+KEY = "inproc|browse=1|c=1"
+
+
+def run(**results):
+    return {"key": KEY, "at": "2026-01-01T00:00:00", "results": results}
+
+
+def row(requests, errors, p95=0.010):
+    return summarize([p95] * requests, errors, duration=1)
+
+
+def test_slower_p95_is_a_regression():
+    _, found = regressions([run(detail=row(100, 0, 0.010))], KEY, {"detail": row(100, 0, 0.020)}, 0.2)
+    assert found == [("detail", "p95 10.0ms -> 20.0ms")]
+
+
+def test_more_errors_is_a_regression():
+    _, found = regressions([run(detail=row(100, 0))], KEY, {"detail": row(90, 10)}, 0.2)
+    assert found == [("detail", "error rate 0.00% -> 10.00%")]
+
+
+def test_no_successes_is_a_regression():
+    _, found = regressions([run(detail=row(100, 0))], KEY, {"detail": row(0, 50)}, 0.2)
+    assert found == [("detail", "no successful requests (was 100)")]
+
+
+def test_history_rows_without_error_rate_still_compare():
+    before = row(100, 5)
+    del before["error_rate"]
+    _, found = regressions([run(detail=before)], KEY, {"detail": row(100, 5)}, 0.2)
+    assert found == []
+
+
+def test_failing_lists_every_operation_with_errors():
+    results = {"listing": row(100, 0), "detail": row(0, 40)}
+    assert failing(results) == [("detail", 40, 1.0)]
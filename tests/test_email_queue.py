@@ -0,0 +1,184 @@
+import socket
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+from aiosmtpd.controller import Controller
+
+from core.email_queue import email_queue
+from core.extensions import db
+from core.imports import datetime, timedelta
+from models.emailModels import EmailJob
+
+
+class Handler:
+    """
+    Local SMTP server behaviour: refuses refused@..., rejects the message
+    body for rejected@..., and drops the connection the first
+    `drops[address]` times a message to `address` is sent.
+    """
+
+    def __init__(self):
+        self.delivered = []
+        self.peers = []
+        self.drops = {}
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("refused@"):
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.peers.append(session.peer)
+        for address in envelope.rcpt_tos:
+            if address.startswith("rejected@"):
+                return "554 5.6.0 Message rejected"
+            if self.drops.get(address, 0) > 0:
+                self.drops[address] -= 1
+                server.transport.abort()
+                return "421 Closing"
+        self.delivered.extend(envelope.rcpt_tos)
+        return "250 Message accepted"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp():
+    handler = Handler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+@pytest.fixture
+def app(make_app, smtp):
+    controller, _ = smtp
+    app = make_app(
+        MAIL_SERVER=controller.hostname, MAIL_PORT=controller.port, MAIL_USE_SSL=False, MAIL_USE_TLS=False,
+        MAIL_USERNAME=None, MAIL_PASSWORD=None, MAIL_DEFAULT_SENDER="noreply@example.com",
+        EMAIL_QUEUE_MAX_ATTEMPTS=3, EMAIL_QUEUE_BACKOFF_BASE=30,
+    )
+    yield app
+    email_queue.pool.close_all()
+
+
+def enqueue(app, *recipients):
+    """Queue one email per recipient, due in the given order."""
+    with app.app_context():
+        start = datetime.utcnow() - timedelta(minutes=1)
+        for i, to in enumerate(recipients):
+            job = email_queue.enqueue(to, "Hello", "<p>Hi</p>")
+            job.next_attempt_at = start + timedelta(seconds=i)
+        db.session.commit()
+
+
+def drain(app):
+    with app.app_context():
+        return email_queue.drain()
+
+
+def jobs(app):
+    with app.app_context():
+        return {job.recipient: job for job in EmailJob.query}
+
+
+def test_sends_queued_emails_over_one_connection(app, smtp):
+    _, handler = smtp
+    enqueue(app, "a@example.com", "b@example.com")
+
+    assert drain(app) == 2
+
+    assert sorted(handler.delivered) == ["a@example.com", "b@example.com"]
+    assert len(set(handler.peers)) == 1
+    for job in jobs(app).values():
+        assert (job.status, job.attempts, job.last_error) == ("sent", 1, None)
+        assert job.sent_at is not None
+    assert drain(app) == 0
+
+
+def test_refused_recipient_fails_without_retry(app, smtp):
+    _, handler = smtp
+    enqueue(app, "refused@example.com", "ok@example.com")
+
+    assert drain(app) == 1
+
+    result = jobs(app)
+    assert result["refused@example.com"].status == "failed"
+    assert result["refused@example.com"].attempts == 1
+    assert "No such user" in result["refused@example.com"].last_error
+    assert result["ok@example.com"].status == "sent"
+    assert handler.delivered == ["ok@example.com"]
+
+
+def test_rejected_message_keeps_the_connection(app, smtp):
+    _, handler = smtp
+    enqueue(app, "rejected@example.com", "after@example.com")
+
+    assert drain(app) == 1
+
+    result = jobs(app)
+    assert result["rejected@example.com"].status == "queued"
+    assert result["rejected@example.com"].attempts == 1
+    assert result["after@example.com"].status == "sent"
+    # An SMTP error reply is not a dead connection: no reconnect.
+    assert len(set(handler.peers)) == 1
+
+
+def test_disconnect_mid_batch_reconnects_for_the_rest(app, smtp):
+    _, handler = smtp
+    handler.drops["flaky@example.com"] = 1
+    enqueue(app, "first@example.com", "flaky@example.com", "last@example.com")
+
+    assert drain(app) == 2
+
+    result = jobs(app)
+    assert result["first@example.com"].status == "sent"
+    assert result["last@example.com"].status == "sent"
+    flaky = result["flaky@example.com"]
+    assert (flaky.status, flaky.attempts) == ("queued", 1)
+    assert flaky.last_error
+    assert flaky.next_attempt_at > datetime.utcnow()
+    assert len(set(handler.peers)) == 2
+
+
+def test_failed_email_is_retried_after_backoff(app, smtp):
+    _, handler = smtp
+    handler.drops["flaky@example.com"] = 1
+    enqueue(app, "flaky@example.com")
+
+    assert drain(app) == 0
+    # Backing off: not due yet.
+    assert drain(app) == 0
+
+    with app.app_context():
+        EmailJob.query.update({"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+    assert drain(app) == 1
+
+    job = jobs(app)["flaky@example.com"]
+    assert (job.status, job.attempts, job.last_error) == ("sent", 2, None)
+    assert handler.delivered == ["flaky@example.com"]
+
+
+def test_gives_up_after_max_attempts(app, smtp):
+    _, handler = smtp
+    handler.drops["down@example.com"] = 10
+    enqueue(app, "down@example.com")
+
+    for _ in range(3):
+        drain(app)
+        with app.app_context():
+            EmailJob.query.filter_by(status="queued").update(
+                {"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+            db.session.commit()
+
+    job = jobs(app)["down@example.com"]
+    assert (job.status, job.attempts) == ("failed", 3)
+    assert drain(app) == 0
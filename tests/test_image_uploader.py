@@ -0,0 +1,184 @@
+import base64
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+from flask_jwt_extended import create_access_token
+
+from core.extensions import db
+from core.image_uploader import ImageUploader, ImageUploadError
+from models.userModel import Vendors
+from models.vendorModels import Category, Products, ProductImages
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 40
+
+
+def data_url(payload=PNG, fmt="png"):
+    return f"data:image/{fmt};base64," + base64.b64encode(payload).decode()
+
+
+class StandIn(ThreadingHTTPServer):
+    """
+    Local stand-in for the image API. Records (filename, file bytes) per
+    request and answers from `scripted` (status, body) pairs, then with a
+    URL for the uploaded file name. Names listed in `reject` get a 400.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.received = []
+        self.scripted = []
+        self.reject = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/images"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        boundary = re.search(r"boundary=(\w+)", self.headers["Content-Type"]).group(1).encode()
+        filename = re.search(rb'filename="([^"]+)"', body).group(1).decode()
+        content = body.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n--" + boundary + b"--", 1)[0]
+        with self.server.lock:
+            self.server.received.append((filename, content))
+            status, reply = self.server.scripted.pop(0) if self.server.scripted else (None, None)
+        if status is None:
+            if filename in self.server.reject:
+                status, reply = 400, "rejected"
+            else:
+                status, reply = 200, json.dumps({"url": f"https://cdn.example.com/{filename}"})
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    server = StandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def uploader(stand_in):
+    return ImageUploader(stand_in.url, max_workers=4, timeout=(1, 5), retries=2, backoff=0)
+
+
+def test_uploads_decoded_bytes_as_multipart(uploader, stand_in):
+    assert uploader.upload_base64(data_url(), "product_7_0") == "https://cdn.example.com/product_7_0.png"
+    assert stand_in.received == [("product_7_0.png", PNG)]
+
+
+def test_bare_base64_is_sent_as_jpeg(uploader, stand_in):
+    uploader.upload_base64(base64.b64encode(PNG).decode(), "photo")
+    assert stand_in.received == [("photo.jpeg", PNG)]
+
+
+def test_retries_server_errors(uploader, stand_in):
+    stand_in.scripted = [(503, "busy"), (502, "bad gateway")]
+    assert uploader.upload_base64(data_url(), "retry").endswith("/retry.png")
+    assert len(stand_in.received) == 3
+
+
+def test_gives_up_after_retries(uploader, stand_in):
+    stand_in.scripted = [(500, "down")] * 3
+    with pytest.raises(ImageUploadError, match="after 3 attempts"):
+        uploader.upload_base64(data_url(), "down")
+
+
+def test_client_errors_are_not_retried(uploader, stand_in):
+    stand_in.scripted = [(400, "bad image")]
+    with pytest.raises(ImageUploadError, match="bad image"):
+        uploader.upload_base64(data_url(), "bad")
+    assert len(stand_in.received) == 1
+
+
+def test_invalid_json_response_is_an_upload_error(uploader, stand_in):
+    stand_in.scripted = [(200, "<html>not json</html>")]
+    with pytest.raises(ImageUploadError, match="invalid response"):
+        uploader.upload_base64(data_url(), "html")
+
+
+def test_unretryable_request_errors_are_upload_errors():
+    uploader = ImageUploader("http://", retries=2, backoff=0)
+    with pytest.raises(ImageUploadError):
+        uploader.upload_base64(data_url(), "nowhere")
+
+
+def test_upload_many_keeps_input_order(uploader, stand_in):
+    urls = uploader.upload_many([data_url(bytes([i]) * 1000) for i in range(6)], vendor_id=3)
+    assert urls == [f"https://cdn.example.com/product_3_{i}.png" for i in range(6)]
+    assert {name: content for name, content in stand_in.received}["product_3_4.png"] == bytes([4]) * 1000
+
+
+def test_upload_many_reports_every_failure(uploader, stand_in):
+    stand_in.reject = {"product_3_1.png"}
+    with pytest.raises(ImageUploadError, match="Image 1") as excinfo:
+        uploader.upload_many([data_url(), data_url(), "data:image/tiff;base64,AAAA"], vendor_id=3)
+    assert "Image 2" in str(excinfo.value)
+    assert "Image 0" not in str(excinfo.value)
+
+
+def test_edit_product_uploads_data_urls(app, client, stand_in, monkeypatch):
+    from routes.vendor import image_uploader
+    monkeypatch.setattr(image_uploader, "endpoint", stand_in.url)
+    monkeypatch.setattr(image_uploader, "backoff", 0)
+
+    with app.app_context():
+        vendor = Vendors(firstname="Ada", lastname="Vendor", business_name="Ada's", business_type="Retail",
+                         email="ada@example.com", password="x", referral_code="ADA1")
+        category = Category(name="Home")
+        product = Products(product_name="Lamp", product_price=5000, description="A lamp",
+                           category=category, vendor=vendor)
+        db.session.add(product)
+        db.session.commit()
+        vendor_id, product_id = vendor.id, product.id
+        token = create_access_token(identity=str(vendor_id), additional_claims={"role": "vendor"})
+
+    response = client.put(f"/api/vendor/edit-product/{product_id}", headers={"Authorization": f"Bearer {token}"},
+                          json={"new_images": ["https://example.com/existing.png", data_url()]})
+
+    assert response.status_code == 200, response.get_json()
+    with app.app_context():
+        urls = [image.image_url for image in
+                ProductImages.query.filter_by(product_id=product_id).order_by(ProductImages.id)]
+    assert urls == ["https://example.com/existing.png", f"https://cdn.example.com/product_{vendor_id}_0.png"]
+
+
+def test_failed_upload_leaves_the_product_unchanged(app, client, stand_in, monkeypatch):
+    from routes.vendor import image_uploader
+    monkeypatch.setattr(image_uploader, "endpoint", stand_in.url)
+    stand_in.scripted = [(400, "bad image")]
+
+    with app.app_context():
+        vendor = Vendors(firstname="Ada", lastname="Vendor", business_name="Ada's", business_type="Retail",
+                         email="ada@example.com", password="x", referral_code="ADA1")
+        product = Products(product_name="Lamp", product_price=5000, description="A lamp",
+                           category=Category(name="Home"), vendor=vendor)
+        db.session.add(product)
+        db.session.commit()
+        vendor_id, product_id = vendor.id, product.id
+        token = create_access_token(identity=str(vendor_id), additional_claims={"role": "vendor"})
+
+    response = client.put(f"/api/vendor/edit-product/{product_id}", headers={"Authorization": f"Bearer {token}"},
+                          json={"product_name": "Renamed", "new_images": [data_url()]})
+
+    assert response.status_code == 502
+    with app.app_context():
+        assert db.session.get(Products, product_id).product_name == "Lamp"
+        assert ProductImages.query.count() == 0
@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+import routes.images
+from routes.vendor import product_store
+
+
+@pytest.fixture
+def image_dir(app, tmp_path, monkeypatch):
+    app.config["IMAGE_HOT_CACHE_BYTES"] = 1024 * 1024
+    monkeypatch.setattr(routes.images, "_hot_cache", None)
+    monkeypatch.setattr(product_store, "root", str(tmp_path))
+    return tmp_path
+
+
+def write(path, data, mtime):
+    path.write_bytes(data)
+    os.utime(path, (mtime, mtime))
+
+
+def test_hot_cache_serves_a_rewritten_file(client, image_dir):
+    path = image_dir / "lamp.png"
+    write(path, b"old bytes", 1_000_000)
+    # The second request admits the file to the cache, the third is served from it.
+    for _ in range(3):
+        assert client.get("/images/products/lamp.png").data == b"old bytes"
+
+    write(path, b"new bytes!", 2_000_000)
+    assert client.get("/images/products/lamp.png").data == b"new bytes!"
+    assert client.get("/images/products/lamp.png").data == b"new bytes!"
+
+    cache = routes.images._hot_cache
+    assert cache.get(str(path))[0] == b"new bytes!"
+    assert cache.size == len(b"new bytes!")
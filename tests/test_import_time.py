@@ -0,0 +1,20 @@
+from benchmarks.import_time import DEFAULT_BUDGET_MS, LAZY_MODULES, median_run, eagerly_imported
+
+
+def test_startup_stays_within_import_budget():
+    (modules, by_package, total_us), totals = median_run("main", runs=3)
+    slowest = sorted(by_package.items(), key=lambda item: -item[1])[:5]
+    assert total_us / 1000 <= DEFAULT_BUDGET_MS, (
+        f"import + create_app took {total_us / 1000:.0f}ms (runs {totals}), "
+        f"budget {DEFAULT_BUDGET_MS:.0f}ms; slowest: {slowest}"
+    )
+
+
+def test_optional_dependencies_load_lazily():
+    (modules, _, _), _ = median_run("main", runs=1)
+    assert eagerly_imported(modules) == [], f"should load on first use: {LAZY_MODULES}"
+
+
+def test_config_does_not_import_metrics():
+    (modules, _, _), _ = median_run("core.config", runs=1, factory="")
+    assert "prometheus_client" not in modules
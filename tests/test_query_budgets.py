@@ -0,0 +1,72 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from core.extensions import db
+from core.query_stats import query_budget
+from models.orderModels import Order, OrderItem
+from models.userModel import Buyers, Vendors
+from models.vendorModels import Category, Products
+
+
+@pytest.fixture
+def vendor_token(app):
+    with app.app_context():
+        vendor = Vendors(firstname="Ada", lastname="Vendor", business_name="Ada's", business_type="Retail",
+                         email="ada@example.com", password="x", referral_code="ADA1")
+        db.session.add(Products(product_name="Lamp", product_price=5000, description="A lamp",
+                                category=Category(name="Home"), vendor=vendor))
+        db.session.commit()
+        return create_access_token(identity=str(vendor.id), additional_claims={"role": "vendor"})
+
+
+def add_orders(app, count, start=0):
+    """`count` orders from `count` different buyers, each with two items of the vendor's product."""
+    with app.app_context():
+        product = Products.query.first()
+        for i in range(start, start + count):
+            buyer = Buyers(name=f"buyer{i}", email=f"buyer{i}@example.com", password="x",
+                           role="buyer", referral_code=f"B{i}")
+            order = Order(buyer=buyer, total_amount=10000, status="pending", reference=f"ref-{i}")
+            order.order_items = [
+                OrderItem(product_id=product.id, product_name=product.product_name, quantity=1, price=5000)
+                for _ in range(2)
+            ]
+            db.session.add(order)
+        db.session.commit()
+
+
+def get_orders(client, token):
+    with query_budget(1) as stats:
+        response = client.get("/api/vendor/orders", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    return response.get_json()["orders"], stats.count
+
+
+def test_vendor_orders_load_orders_and_buyers_in_one_query(app, client, vendor_token):
+    add_orders(app, 1)
+    orders, few = get_orders(client, vendor_token)
+    assert len(orders) == 1
+
+    add_orders(app, 9, start=1)
+    orders, many = get_orders(client, vendor_token)
+
+    assert len(orders) == 10
+    assert many == few
+    assert {order["buyer_email"] for order in orders} == {f"buyer{i}@example.com" for i in range(10)}
+    assert all(len(order["items"]) == 2 for order in orders)
+
+
+def test_failed_statement_leaves_no_timing_state(app):
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    with app.app_context():
+        with query_budget(2) as stats:
+            with pytest.raises(OperationalError):
+                db.session.execute(text("SELECT * FROM no_such_table"))
+            db.session.rollback()
+            db.session.execute(text("SELECT 1"))
+
+        # Only the statement that completed is timed.
+        assert stats.count == 1
+        assert list(stats.shapes) == ["SELECT 1"]
@@ -0,0 +1,88 @@
+import pytest
+from flask import Response, jsonify, request, stream_with_context
+from sqlalchemy import insert, select, text
+
+from core.extensions import db
+from core.replicas import read_only, replica_router
+from models.vendorModels import Category
+
+
+@pytest.fixture
+def app(make_app, tmp_path):
+    """A primary and a replica SQLite file with different rows, and a few test views."""
+    app = make_app(
+        SQLALCHEMY_BINDS={"replica_0": f"sqlite:///{tmp_path / 'replica.db'}"},
+        REPLICA_MAX_LAG_SECONDS=0,  # nothing replicates between the files
+        REPLICA_HEALTH_CHECK_SECONDS=0,
+        REPLICA_STICKY_SECONDS=60,
+    )
+    with app.app_context():
+        replica = db.engines["replica_0"]
+        db.metadata.create_all(replica)
+        db.session.add(Category(name="on-primary"))
+        db.session.commit()
+        with replica.begin() as conn:
+            conn.execute(insert(Category.__table__), [{"name": "on-replica"}])
+
+    @app.route("/test/categories")
+    @read_only
+    def categories():
+        return jsonify(sorted(category.name for category in Category.query))
+
+    @app.route("/test/categories/stream")
+    @read_only
+    def stream_categories():
+        def generate():
+            names = db.session.execute(
+                select(Category.name).order_by(Category.name).execution_options(yield_per=1)).scalars()
+            for name in names:
+                yield name + "\n"
+        return Response(stream_with_context(generate()), mimetype="text/plain")
+
+    @app.route("/test/categories", methods=["POST"])
+    def add_category():
+        db.session.add(Category(name=request.get_json()["name"]))
+        db.session.commit()
+        return jsonify({"ok": True}), 201
+
+    return app
+
+
+def test_read_only_views_read_from_the_replica(client):
+    assert client.get("/test/categories").get_json() == ["on-replica"]
+
+
+def test_writes_go_to_the_primary(app, client):
+    assert client.post("/test/categories", json={"name": "new"}).status_code == 201
+
+    with app.app_context():
+        assert sorted(db.session.execute(select(Category.name)).scalars()) == ["new", "on-primary"]
+        with db.engines["replica_0"].connect() as conn:
+            assert list(conn.execute(select(Category.name)).scalars()) == ["on-replica"]
+
+
+def test_writer_reads_own_writes_from_the_primary(app, client):
+    client.post("/test/categories", json={"name": "new"})
+
+    assert client.get("/test/categories").get_json() == ["new", "on-primary"]
+    # Other users aren't sticky.
+    assert app.test_client().get("/test/categories").get_json() == ["on-replica"]
+
+
+def test_streamed_response_stays_on_the_replica(client):
+    response = client.get("/test/categories/stream")
+    assert response.get_data(as_text=True) == "on-replica\n"
+
+
+def test_replica_failure_falls_back_to_the_primary(app, client):
+    with app.app_context():
+        with db.engines["replica_0"].begin() as conn:
+            conn.execute(text("DROP TABLE category"))
+
+    assert client.get("/test/categories").get_json() == ["on-primary"]
+    state = replica_router._states["replica_0"]
+    assert not state.healthy and "category" in state.last_error
+
+    # Out of rotation until REPLICA_RETRY_SECONDS pass.
+    assert client.get("/test/categories").get_json() == ["on-primary"]
+    assert client.get("/test/categories/stream").get_data(as_text=True) == "on-primary\n"
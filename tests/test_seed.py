@@ -0,0 +1,50 @@
+from core.extensions import db
+from core.seed import seed_demo_data, CATEGORIES, DEMO_ORDERS, DEMO_PRODUCTS
+from models.orderModels import Order, OrderItem
+from models.userModel import Buyers, Vendors
+from models.vendorModels import Category, Products, ProductImages, Storefront
+
+
+def counts():
+    return {model.__name__: model.query.count()
+            for model in (Category, Vendors, Storefront, Buyers, Products, ProductImages, Order, OrderItem)}
+
+
+def test_seed_on_an_empty_database(app):
+    with app.app_context():
+        created = seed_demo_data(vendors=3, buyers=4, products=10, orders=5)
+
+        assert counts() == {
+            "Category": len(CATEGORIES),
+            "Vendors": 4,
+            "Storefront": 4,
+            "Buyers": 5,
+            "Products": len(DEMO_PRODUCTS) + 10,
+            "ProductImages": len(DEMO_PRODUCTS) + 10,
+            "Order": len(DEMO_ORDERS) + 5,
+            "OrderItem": 2 * (len(DEMO_ORDERS) + 5),
+        }
+        assert created["products"] == len(DEMO_PRODUCTS) + 10
+        demo_vendor = Vendors.query.filter_by(email="demo@vendor.com").one()
+        assert Products.query.filter_by(vendor_id=demo_vendor.id).count() >= len(DEMO_PRODUCTS)
+
+
+def test_seeding_again_inserts_nothing(app):
+    with app.app_context():
+        seed_demo_data(vendors=3, buyers=4, products=10, orders=5)
+        before = counts()
+
+        created = seed_demo_data(vendors=3, buyers=4, products=10, orders=5)
+
+        assert not any(created.values()), created
+        assert counts() == before
+
+
+def test_seeding_more_adds_only_the_difference(app):
+    with app.app_context():
+        seed_demo_data(vendors=2, products=4)
+        created = seed_demo_data(vendors=3, products=6)
+
+        assert created["vendors"] == 1
+        assert created["products"] == 2
+        assert Products.query.count() == len(DEMO_PRODUCTS) + 6